@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_argparse_startup.py
+________________________________________________________________________________
+Description :   Seconds to build an `ArgumentParser` with ~600 arguments (across subcommands),
+                parse a commandline, build it's vanilla `default_parser` (for `--default-parser`),
+                and to display the help of every subcommand
+                (with an empty, and with a filled `colourize_cache` read from disk).
+
+                    python benchmarks/bench_argparse_startup.py [num_arguments]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import tempfile
+import logging
+import shutil
+import time
+import sys
+import os
+## custom
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+import supercli.argparse
+
+
+def build_parser( num_arguments ):
+    parser     = supercli.argparse.ArgumentParser( description='Does ``things`` to *files*', autocomp_cmd='bench' )
+    subparsers = parser.add_subparsers( dest='command' )
+    for i in range(10):
+        subparser = subparsers.add_parser( 'cmd%s' % i, help='Runs ``cmd%s``' % i, description='Runs *cmd%s*' % i )
+        for j in range( num_arguments // 10 ):
+            subparser.add_argument( '--opt%s' % j, help='Sets ``opt%s`` (default: %%(default)s)\nsee *docs*' % j, default=j )
+    return parser
+
+def format_help( parser, cachepath ):
+    supercli.argparse.colourize_cache = supercli.argparse.ColourizeCache( cachepath )
+
+    start = time.time()
+    parser.format_help()
+    for subparser in parser.subparsers_obj.get_subparsers():
+        subparser.format_help()
+    supercli.argparse.colourize_cache.save()
+    return time.time() - start
+
+def main( num_arguments=600 ):
+    tempdir = tempfile.mkdtemp()
+    try:
+        start  = time.time()
+        parser = build_parser( num_arguments )
+        built  = time.time()
+
+        sys.argv = [ 'bench', 'cmd0', '--opt1', 'a' ]
+        parser.parse_args( sys.argv[1:] )
+        parsed = time.time()
+
+        parser.default_parser
+        default_built = time.time()
+
+        for handler in logging.root.handlers:
+            handler.close()
+
+        cachepath = os.path.join( tempdir, 'colourize.json' )
+        print( 'build              %8.3fs' % (built  - start) )
+        print( 'parse_args         %8.3fs' % (parsed - built) )
+        print( 'default_parser     %8.3fs' % (default_built - parsed) )
+        print( 'help (cold cache)  %8.3fs' % format_help( parser, cachepath ) )
+        print( 'help (warm cache)  %8.3fs' % format_help( parser, cachepath ) )
+    finally:
+        shutil.rmtree( tempdir )
+
+
+if __name__ == '__main__':
+    main( *[ int(arg)  for arg in sys.argv[1:] ] )
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_binlog.py
+________________________________________________________________________________
+Description :   Records/sec and bytes/record written by `logging.handlers.RotatingFileHandler`,
+                `supercli.logging.BufferedRotatingFileHandler` (text, `SetLog`'s lineformat presets),
+                and by `supercli.logging.BinaryLogHandler`.
+
+                    python benchmarks/bench_binlog.py [num_records]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import logging.handlers
+import tempfile
+import shutil
+import time
+import sys
+import os
+## custom
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+import supercli.logging
+
+logger = logging.getLogger('bench.binlog')
+
+
+def bench( handler, num_records ):
+    logger.handlers = [ handler ]
+    start = time.time()
+    for i in range(num_records):
+        logger.info( 'request %s from %s took %.3fs', i, 'client-name', 0.25 )
+    elapsed = time.time() - start
+    handler.close()
+    return num_records / elapsed
+
+def main( num_records=100000 ):
+    logger.setLevel( logging.INFO )
+    logger.propagate = False
+    tempdir = tempfile.mkdtemp()
+    setlog  = supercli.logging.SetLog
+
+    try:
+        for (name, create, attrs) in (
+                ('text (norm)',     lambda path: logging.handlers.RotatingFileHandler( path, maxBytes=2**31 ), None),
+                ('text (long)',     lambda path: logging.handlers.RotatingFileHandler( path, maxBytes=2**31 ), None),
+                ('text (buffered)', lambda path: supercli.logging.BufferedRotatingFileHandler( path, maxBytes=2**31 ), None),
+                ('binlog',          lambda path: supercli.logging.BinaryLogHandler( path, maxBytes=2**31, caller_info=False ), set(['name'])),
+                ('binlog (caller)', lambda path: supercli.logging.BinaryLogHandler( path, maxBytes=2**31 ), None),
+            ):
+            path    = os.path.join( tempdir, name.replace(' ','_') )
+            handler = create( path )
+            if name.startswith('text'):
+                linefmt = setlog.linefmt_long if 'long' in name else setlog.linefmt_norm
+                handler.setFormatter( logging.Formatter( linefmt, setlog.datefmt_norm ) )
+
+            supercli.logging.set_record_attrs( attrs )
+            rate = bench( handler, num_records )
+            print( '%-16s %10.0f records/sec  %6.1f bytes/record' % (
+                name, rate, os.path.getsize(path) / float(num_records) ) )
+    finally:
+        supercli.logging.set_record_attrs( None )
+        shutil.rmtree( tempdir )
+
+
+if __name__ == '__main__':
+    main( *[ int(arg)  for arg in sys.argv[1:] ] )
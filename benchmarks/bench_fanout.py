@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_fanout.py
+________________________________________________________________________________
+Description :   Records/sec logged to 3 logfiles and a (non-terminal) stream, with each
+                handler formatting the record, and with a `FanoutHandler` (`SetLog(fanout=True)`)
+                formatting it once.
+
+                    python benchmarks/bench_fanout.py [num_records] [logfmt]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import tempfile
+import logging
+import shutil
+import time
+import sys
+import os
+## external
+import six
+## custom
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+import supercli.logging
+
+
+def bench( logger, num_records ):
+    start = time.time()
+    for i in range(num_records):
+        logger.info( 'record %s of %s', i, num_records )
+    for handler in logging.root.handlers:
+        handler.flush()
+    return num_records / (time.time() - start)
+
+def main( num_records=100000, logfmt=None ):
+    logger  = logging.getLogger('bench.fanout')
+    tempdir = tempfile.mkdtemp()
+    try:
+        for (name, fanout) in ( ('per-handler', False), ('fanout', True) ):
+            for handler in logging.root.handlers:
+                handler.close()
+            logging.root.handlers = [ logging.StreamHandler( six.StringIO() ) ]   ## reused by SetLog
+            logfiles = [ os.path.join( tempdir, '%s.%s.log' % (name, i) )  for i in range(3) ]
+            supercli.logging.SetLog( logfile=logfiles, logfile_size=0, logfmt=logfmt, fanout=fanout )
+            print( '%-12s %10.0f records/sec' % (name, bench(logger, num_records)) )
+    finally:
+        for handler in logging.root.handlers:
+            handler.close()
+        shutil.rmtree( tempdir )
+
+
+if __name__ == '__main__':
+    main( *[ (int(arg) if arg.isdigit() else arg)  for arg in sys.argv[1:] ] )
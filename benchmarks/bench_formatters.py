@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_formatters.py
+________________________________________________________________________________
+Description :   Records/sec formatted by `supercli.logging.Formatter` (lineformat presets)
+                and by `supercli.logging.JsonFormatter`, with `orjson` (if installed)
+                and with the stdlib `json` module.
+
+                    python benchmarks/bench_formatters.py [num_records]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import logging
+import time
+import sys
+import os
+## custom
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+import supercli.logging
+
+
+def bench( formatter, records ):
+    start = time.time()
+    for record in records:
+        formatter.format( record )
+    return len(records) / (time.time() - start)
+
+def main( num_records=100000 ):
+    logger  = logging.getLogger('bench.formatters')
+    records = [
+        logger.makeRecord( logger.name, logging.INFO, __file__, 30, 'record %s of %s', (i, num_records), None,
+                           func='bench', extra={'request_id': i} )
+        for i in range(num_records)
+    ]
+
+    import json
+    stdlib_json = supercli.logging.JsonFormatter()
+    stdlib_json._encode = json.JSONEncoder(
+        ensure_ascii=False, separators=(',',':'), default=supercli.logging._json_default ).encode
+
+    for (name, formatter) in (
+            ('linefmt_norm',  supercli.logging.Formatter( supercli.logging.SetLog.linefmt_norm, supercli.logging.SetLog.datefmt_norm )),
+            ('linefmt_long',  supercli.logging.Formatter( supercli.logging.SetLog.linefmt_long )),
+            ('json',          supercli.logging.JsonFormatter()),
+            ('json (stdlib)', stdlib_json),
+        ):
+        print( '%-14s %10.0f records/sec' % (name, bench(formatter, records)) )
+
+
+if __name__ == '__main__':
+    main( *[ int(arg)  for arg in sys.argv[1:] ] )
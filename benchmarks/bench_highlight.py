@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_highlight.py
+________________________________________________________________________________
+Description :   Help-strings/sec colourized by pygments (`RstLexer`, `TerminalFormatter`)
+                and by supercli's `RstHelpLexer`/`TerminalFormatter`, and the time to import each.
+
+                    python benchmarks/bench_highlight.py [num_repeats]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import subprocess
+import time
+import sys
+import os
+## custom
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+
+
+## help-strings of supercli's ArgumentParser, and of a typical CLI
+texts = [
+    'Display extended help menu with developer options',
+    'Prints more detailed log-information (`logging.DEBUG`)',
+    'Same as verbose, but all log-filters are disabled.\n (All information is printed)',
+    'Sets the loglevel of specific loggers (and their children)\nex: ``--log-level mypkg.mymodule=DEBUG,chatty.lib=WARNING``',
+    "2x lines used for each logrecord. __file__,\nline-number, timestamp... The whole kit and kaboodle.",
+    'writes log to filepath specified after argument',
+    'Logrecords are queued, and written from a background thread.\n(logging no longer blocks on terminal/file writes)',
+    'Sets ``opt`` (default: %(default)s)\nsee *docs*',
+    'Runs the ``build`` step. See :ref:`building` and `the docs <http://example.com>`_',
+    'Output format\n=============\n\n- ``json``: one object per line\n- ``text``: aligned columns',
+]
+
+def bench( highlight, lexer, formatter, num_repeats ):
+    best = None
+    for i in range(5):
+        start = time.time()
+        for i in range(num_repeats):
+            for text in texts:
+                highlight( text, lexer, formatter )
+        duration = time.time() - start
+        best     = duration  if best is None else min( best, duration )
+    return num_repeats * len(texts) / best
+
+def import_time( statement ):
+    start = time.time()
+    subprocess.check_call([ sys.executable, '-c', statement ], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+    return time.time() - start
+
+def main( num_repeats=300 ):
+    import pygments
+    import pygments.lexers.markup
+    import pygments.formatters
+    import supercli.highlight
+
+    baseline = bench( pygments.highlight, pygments.lexers.markup.RstLexer(), pygments.formatters.TerminalFormatter(), num_repeats )
+    builtin  = bench( supercli.highlight.highlight, supercli.highlight.RstHelpLexer(), supercli.highlight.TerminalFormatter(), num_repeats )
+    print( 'pygments  %10.0f texts/sec' % baseline )
+    print( 'supercli  %10.0f texts/sec  (%.1fx)' % (builtin, builtin / baseline) )
+
+    print( 'import pygments   %6.3fs  (python startup included)' %
+           import_time( 'import pygments, pygments.lexers.markup, pygments.formatters' ) )
+    print( 'import supercli   %6.3fs  (python startup included)' %
+           import_time( 'import supercli.highlight' ) )
+
+
+if __name__ == '__main__':
+    main( *[ int(arg)  for arg in sys.argv[1:] ] )
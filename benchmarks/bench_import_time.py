@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_import_time.py
+________________________________________________________________________________
+Description :   Wall-time of a new interpreter that imports `supercli.argparse`, and of a
+                small CLI that parses it's arguments (best of N runs, interpreter startup included).
+
+                    python benchmarks/bench_import_time.py [num_runs]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import subprocess
+import time
+import sys
+import os
+
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+scripts = [
+    ( 'python',                  'pass' ),
+    ( 'import supercli.argparse', 'import supercli.argparse' ),
+    ( 'parse_args',              '\n'.join([
+        'import supercli.argparse',
+        'parser = supercli.argparse.ArgumentParser( description="Does ``things``", autocomp_cmd="bench" )',
+        'parser.add_argument( "--opt", help="Sets *opt*" )',
+        'parser.parse_args( ["--opt", "a"] )',
+    ])),
+]
+
+
+def run( script, num_runs ):
+    env = dict( os.environ, PYTHONPATH=root )
+    best = None
+    for i in range( num_runs ):
+        start = time.time()
+        subprocess.check_call( [ sys.executable, '-c', script ], env=env )
+        elapsed = time.time() - start
+        best    = elapsed if best is None else min( best, elapsed )
+    return best
+
+def main( num_runs=20 ):
+    for (name, script) in scripts:
+        print( '%-26s %8.3fs' % (name, run( script, num_runs )) )
+
+
+if __name__ == '__main__':
+    main( *[ int(arg)  for arg in sys.argv[1:] ] )
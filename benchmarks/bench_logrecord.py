@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_logrecord.py
+________________________________________________________________________________
+Description :   Records/sec logged with `SetLog()`'s default lineformat, with every
+                LogRecord attribute computed (before), and with only the attributes
+                used by the lineformat computed (after).
+
+                    python benchmarks/bench_logrecord.py [num_records]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import logging
+import time
+import sys
+import os
+## custom
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+import supercli.logging
+
+logger = logging.getLogger('bench.logrecord')
+
+
+def bench( num_records ):
+    start = time.time()
+    for i in range(num_records):
+        logger.info( 'record %s of %s', i, num_records )
+    return num_records / (time.time() - start)
+
+def main( num_records=100000 ):
+    with open( os.devnull, 'w' ) as devnull:
+        logging.root.addHandler( logging.StreamHandler(devnull) )
+
+        for (str_arg, name) in ( ('', 'norm'), ('d', 'dev') ):
+            supercli.logging.SetLog( str_arg, colorize=False )
+            supercli.logging.set_record_attrs( None )
+            before = bench( num_records )
+
+            supercli.logging.SetLog( str_arg, colorize=False )
+            after = bench( num_records )
+
+            print( 'linefmt_%-5s  before: %10.0f records/sec   after: %10.0f records/sec   (%.2fx)' % (
+                name, before, after, after / before ) )
+
+
+if __name__ == '__main__':
+    main( *[ int(arg)  for arg in sys.argv[1:] ] )
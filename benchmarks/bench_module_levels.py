@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_module_levels.py
+________________________________________________________________________________
+Description :   Calls/sec of logging from many modules, when only one module is debugged:
+                the root logger at INFO, at DEBUG (`-v`), and at INFO with the debugged
+                module at DEBUG (`--log-level bench.mod0=DEBUG`).
+
+                    python benchmarks/bench_module_levels.py [num_calls]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import logging
+import time
+import sys
+import os
+## external
+import six
+## custom
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+import supercli.logging
+
+
+def bench( loggers, num_calls ):
+    start = time.time()
+    for i in range(num_calls // len(loggers)):
+        for logger in loggers:
+            logger.debug( 'record %s', i )
+    return num_calls / (time.time() - start)
+
+def main( num_calls=200000 ):
+    loggers = [ logging.getLogger('bench.mod%s' % i)  for i in range(20) ]
+
+    for (name, kwargs) in (
+            ('INFO',                   {}),
+            ('DEBUG (-v)',             {'lv': 'DEBUG'}),
+            ('INFO + mod0=DEBUG',      {'module_levels': 'bench.mod0=DEBUG'}),
+        ):
+        logging.root.handlers = []
+        supercli.logging.SetLog( logstream=False, **kwargs )
+        logging.root.addHandler( logging.StreamHandler( six.StringIO() ) )
+        print( '%-20s %10.0f calls/sec' % (name, bench(loggers, num_calls)) )
+
+
+if __name__ == '__main__':
+    main( *[ int(arg)  for arg in sys.argv[1:] ] )
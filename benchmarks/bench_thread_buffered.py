@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Name :          benchmarks/bench_thread_buffered.py
+________________________________________________________________________________
+Description :   Records/sec logged to 2 logfiles by 1/4/16/64 threads, with handlers
+                on the root logger (each thread acquires each handler's lock), and with
+                a `ThreadBufferedHandler` (`SetLog(thread_buffered=True)`).
+
+                'logged' is the rate at which the logging threads return,
+                'written' includes writing all records to the logfiles.
+
+                    python benchmarks/bench_thread_buffered.py [records_per_thread]
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import threading
+import tempfile
+import logging
+import shutil
+import time
+import sys
+import os
+## custom
+sys.path.insert( 0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) )
+import supercli.logging
+
+
+def bench( logger, num_threads, num_records ):
+    def log_records():
+        for i in range(num_records):
+            logger.info( 'record %s of %s', i, num_records )
+
+    threads = [ threading.Thread( target=log_records )  for i in range(num_threads) ]
+    start   = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logged = time.time()
+    for handler in logging.root.handlers:
+        handler.flush()
+    written = time.time()
+
+    total = num_threads * num_records
+    return ( total / (logged - start), total / (written - start) )
+
+def main( num_records=20000 ):
+    logger  = logging.getLogger('bench.thread_buffered')
+    tempdir = tempfile.mkdtemp()
+    try:
+        print( '%-8s %22s %22s' % ('', 'handlers', 'thread_buffered') )
+        print( '%-8s %11s %10s %11s %10s' % ('threads', 'logged', 'written', 'logged', 'written') )
+        for num_threads in ( 1, 4, 16, 64 ):
+            results = []
+            for thread_buffered in ( False, True ):
+                for handler in logging.root.handlers:
+                    handler.close()
+                logging.root.handlers = []
+                logfiles = [ os.path.join( tempdir, '%s.%s.%s.log' % (num_threads, thread_buffered, i) )  for i in range(2) ]
+                supercli.logging.SetLog( logfile=logfiles, logstream=False, logfile_size=0, thread_buffered=thread_buffered )
+                results.extend( bench( logger, num_threads, num_records // num_threads ) )
+            print( '%-8s %11.0f %10.0f %11.0f %10.0f' % tuple([ num_threads ] + results) )
+    finally:
+        for handler in logging.root.handlers:
+            handler.close()
+        logging.root.handlers = []
+        shutil.rmtree( tempdir )
+
+
+if __name__ == '__main__':
+    main( *[ int(arg)  for arg in sys.argv[1:] ] )
@@ -279,6 +279,11 @@ setup(
 
     package_data     = cfg._package_data,
     cmdclass         = { 'clean': CleanCommand  },
+    entry_points     = {
+        'console_scripts': [
+            'supercli-logquery = supercli.logquery:main',
+        ],
+    },
 
     classifiers      = [
         'Development Status :: 3 - Alpha',
@@ -19,19 +19,16 @@ from   __future__    import unicode_literals
 from   __future__    import absolute_import
 import sys
 import argparse
-import datetime
-import subprocess
-import shlex
+import atexit
+import time
 import os
-## external
-from   pygments               import highlight
-from   pygments.lexers.markup import RstLexer
-from   pygments.formatters    import TerminalFormatter
-import colorama
 ## custom
-from   .logging      import SetLog
-from   .excepttools  import wrap_excepthook_pdb_postmortem
-from   .autocomplete import ZshCompleter
+from   .highlight    import highlight, uses_pygments, RstHelpLexer, TerminalFormatter
+from   .highlight    import version as highlight_version
+from   .logging      import SetLog, enable_stats, dump_stats, parse_module_levels, set_module_levels
+
+## modules only needed by some code-paths (pygments, autocompletion, pdb, the colourize-cache, ...)
+## are imported where they are used, so that `parse_args()` stays fast. see `test_import_time.py`
 
 
 OPTIONAL     = '?'
@@ -61,8 +58,9 @@ class LegibleHelpFormatter(argparse.RawTextHelpFormatter):
 
     * Reduces visual-clutter in argument examples
     * Newlines `\n` are used in all help lines
-    * ReStructuredText in help is formatted/colourized using pygments
-      (even on windows!)
+    * ReStructuredText in help is formatted/colourized using `supercli.highlight`
+      (or a pygments lexer/formatter), even on windows!. Help is stored as-is,
+      and only colourized when the help is displayed.
 
     instead of:          -s [METAVAR, ...], --short-var [METAVAR, ...]
     you get:             -s, --short [METAVAR, ..]
@@ -72,8 +70,44 @@ class LegibleHelpFormatter(argparse.RawTextHelpFormatter):
         http://stackoverflow.com/questions/23936145/python-argparse-help-message-disable-metavar-for-short-options
     """
     def __init__(self,*args,**kwds):
+        self._lexer     = kwds.pop( 'lexer',     RstHelpLexer )
+        self._formatter = kwds.pop( 'formatter', TerminalFormatter )
         super( LegibleHelpFormatter, self ).__init__(*args,**kwds)
 
+        self._lexer_instance     = None
+        self._formatter_instance = None
+
+    def _colourize(self, text):
+        """
+        colourizes text (the lexer/formatter are shared by all
+        help-lines formatted by this instance). Text colourized
+        by pygments is cached, see `colourize_cache`.
+        """
+        if not text:
+            return text
+
+        cached = uses_pygments( self._lexer, self._formatter )
+        if cached:
+            key    = colourize_cache.key( text, self._lexer, self._formatter )
+            retval = colourize_cache.get( key )
+            if retval is not None:
+                return retval
+
+        if self._lexer_instance is None:
+            self._lexer_instance     = self._lexer()
+            self._formatter_instance = self._formatter()
+
+        retval = highlight( text, self._lexer_instance, self._formatter_instance )
+        if cached:
+            colourize_cache.set( key, retval )
+        return retval
+
+    def _get_help_string(self, action):
+        return self._colourize( super( LegibleHelpFormatter, self )._get_help_string(action) )
+
+    def _format_text(self, text):
+        return super( LegibleHelpFormatter, self )._format_text( self._colourize(text) )
+
     def _format_action_invocation(self, action):
         white='\033[37m'
         norm='\033[0m'
@@ -136,18 +170,174 @@ class LegibleHelpFormatter(argparse.RawTextHelpFormatter):
         return result
 
 
+class ColourizeCache(object):
+    """
+    On-disk cache of colourized help text, so that help is not re-highlighted
+    by pygments each time it is displayed. (text colourized by `supercli.highlight`
+    is faster to colourize than to read from the cache, and is not cached)
+
+    Entries are keyed by a hash of (text, lexer, formatter, pygments-version), and are stored
+    in a single JSON file that is read once per process. New entries are written when
+    `save()` is called (on exit). The file is re-read and merged
+    before it is written, and replaced atomically, so concurrent processes do not corrupt it.
+    Once it's entries exceed `max_bytes`, the least-recently used entries are evicted.
+
+    Errors reading/writing the cache are ignored (text is colourized as if it were not cached).
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    path       | None, '~/.cache/supercli/colourize.json' | (opt) | path of the cache. By default,
+               |                                         |       | `$XDG_CACHE_HOME/supercli/colourize.json`
+               |                                         |       |
+    max_bytes  | 4000000                                 | (opt) | max size of the colourized text in the cache
+               |                                         |       |
+    enabled    | True, False                             | (opt) | if False, nothing is read/written.
+               |                                         |       | (also disabled by the environment variable `SUPERCLI_NO_CACHE`)
+               |                                         |       |
+    """
+    version = 1
+
+    def __init__(self, path=None, max_bytes=4000000, enabled=True):
+        ## Arguments
+        self.path      = path or self.default_path()
+        self.max_bytes = max_bytes
+        self.enabled   = enabled and not os.environ.get('SUPERCLI_NO_CACHE')
+
+        ## Attributes
+        self._entries = None    ## {key: [last_used, text]}
+        self._new     = {}      ## entries added/used since the cache was last written
+        self._atexit  = False
+
+    @staticmethod
+    def default_path():
+        cachedir = os.environ.get('XDG_CACHE_HOME') or os.path.join( os.path.expanduser('~'), '.cache' )
+        return os.path.join( cachedir, 'supercli', 'colourize.json' )
+
+    @staticmethod
+    def key( text, lexer, formatter ):
+        """
+        Returns the cache-key of colourizing `text` with a lexer/formatter class.
+        """
+        import hashlib
+        parts = [ text ] + [ '%s.%s' % (cls.__module__, cls.__name__)  for cls in (lexer, formatter) ]
+        if uses_pygments( lexer, formatter ):
+            import pygments
+            parts.append( pygments.__version__ )
+        parts.append( highlight_version )
+        return hashlib.sha1( '\0'.join(parts).encode('utf-8') ).hexdigest()
+
+    def get(self, key):
+        """
+        Returns the colourized text of `key` (or None)
+        """
+        if not self.enabled:
+            return None
+
+        if self._entries is None:
+            self._entries = self._read()
+
+        entry = self._entries.get( key )
+        if entry is None:
+            return None
+
+        ## refresh last-used time of entries that were not used recently
+        if entry[0] < time.time() - 86400:
+            self._add( key, entry[1] )
+        return entry[1]
+
+    def set(self, key, text):
+        if not self.enabled:
+            return
+
+        if self._entries is None:
+            self._entries = self._read()
+
+        self._entries[ key ] = self._add( key, text )
+
+    def _add(self, key, text):
+        entry = self._new[ key ] = [ time.time(), text ]
+
+        if not self._atexit:
+            atexit.register( self.save )
+            self._atexit = True
+        return entry
+
+    def save(self):
+        """
+        Writes new entries to the cache (merged with entries written by other processes).
+        """
+        import tempfile
+        import json
+
+        if not ( self.enabled and self._new ):
+            return
+
+        entries = self._read()
+        entries.update( self._new )
+
+        ## evict least-recently used entries
+        size = 0
+        kept = {}
+        for (key, entry) in sorted( entries.items(), key=lambda item: item[1][0], reverse=True ):
+            size += len(entry[1])
+            if size > self.max_bytes:
+                break
+            kept[ key ] = entry
+
+        try:
+            cachedir = os.path.dirname( self.path )
+            if not os.path.isdir( cachedir ):
+                os.makedirs( cachedir )
+
+            (fd, tmppath) = tempfile.mkstemp( dir=cachedir, prefix='.colourize.' )
+            try:
+                with os.fdopen( fd, 'w' ) as fw:
+                    json.dump( {'version': self.version, 'entries': kept}, fw )
+                getattr( os, 'replace', os.rename )( tmppath, self.path )
+            except Exception:
+                os.remove( tmppath )
+                raise
+        except( OSError, IOError, ValueError ):
+            return
+
+        self._entries = kept
+        self._new     = {}
+
+    def _read(self):
+        import json
+        try:
+            with open( self.path, 'r' ) as fd:
+                data = json.load( fd )
+            if data.get('version') == self.version:
+                return data['entries']
+        except( OSError, IOError, ValueError, KeyError, AttributeError ):
+            pass
+        return {}
+
+    def clear(self):
+        """
+        Deletes the cache.
+        """
+        self._entries = {}
+        self._new     = {}
+        if os.path.isfile( self.path ):
+            os.remove( self.path )
+
+
+colourize_cache = ColourizeCache()
+
+
 class _SubparsersProxy(object):
-    def __init__(self, parser, default_parser, *args, **kwds):
+    def __init__(self, parser, *args, **kwds):
         self.parser         = parser
-        self.default_parser = default_parser
 
 
         ## Attributes
-        self.default_subparsers = []
-        self.subparsers         = []
+        self.subparsers     = []
+        self.parser_specs   = []   ## [(subparser, args, kwds)] of each add_parser() call (see `ArgumentParser.default_parser`)
 
-        self.subparsers_obj         = super( ArgumentParser, parser ).add_subparsers(*args,**kwds)
-        self.default_subparsers_obj = default_parser.add_subparsers(*args,**kwds)
+        self.subparsers_obj = super( ArgumentParser, parser ).add_subparsers(*args,**kwds)
 
     def add_parser(self,*args,**kwds):
 
@@ -155,24 +345,15 @@ class _SubparsersProxy(object):
         title = ''
 
 
-
-        ## Default Subparser
-        default_subparser = self.default_subparsers_obj.add_parser(*args,**kwds)
-        self.default_subparsers.append( default_subparser )
-
-
-
-        ## Colourize text, and remember specific
-        ## arguments for use in autocompletion scripts
+        ## remember specific arguments for use in autocompletion scripts
+        ## (help is colourized by LegibleHelpFormatter)
         if 'help' in kwds:
             help         = kwds['help']
-            kwds['help'] = colourize_text(kwds['help'])
 
         if 'title' in kwds:  title = kwds['title']
         else:                title = args[0]
 
         ret_subparser = self.subparsers_obj.add_parser(
-                                _default_parser = default_subparser           ,
                                 autocomp_cmd    = self.parser.autocomp_cmd ,
                                 *args,**kwds
                               )
@@ -191,12 +372,23 @@ class _SubparsersProxy(object):
 
         ## remember subparser
         self.subparsers.append( ret_subparser )
+        self.parser_specs.append( (ret_subparser, args, kwds) )
+        ret_subparser._parent_parser = self.parser
+        self.parser._clear_default_parser()
 
         return ret_subparser
 
     def get_subparsers(self):
         return self.subparsers
 
+    def _build_default_subparsers(self, default_parser, args, kwds):
+        """
+        Adds the vanilla equivalent of these subparsers to `default_parser`.
+        """
+        default_subparsers_obj = default_parser.add_subparsers(*args,**kwds)
+        for (subparser, parser_args, parser_kwds) in self.parser_specs:
+            subparser._build_default_parser( default_subparsers_obj.add_parser(*parser_args,**parser_kwds) )
+
 
 class ArgumentParser(argparse.ArgumentParser):
     """
@@ -227,8 +419,8 @@ class ArgumentParser(argparse.ArgumentParser):
     description | 'this does ...'   | (opt) | The main description at the top of
                 |                   |       | the help message.
                 |                   |       |
-    lexer       | pygments.lexers.* | (opt) | The lexer you would like to use to
-                |                   |       | do syntax highlighting in your help
+    lexer       | RstHelpLexer,     | (opt) | The lexer you would like to use to
+                | pygments.lexers.* |       | do syntax highlighting in your help
                 |                   |       | documentation.
                 |                   |       | (ReStructuredText by default)
     """
@@ -239,7 +431,7 @@ class ArgumentParser(argparse.ArgumentParser):
                  autocomp_cmd     = None,     ## for autocompleter
 
                  ## syntaxhighlight opts
-                 helpline_lexer     = RstLexer,
+                 helpline_lexer     = RstHelpLexer,
                  helpline_formatter = TerminalFormatter,
 
                  ## parser arguments
@@ -248,8 +440,8 @@ class ArgumentParser(argparse.ArgumentParser):
 
                  ## logging opts
                  loghandlers      = None,
+                 log_signals      = False,
 
-                 _default_parser  = None,
                  *args, **kwds
               ):
         """
@@ -265,11 +457,13 @@ class ArgumentParser(argparse.ArgumentParser):
                 all:
                 * --verbose             (logging.DEBUG)
                 * --very-verbose        (logging.DEBUG with custom filters disabled)
+                * --log-level           (loglevels of specific loggers  ex: pkg.mod=DEBUG,other=WARNING)
 
                 extended_logopts:
                 * --logfile  <filepath>  (logs to a logfile in addition to stdout)
                 * --silent               (disables logging to stderr)
                 * --log-longfmt          (2x lines used for each logrecord. Lots of info for debugging)
+                * --log-async            (logrecords are written from a background thread)
 
                 developer_opts:
                 * --dev                 (replaces timestamp with __name__ and lineno in log entries)
@@ -285,9 +479,11 @@ class ArgumentParser(argparse.ArgumentParser):
                             |                           |       | to run this CLI Interface
                             |                           |       | (used in generation of autocompleter scripts)
                             |                           |       |
-        helpline_lexer      | pygments.lexers.*         | (opt) | lexer to use (RstLexer by default)
+        helpline_lexer      | RstHelpLexer,             | (opt) | lexer to use. By default `supercli.highlight.RstHelpLexer`
+                            | pygments.lexers.*         |       | (pygments is only imported if a pygments lexer/formatter is used)
                             |                           |       |
-        helpline_formatter  | pygments.formatters.*     | (opt) | formatter to use (TerminalFormatter by default)
+        helpline_formatter  | TerminalFormatter,        | (opt) | formatter to use. By default `supercli.highlight.TerminalFormatter`
+                            | pygments.formatters.*     |       |
                             |                           |       |
                             |                           |       |
                             |                           |       |
@@ -297,17 +493,16 @@ class ArgumentParser(argparse.ArgumentParser):
                             |                           |       |
         developer_opts      | True, False               | (opt) | adds --dev argument (more logging info lineno, __name__, ...)
                             |                           |       |
-        _default_parser     | argparse.ArgumentParser   | (int) | Internal-only argument, used by _SubparsersProxy
-                            |                           |       | to pass a vanilla argparse.ArgumentParser to the
-                            |                           |       | supercli ArgumentParser (in case we very specifically
-                            |                           |       | need an unmodified ArgumentParser for something).
-                            |                           |       |
         loghandlers         | [                         | (opt) | If the current logging setup does not suit your needs,
                             |   logging.Handler,        |       | you can build and submit your own formatted loghandlers.
                             |   logging.Handler,        |       | `-v` and `-vv` will operate on all submitted loghandlers
                             |   ...                     |       | as if they were built by this class.
                             | ]                         |       |
                             |                           |       |
+        log_signals         | True, False               | (opt) | SIGUSR1/SIGUSR2 increase/decrease the verbosity of the
+                            |                           |       | running program, SIGQUIT writes it's logging configuration
+                            |                           |       | to stderr. (see `supercli.logging.LogSignals`)
+                            |                           |       |
         *args,**kwds        |                           |       | Anything else gets passed directly to ArgumentParser()
                             |                           |       |
         """
@@ -320,11 +515,14 @@ class ArgumentParser(argparse.ArgumentParser):
         self.developer_opts     = developer_opts
 
         self.loghandlers        = loghandlers
+        self.log_signals        = log_signals
 
 
         ## Attributes
-        self.default_parser   = None
-        self.used_flags       = []   ## stores every flag that has already been used.
+        self.specs            = []   ## [(method, args, kwds)] of each add_argument()/add_subparsers() call (see `default_parser`)
+        self._default_parser_args = ( description, args, kwds )
+        self._default_parser  = None ## built from `specs` when it is first accessed
+        self._parent_parser   = None ## the parser this is a subparser of
 
         self.subparsers_obj   = None ## stores the subparsers obj if one exists
         self.devargs          = []
@@ -332,17 +530,9 @@ class ArgumentParser(argparse.ArgumentParser):
 
 
 
-        ## Default argparse.ArgumentParser instance
-        if _default_parser:
-            self.default_parser = _default_parser
-        else:
-            self.default_parser   = argparse.ArgumentParser(description=description,*args,**kwds )
-
-
         ## Validation
         self._validate_args()
 
-        description = colourize_text(description,helpline_lexer,helpline_formatter)
         super( ArgumentParser, self ).__init__(description=description,formatter_class=LegibleHelpFormatter,*args,**kwds )
         self._add_default_arguments()
 
@@ -351,25 +541,60 @@ class ArgumentParser(argparse.ArgumentParser):
             raise RuntimeError("Missing argument 'autocomp_cmd' ")
 
 
-    def add_argument(self,*args,**kwds):
-        """ reimplemented add_argument() method that colourizes text using Pygments """
+    def _get_formatter(self):
+        """ help is colourized using `helpline_lexer`/`helpline_formatter` when it is displayed """
+        return self.formatter_class(
+            prog      = self.prog,
+            lexer     = self.helpline_lexer,
+            formatter = self.helpline_formatter,
+        )
 
-        ## Default Parser
-        if (args,kwds) not in self.used_flags:
-            if args != ('-h','--help'):
-                self.default_parser.add_argument(*args,**kwds)
+    @property
+    def default_parser(self):
+        """
+        A vanilla argparse.ArgumentParser with the same arguments/subparsers as this parser
+        (in case we very specifically need an unmodified ArgumentParser, ex: `--default-parser`).
 
-        ## Readable Parser
-        if 'help' in kwds:
-            kwds['help']=colourize_text(
-                    text      = kwds['help'],
-                    lexer     = self.helpline_lexer,
-                    formatter = self.helpline_formatter
-                )
-        retval = super( ArgumentParser, self ).add_argument(*args,**kwds)
+        It is built from `specs` when it is first accessed, so that building
+        a parser does not also build (and mirror every argument to) a second parser.
+        It is rebuilt once an argument/subparser is added to this parser (or it's subparsers),
+        so changes made to it directly are discarded at that point.
+        """
+        if self._default_parser is None:
+            (description, args, kwds) = self._default_parser_args
+            self._default_parser = self._build_default_parser( argparse.ArgumentParser(description=description,*args,**kwds) )
+        return self._default_parser
+
+    def _clear_default_parser(self):
+        """
+        Discards the `default_parser` of this parser (and of the parsers it is a subparser of)
+        so it is rebuilt with the arguments added since.
+        """
+        parser = self
+        while parser is not None:
+            parser._default_parser = None
+            parser = parser._parent_parser
+
+    def _build_default_parser(self, default_parser):
+        """
+        Adds the arguments/subparsers recorded in `specs` to a vanilla argparse.ArgumentParser.
+        """
+        for (method, args, kwds) in self.specs:
+            if method == 'add_argument':
+                if args != ('-h','--help'):
+                    default_parser.add_argument(*args,**kwds)
+            else:
+                self.subparsers_obj._build_default_subparsers( default_parser, args, kwds )
+        return default_parser
+
+    def add_argument(self,*args,**kwds):
+        """ reimplemented add_argument() method that also records the argument for `default_parser` """
 
+        ## Readable Parser  (help is colourized by LegibleHelpFormatter, only when displayed)
+        retval = super( ArgumentParser, self ).add_argument(*args,**kwds)
 
-        self.used_flags.append( (args,kwds) )
+        self.specs.append( ('add_argument', args, kwds) )
+        self._clear_default_parser()
         return retval
 
 
@@ -380,7 +605,9 @@ class ArgumentParser(argparse.ArgumentParser):
             * colourizes text
         """
 
-        self.subparsers_obj = _SubparsersProxy(parser=self,default_parser=self.default_parser,*args,**kwds)
+        self.subparsers_obj = _SubparsersProxy(self,*args,**kwds)
+        self.specs.append( ('add_subparsers', args, kwds) )
+        self._clear_default_parser()
         return self.subparsers_obj
 
     def _add_default_arguments(self):
@@ -408,6 +635,12 @@ class ArgumentParser(argparse.ArgumentParser):
             action='store_true',
             )
 
+        self.add_argument(
+            '--log-level', help=('Sets the loglevel of specific loggers (and their children)\n'
+                                 'ex: ``--log-level mypkg.mymodule=DEBUG,chatty.lib=WARNING``'),
+            action='append', type=_module_levels_type, metavar='pkg.mod=DEBUG',
+            )
+
 
         if self.extended_logopts:
             self.add_argument(
@@ -426,6 +659,18 @@ class ArgumentParser(argparse.ArgumentParser):
                 action='store_true',
                 )
 
+            self.add_argument(
+                '--log-async', help=("Logrecords are queued, and written from a background thread.\n"
+                                     "(logging no longer blocks on terminal/file writes)"),
+                action='store_true',
+                )
+
+            self.add_argument(
+                '--log-json', help=("Each logrecord is written as a single-line JSON object\n"
+                                    "(time, level, logger, caller-info, message, exception, extra attrs)"),
+                action='store_true',
+                )
+
 
         return self
 
@@ -441,7 +686,7 @@ class ArgumentParser(argparse.ArgumentParser):
         ## flags. If self.developper_opts == False, (so these arguments are not added)
         ## the developer flags are still available (just hidden from the help menu)
         self.devargs = [
-            '--devlog','--pdb','--gen-autocomp','--default-parser'
+            '--devlog','--pdb','--gen-autocomp','--default-parser','--log-stats'
         ]
 
 
@@ -469,6 +714,11 @@ class ArgumentParser(argparse.ArgumentParser):
                     '--default-parser', help='Display unmodified argparse output (no colours, changed formatting, etc)',
                     action='store_true',
                 )
+                self.add_argument(
+                    '--log-stats', help=('Counts logged records, and times each loghandler.\n'
+                                         'A report is written to stderr on exit'),
+                    action='store_true',
+                )
                 self._extended_devargs_added = True
 
         return self
@@ -520,13 +770,21 @@ class ArgumentParser(argparse.ArgumentParser):
         ## parse default arguments, and return the arguments
         ## to the caller
         if flag_used('pdb'):
+            from .excepttools import wrap_excepthook_pdb_postmortem
             wrap_excepthook_pdb_postmortem()
 
+        ## atexit functions run in reverse order: the stats are written after the loghandlers
+        ## registered next (AsyncHandler, ThreadBufferedHandler, ...) have written their records
+        if flag_used('log_stats'):
+            atexit.register( dump_stats )
+
         if not self.loghandlers:
             self._build_loghandler(args)
         else:
             self._setup_user_loghandlers(args)
 
+        if flag_used('log_stats'):
+            enable_stats()
 
         if '--gen-autocomp' in cliargs:
             self.create_autocompleters( writepath=None )
@@ -559,16 +817,28 @@ class ArgumentParser(argparse.ArgumentParser):
         if flag_used('log_longformat'):
             logstr += 'l'
 
-        if flag_used('log_file'):
-            logfile = args.log_file
+        if flag_used('log_json'):
+            logstr += 'j'
+
+        if flag_used('logfile'):
+            logfile = args.logfile
 
         if flag_used('logfile_only'):
             logstream = False
 
-        SetLog( logstr, logfile=logfile, logstream=logstream )
+        SetLog(
+            logstr,
+            logfile       = logfile,
+            logstream     = logstream,
+            async_logging = flag_used('log_async'),
+            fanout        = flag_used('logfile'),
+            log_signals   = self.log_signals,
+            module_levels = _merge_module_levels( getattr(args, 'log_level', None) ),
+        )
 
     def _setup_user_loghandlers(self,args):
 
+        set_module_levels( _merge_module_levels( getattr(args, 'log_level', None) ) )
 
         if args.verbose or args.very_verbose:
 
@@ -583,6 +853,7 @@ class ArgumentParser(argparse.ArgumentParser):
 
 
     def create_autocompleters(self, writepath=None ):
+        from .autocomplete import ZshCompleter
         ZshCompleter( self, self.autocomp_cmd ).write( writepath )
 
 
@@ -591,17 +862,42 @@ class ArgumentParser(argparse.ArgumentParser):
 # Functions
 # =========
 
+def _module_levels_type( text ):
+    """
+    argparse `type` of --log-level ('pkg.mod=DEBUG,other=WARNING')
+    """
+    try:
+        return parse_module_levels( text )
+    except( ValueError ) as e:
+        raise argparse.ArgumentTypeError( str(e) )
+
+def _merge_module_levels( specs ):
+    """
+    Merges the loglevels of each use of --log-level.
+    """
+    levels = {}
+    for spec in ( specs or [] ):
+        levels.update( spec )
+    return levels
+
 #!TODO: validate lexer/formatter
-def colourize_text(text, lexer=RstLexer, formatter=TerminalFormatter):
+def colourize_text(text, lexer=RstHelpLexer, formatter=TerminalFormatter):
     """
-    Determine's terminal-environment to set pygments' formatter
-    then colourizes text using pygment's reStructuredText()
-    syntax highlighting capabilities.
+    Colourizes ReStructuredText for the terminal using `supercli.highlight`
+    (or a pygments lexer/formatter class, whose results are cached, see `colourize_cache`)
     """
-    if text:
+    if not text:
+        return text
+
+    if not uses_pygments( lexer, formatter ):
         return highlight( text, lexer(), formatter() )
 
-    return text
+    key    = colourize_cache.key( text, lexer, formatter )
+    retval = colourize_cache.get( key )
+    if retval is None:
+        retval = highlight( text, lexer(), formatter() )
+        colourize_cache.set( key, retval )
+    return retval
 
 
 
@@ -27,6 +27,9 @@ def wrap_excepthook_pdb_postmortem( force=False ):
     an unhandled exception occurs, pdb (or ipdb if available)
     starts automatically in post-mortem mode.
 
+    The exception is logged (after the records stored by flight-recorders,
+    see `supercli.logging.SetLog`) before pdb starts.
+
     concept taken from: http://stackoverflow.com/questions/8415463/adding-function-to-sys-excepthook
     """
     try:                    import ipdb as pdb
@@ -49,6 +52,7 @@ def wrap_excepthook_pdb_postmortem( force=False ):
 def logexcept( exc_info=None, lv='error', raise_except=True, handled=False ):
     """
     log an exception/traceback from sys.exc_info()
+    (after the records stored by flight-recorders, see `supercli.logging.SetLog`)
 
     _____________________________________________________________________________________
     INPUT:
@@ -67,6 +71,7 @@ def logexcept( exc_info=None, lv='error', raise_except=True, handled=False ):
     import traceback
     import sys
     import six
+    import supercli.logging
 
 
     ## Automatically grab exception info
@@ -74,6 +79,10 @@ def logexcept( exc_info=None, lv='error', raise_except=True, handled=False ):
         exc_info = sys.exc_info()
 
 
+    ## Write the records leading up to the exception
+    supercli.logging.dump_flight_recorders()
+
+
     ## Change message to not mislead user
     if handled:
         msg = 'Exception Encountered and Handled: \n'
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+"""
+Name :          supercli/highlight.py
+Created :       Oct 16 2026
+Author :        Will Pittman
+Contact :       willjpittman@gmail.com
+________________________________________________________________________________
+Description :   A small highlighter for the subset of ReStructuredText used in
+                help text (``literals``, `interpreted`, :role:`text`, *emphasis*,
+                section underlines, lists, directives).
+
+                It's output is approximately the same as pygments' `RstLexer` with
+                `TerminalFormatter` for that subset, without importing pygments.
+
+                    highlight( 'Sets ``opt``', RstHelpLexer(), TerminalFormatter() )
+
+                Pygments lexers/formatters are also accepted (in either slot), pygments
+                is only imported when one of them is used.
+
+                Known differences from pygments:
+
+                    * with current pygments, the output is only visually equivalent
+                      (the same characters get the same colours, but the escape
+                      sequences may be split/merged differently)
+                    * pygments colours an unterminated ``literal (no closing ``),
+                      RstHelpLexer leaves it uncoloured
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+import re
+## external
+import six
+
+
+loc = locals
+
+version = '1'   ## changes when the output of `RstHelpLexer`/`TerminalFormatter` changes
+
+
+class RstHelpLexer(object):
+    """
+    Splits the ReStructuredText used in help text into `(tokentype, text)` pairs,
+    following the rules of pygments' `RstLexer` for the subset it supports.
+
+    tokentypes are the names of pygments' tokentypes ('Literal.String', 'Name.Variable', ...)
+    """
+    name = 'RST (help)'
+
+    ## rules for the start of a line
+    _line_rules = re.compile(
+        r'^(?P<heading>\S[^\n]*\n(?:={3,}|-{3,}|`{3,}|:{3,}|\.{3,}|\'{3,}|"{3,}|~{3,}|\^{3,}|_{3,}|\*{3,}|\+{3,}|#{3,}))(?=\n)'
+        r'|^(?P<bullet_indent>[ \t]*)(?P<bullet>[-*+]|[0-9#]+\.)(?= [^\n])'
+        r'|^(?P<directive_start> *\.\.[ \t]*)(?P<directive>[\w-]+?)(?P<directive_end>::)',
+        re.MULTILINE,
+    )
+
+    ## rules within a line. Each rule starts with a literal character (so the regex-engine can
+    ## skip to the next candidate), and ends with an empty group naming it (`match.lastgroup`)
+    _inline_rules = re.compile(
+        r'\\.(?P<escape>)'
+        r'|``[^\n]+?``(?P<literal>)'
+        r'|`[^\n]+?<[^\n]+?>`__?(?P<link>)'
+        r'|`[^\n]+?`__?(?P<reference>)'
+        r'|`[^\n]+?`(?P<interpreted>)(?::[a-zA-Z0-9:-]+?:(?P<role_after>))?'
+        r'|:[a-zA-Z0-9:-]+?:(?P<role>)`[^\n]+?`(?P<role_interpreted>)'
+        r'|\*\*[^\n]+?\*\*(?P<strong>)'
+        r'|\*[^\n]+?\*(?P<emphasis>)'
+        r'|\[[^\n]*?\]_(?P<footnote>)'
+    )
+
+    _line_start_chars = frozenset( ' \t-*+#.0123456789' )
+    _underline_chars  = frozenset( '=-`:.\'"~^_*+#' )
+    _line_chars       = re.compile( '\n[%s]' % re.escape( ''.join(sorted( _line_start_chars | _underline_chars )) ) )
+
+    _line_groups = sorted( _line_rules.groupindex, key=_line_rules.groupindex.get )
+
+    ## {group: tokentype}  (groups of `_line_rules`. groups that are not listed are 'Text')
+    _line_tokentypes = {
+        'heading'          : 'Generic.Heading',
+        'bullet'           : 'Literal.Number',
+        'directive'        : 'Operator.Word',
+        'directive_start'  : 'Punctuation',
+        'directive_end'    : 'Punctuation',
+    }
+
+    ## {last-group: tokentype}  the token of each rule in `_inline_rules`
+    _inline_tokentypes = {
+        'escape'           : 'Text',
+        'literal'          : 'Literal.String',
+        'link'             : 'Literal.String',
+        'reference'        : 'Literal.String',
+        'interpreted'      : 'Name.Variable',
+        'strong'           : 'Generic.Strong',
+        'emphasis'         : 'Generic.Emph',
+        'footnote'         : 'Literal.String',
+    }
+
+    ## {last-group: (group, tokentype-before, tokentype-after)}  rules split into two tokens at `group`
+    _inline_split_tokentypes = {
+        'role_after'       : ( 'interpreted', 'Name.Variable',  'Name.Attribute' ),
+        'role_interpreted' : ( 'role',        'Name.Attribute', 'Name.Variable'  ),
+    }
+
+    def get_tokens(self, text):
+        """
+        Returns a list of `(tokentype, text)` for `text`.
+        (like pygments, leading/trailing newlines are removed, and the text ends with a newline)
+        """
+        text   = text.replace('\r\n', '\n').strip('\n') + '\n'
+        tokens = []
+        pos    = 0
+
+        ## line-rules are only tried at the start of lines that may be a
+        ## list-item/directive, or that are followed by a section-underline
+        start = 0
+        end   = len(text)
+        if not ( text[0] in self._line_start_chars  or  self._line_chars.search(text) ):
+            start = end
+
+        while start < end:
+            next_start = text.index( '\n', start ) + 1
+            if text[start] in self._line_start_chars  or  ( next_start < end and text[next_start] in self._underline_chars ):
+                match = self._line_rules.match( text, start )
+                if match:
+                    self._inline_tokens( text, pos, start, tokens )
+                    for (group, value) in zip( self._line_groups, match.groups() ):
+                        if value:
+                            tokens.append( (self._line_tokentypes.get( group, 'Text' ), value) )
+                    pos        = match.end()
+                    next_start = text.index( '\n', pos ) + 1
+            start = next_start
+
+        self._inline_tokens( text, pos, len(text), tokens )
+        return tokens
+
+    def _inline_tokens(self, text, pos, end, tokens):
+        """
+        Appends the tokens of `text[pos:end]` to `tokens`
+        """
+        tokentypes = self._inline_tokentypes
+
+        for match in self._inline_rules.finditer( text, pos, end ):
+            (start, match_end) = match.span()
+            if start > pos:
+                tokens.append( ('Text', text[ pos : start ]) )
+
+            rule = match.lastgroup
+            if rule in tokentypes:
+                tokens.append( (tokentypes[ rule ], text[ start : match_end ]) )
+            else:
+                (group, before, after) = self._inline_split_tokentypes[ rule ]
+                split = match.start( group )
+                tokens.append( (before, text[ start : split ]) )
+                tokens.append( (after,  text[ split : match_end ]) )
+            pos = match_end
+
+        if pos < end:
+            tokens.append( ('Text', text[ pos : end ]) )
+
+    def __repr__(self):
+        return '<%s>' % self.__class__.__name__
+
+
+class TerminalFormatter(object):
+    """
+    Formats `(tokentype, text)` pairs with the 8-colour ANSI codes used by
+    pygments' `TerminalFormatter` (light background).
+    """
+    name  = 'Terminal'
+    reset = '\033[39;49;00m'
+
+    ## {tokentype: ansi-code}  (a tokentype that is not listed uses the code of it's parent)
+    colours = {
+        'Text'             : '',
+        'Text.Whitespace'  : '\033[37m',
+        'Comment'          : '\033[37m',
+        'Keyword'          : '\033[34m',
+        'Operator.Word'    : '\033[35m',
+        'Name.Function'    : '\033[32m',
+        'Name.Variable'    : '\033[31m',
+        'Name.Constant'    : '\033[31m',
+        'Name.Attribute'   : '\033[36m',
+        'Name.Builtin'     : '\033[36m',
+        'Name.Tag'         : '\033[94m',
+        'Literal.String'   : '\033[33m',
+        'Literal.Number'   : '\033[34m',
+        'Generic.Heading'  : '\033[01m',
+        'Generic.Error'    : '\033[91m',
+    }
+
+    def __init__(self):
+        self._codes = {}   ## {tokentype: ansi-code}  (including parents)
+
+    def get_code(self, tokentype):
+        """
+        Returns the ANSI code for a tokentype (or it's nearest parent).
+        """
+        try:
+            return self._codes[ tokentype ]
+        except( KeyError ):
+            pass
+
+        name = tokentype
+        while name not in self.colours and '.' in name:
+            name = name.rsplit( '.', 1 )[0]
+        code = self._codes[ tokentype ] = self.colours.get( name, '' )
+        return code
+
+    def format_tokens(self, tokens):
+        """
+        Returns `(tokentype, text)` pairs as text with ANSI colours.
+        (each line is coloured separately, as pygments does)
+        """
+        out   = []
+        reset = self.reset
+        codes = self._codes
+        for (tokentype, value) in tokens:
+            code = codes.get( tokentype )
+            if code is None:
+                code = self.get_code( tokentype )
+            if not code:
+                out.append( value )
+            elif '\n' in value:
+                out.append( '\n'.join([ code + line + reset  if line else line  for line in value.split('\n') ]) )
+            else:
+                out.append( code + value + reset )
+        return ''.join( out )
+
+    def __repr__(self):
+        return '<%s>' % self.__class__.__name__
+
+
+def uses_pygments( lexer, formatter ):
+    """
+    True if a lexer/formatter class (or instance) requires pygments.
+    """
+    lexer     = lexer     if isinstance( lexer,     type ) else type(lexer)
+    formatter = formatter if isinstance( formatter, type ) else type(formatter)
+    return not ( issubclass( lexer, RstHelpLexer ) and issubclass( formatter, TerminalFormatter ) )
+
+def highlight( text, lexer, formatter ):
+    """
+    Same as `pygments.highlight()`, but `lexer` and/or `formatter`
+    may be a `RstHelpLexer`/`TerminalFormatter` instance.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    text       | 'Sets ``opt``'                                |       | text to highlight
+               |                                               |       |
+    lexer      | RstHelpLexer(), pygments.lexers.*()           |       | lexer instance
+               |                                               |       |
+    formatter  | TerminalFormatter(), pygments.formatters.*()  |       | formatter instance
+               |                                               |       |
+    """
+    if isinstance( lexer, RstHelpLexer ):
+        tokens = lexer.get_tokens( text )
+        if isinstance( formatter, TerminalFormatter ):
+            return formatter.format_tokens( tokens )
+
+        from pygments.token import string_to_tokentype
+        tokens = [ (string_to_tokentype( tokentype ), value)  for (tokentype, value) in tokens ]
+    else:
+        tokens = lexer.get_tokens( text )
+
+    if isinstance( formatter, TerminalFormatter ):
+        return formatter.format_tokens([ ( six.text_type(tokentype)[ len('Token.'): ], value )  for (tokentype, value) in tokens ])
+
+    import pygments
+    return pygments.format( tokens, formatter )
+
+
+
+if __name__ == '__main__':
+    pass
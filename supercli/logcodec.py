@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+"""
+Name :          supercli/logcodec.py
+Created :       Oct 16 2026
+Author :        Will Pittman
+Contact :       willjpittman@gmail.com
+________________________________________________________________________________
+Description :   A compact binary encoding of logrecords, and their (unformatted)
+                arguments. Used wherever records are stored or sent before they
+                are formatted (flight-recorder, binary logfiles, log collector).
+
+                Arguments that cannot be stored as-is are formatted into the
+                message when the record is encoded (see `encode_message()`).
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   numbers       import Integral, Real
+import logging
+import struct
+## external
+import six
+
+
+loc = locals
+
+_uint8   = struct.Struct( '<B' )
+_uint32  = struct.Struct( '<I' )
+_int32   = struct.Struct( '<i' )
+_int64   = struct.Struct( '<q' )
+_float64 = struct.Struct( '<d' )
+
+## fields of a logrecord that are encoded by `encode_record()` (in order)
+## (followed by the record's `extra` attributes, see `extra_attrs()`)
+record_fields = (
+    'name', 'levelno', 'pathname', 'lineno', 'funcName', 'created',
+    'process', 'threadName', 'msg', 'args', 'exc_text',
+)
+
+## attributes every logrecord has (anything else was added by `extra=`, filters, ...)
+_standard_attrs = frozenset( list(logging.makeLogRecord({}).__dict__) + ['message', 'asctime'] )
+_record_size    = len( logging.makeLogRecord({}).__dict__ )
+
+
+class Opaque(object):
+    """
+    Stands in for a log-argument that could not be encoded as-is.
+    It stores the text of `str(value)` which is used for both `%s` and `%r`.
+    """
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+    __unicode__ = __str__
+    __repr__    = __str__
+
+    def __eq__(self, other):
+        return isinstance( other, Opaque ) and other.text == self.text
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+# ======
+# Values
+# ======
+
+def encode_value( value, out, opaque=True ):
+    """
+    Appends the encoding of `value` to the list of bytes `out`.
+
+    None, bools, ints, floats, text, bytes, lists/tuples and dicts keep their type.
+    (small ints, short text and short tuples use a shorter encoding)
+    Other integral/real numbers are stored as ints/floats.
+    Anything else is stored as the text of `str(value)` (see `Opaque`),
+    or raises a TypeError if `opaque` is False.
+    """
+    if value is None:
+        out.append( b'N' )
+    elif value is True:
+        out.append( b'T' )
+    elif value is False:
+        out.append( b'F' )
+    elif isinstance( value, six.integer_types ):
+        if -2**31 <= value < 2**31:
+            out.append( b'j' + _int32.pack(value) )
+        elif -2**63 <= value < 2**63:
+            out.append( b'i' + _int64.pack(value) )
+        else:
+            data = str(value).encode('ascii')
+            out.append( b'I' + _uint32.pack(len(data)) + data )
+    elif isinstance( value, float ):
+        out.append( b'f' + _float64.pack(value) )
+    elif isinstance( value, six.text_type ):
+        data = value.encode( 'utf-8', 'surrogateescape' if six.PY3 else 'strict' )
+        if len(data) < 256:
+            out.append( b'c' + _uint8.pack(len(data)) + data )
+        else:
+            out.append( b's' + _uint32.pack(len(data)) + data )
+    elif isinstance( value, six.binary_type ):
+        out.append( b'b' + _uint32.pack(len(value)) + value )
+    elif isinstance( value, tuple ) and len(value) < 256:
+        out.append( b'p' + _uint8.pack(len(value)) )
+        for item in value:
+            encode_value( item, out, opaque )
+    elif isinstance( value, (tuple, list) ):
+        out.append( (b'l' if isinstance(value, list) else b't') + _uint32.pack(len(value)) )
+        for item in value:
+            encode_value( item, out, opaque )
+    elif isinstance( value, dict ):
+        out.append( b'd' + _uint32.pack(len(value)) )
+        for (key, item) in value.items():
+            encode_value( key,  out, opaque )
+            encode_value( item, out, opaque )
+    elif isinstance( value, Integral ):     ## (abstract types are checked last, they are slower to check)
+        encode_value( int(value), out )
+    elif isinstance( value, Real ):
+        out.append( b'f' + _float64.pack(float(value)) )
+    elif not opaque:
+        raise TypeError( 'cannot encode %s as-is' % type(value).__name__ )
+    else:
+        try:
+            text = six.text_type( value )
+        except Exception:
+            text = repr( value )
+        data = text.encode( 'utf-8', 'replace' )
+        out.append( b'o' + _uint32.pack(len(data)) + data )
+
+def decode_value( data, offset=0 ):
+    """
+    Decodes a value encoded by `encode_value()`.
+    Returns `(value, offset-after-value)`.
+    """
+    start   = offset
+    tag     = data[ offset : offset+1 ]
+    offset += 1
+
+    if tag == b'N':  return (None,  offset)
+    if tag == b'T':  return (True,  offset)
+    if tag == b'F':  return (False, offset)
+    if tag == b'j':  return ( _int32.unpack_from(data, offset)[0],   offset + 4 )
+    if tag == b'i':  return ( _int64.unpack_from(data, offset)[0],   offset + 8 )
+    if tag == b'f':  return ( _float64.unpack_from(data, offset)[0], offset + 8 )
+
+    if tag in (b'c', b'p'):
+        (length,) = _uint8.unpack_from( data, offset )
+        offset   += 1
+        tag       = b's' if tag == b'c' else b't'
+    else:
+        (length,) = _uint32.unpack_from( data, offset )
+        offset   += 4
+
+    if tag in (b't', b'l'):
+        items = []
+        for i in range(length):
+            (item, offset) = decode_value( data, offset )
+            items.append( item )
+        return ( (tuple(items) if tag == b't' else items), offset )
+
+    if tag == b'd':
+        items = {}
+        for i in range(length):
+            (key,  offset) = decode_value( data, offset )
+            (item, offset) = decode_value( data, offset )
+            items[key] = item
+        return (items, offset)
+
+    raw = bytes( data[ offset : offset+length ] )
+    end = offset + length
+
+    if tag == b's':  return ( raw.decode( 'utf-8', 'surrogateescape' if six.PY3 else 'strict' ), end )
+    if tag == b'b':  return ( raw, end )
+    if tag == b'I':  return ( int(raw.decode('ascii')), end )
+    if tag == b'o':  return ( Opaque(raw.decode('utf-8')), end )
+
+    raise ValueError( 'unknown tag %s at offset %s' % (repr(tag), start) )
+
+
+# =======
+# Records
+# =======
+
+def get_exc_text( record ):
+    """
+    Returns the formatted exception of a record (or None)
+    without modifying the record.
+    """
+    if record.exc_text:
+        return record.exc_text
+    if record.exc_info:
+        return logging.Formatter().formatException( record.exc_info )
+    return None
+
+def extra_attrs( record ):
+    """
+    Returns `{attr: value}` of a record's non-standard attributes (`extra=`, `stack`, ...)
+    and it's `stack_info` (if it has one).
+    """
+    attrs = record.__dict__
+    if len(attrs) == _record_size:
+        extra = {}
+    else:
+        extra = dict([ (attr, value)  for (attr, value) in attrs.items()  if attr not in _standard_attrs ])
+
+    if getattr( record, 'stack_info', None ):
+        extra['stack_info'] = record.stack_info
+    return extra
+
+def encode_message( record, out ):
+    """
+    Appends the encoding of a record's args to the list of bytes `out`, and returns it's msg.
+
+    If an argument cannot be encoded as-is (it would not keep it's type, and `%d`/`%.2f`/...
+    would fail once it is decoded), the message is formatted now: the formatted message
+    is returned, and empty args are encoded.
+    """
+    msg = record.msg
+    if not isinstance( msg, six.string_types ):
+        msg = six.text_type( msg )
+
+    args = []
+    try:
+        encode_value( record.args, args, opaque=False )
+    except( TypeError ):
+        args = []
+        try:
+            msg = record.getMessage()
+            encode_value( None, args )
+        except Exception:
+            ## the message cannot be formatted now either (it will fail the same way when it is decoded)
+            encode_value( record.args, args )
+
+    out.extend( args )
+    return msg
+
+def encode_record( record, out=None ):
+    """
+    Encodes the fields of a logrecord listed in `record_fields` (message is not formatted,
+    see `encode_message()`), and it's `extra_attrs()`.
+    Returns bytes.
+    """
+    if out is None:
+        out = []
+
+    args = []
+    msg  = encode_message( record, args )
+
+    for value in (
+            record.name, record.levelno, record.pathname, record.lineno, record.funcName, record.created,
+            record.process, record.threadName, msg,
+        ):
+        encode_value( value, out )
+    out.extend( args )
+    encode_value( get_exc_text(record), out )
+    encode_value( extra_attrs(record) or None, out )
+
+    return b''.join( out )
+
+def decode_record( data, offset=0 ):
+    """
+    Decodes a logrecord encoded by `encode_record()`.
+    Returns `(logging.LogRecord, offset-after-record)`.
+    """
+    attrs = {}
+    for field in record_fields:
+        (attrs[field], offset) = decode_value( data, offset )
+
+    (extra, offset) = decode_value( data, offset )
+    if extra:
+        for (attr, value) in extra.items():
+            attrs.setdefault( attr, value )
+
+    return ( make_record(attrs), offset )
+
+def make_record( attrs ):
+    """
+    Builds a logging.LogRecord from a dict of `record_fields`
+    (filling in the attributes derived from them)
+    """
+    import os
+
+    levelno  = attrs['levelno']
+    pathname = attrs['pathname'] or ''
+    created  = attrs['created']
+
+    attrs.update({
+        'levelname' : logging.getLevelName( levelno ),
+        'filename'  : os.path.basename( pathname ),
+        'module'    : os.path.splitext( os.path.basename(pathname) )[0],
+        'msecs'     : (created - int(created)) * 1000,
+        'exc_info'  : None,
+    })
+    if attrs.get('args') is None:
+        attrs['args'] = ()
+
+    return logging.makeLogRecord( attrs )
+
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,413 @@
+#!/usr/bin/env python
+"""
+Name :          supercli/logcollector.py
+Created :       Oct 16 2026
+Author :        Will Pittman
+Contact :       willjpittman@gmail.com
+________________________________________________________________________________
+Description :   Collects the logrecords of several processes over a Unix socket,
+                so that a single process writes the shared logfile/terminal.
+
+                    ## collector (writes the logfile)
+                    python -m supercli.logcollector /tmp/program.sock --logfile /var/log/program.log
+
+                    ## workers
+                    supercli.logging.SetLog( logcollector='/tmp/program.sock' )
+
+                Workers send batches of (unformatted) records. Each batch is a frame:
+
+                    <uint32 length> <record> <record> ...
+
+                where each record is encoded by `supercli.logcodec.encode_record()`.
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import collections
+import threading
+import logging
+import socket
+import struct
+import time
+import sys
+import os
+## custom
+from   .             import logcodec
+
+
+loc = locals
+
+_frame_header = struct.Struct( '<I' )   ## length of frame
+
+
+class CollectorHandler(logging.Handler):
+    """
+    Sends logrecords to a `LogCollector` (in another process) over a Unix socket.
+
+    Records are encoded when they are logged, and sent in batches. The batch is sent when any
+    of the following occur:
+
+        * `batch_size` records are waiting
+        * a record of `flush_level` or higher is logged
+        * `flush_interval` seconds have passed since the last send
+
+    If the collector cannot be reached, records are kept in a local buffer (and the connection is
+    retried every `reconnect_interval` seconds). Once the buffer holds `buffer_size` records, the oldest
+    records are written to `fallback_stream` instead (as they are when the handler is closed).
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    path               | '/tmp/program.sock'     |       | the collector's Unix socket
+                       |                         |       |
+    batch_size         | 256                     | (opt) | send once this many records are waiting
+                       |                         |       |
+    flush_interval     | 0.2                     | (opt) | max seconds records wait before they are sent. (None disables)
+                       |                         |       |
+    flush_level        | logging.WARNING         | (opt) | records of this level or higher are sent immediately
+                       |                         |       |
+    buffer_size        | 10000                   | (opt) | max number of records kept while the collector is unreachable
+                       |                         |       |
+    reconnect_interval | 1.0                     | (opt) | seconds between attempts to reconnect to the collector
+                       |                         |       |
+    fallback_stream    | sys.stderr, None        | (opt) | records that cannot be delivered are formatted and written here.
+                       |                         |       | (None drops them. see `dropped`)
+                       |                         |       |
+    """
+    record_attrs = frozenset( logcodec.record_fields )  ## the collector's formatter is unknown
+
+    def __init__(self, path, batch_size=256, flush_interval=0.2, flush_level=logging.WARNING,
+                 buffer_size=10000, reconnect_interval=1.0, fallback_stream=sys.stderr ):
+        logging.Handler.__init__(self)
+
+        ## Arguments
+        self.path               = path
+        self.batch_size         = batch_size
+        self.flush_interval     = flush_interval
+        self.flush_level        = flush_level
+        self.buffer_size        = buffer_size
+        self.reconnect_interval = reconnect_interval
+        self.fallback_stream    = fallback_stream
+
+        ## Attributes
+        self.dropped       = 0         ## number of records that could not be delivered (or written to fallback_stream)
+        self._sock         = None
+        self._connect_at   = 0         ## time of the next connection attempt
+        self._pending      = collections.deque()   ## encoded records waiting to be sent
+        self._last_flush   = time.time()
+        self._flusher      = None
+        self._stop_flusher = None
+
+        self._start_flusher()
+
+    def _start_flusher(self):
+        """
+        Sends the waiting records every `flush_interval` seconds, even if no records are logged.
+        """
+        if not self.flush_interval:
+            return
+
+        self._stop_flusher = threading.Event()
+
+        def flush_periodically():
+            while not self._stop_flusher.wait( self.flush_interval ):
+                if self._pending:
+                    self.flush()
+
+        self._flusher = threading.Thread( target=flush_periodically, name='supercli.logcollector.CollectorHandler' )
+        self._flusher.daemon = True
+        self._flusher.start()
+
+    @property
+    def connected(self):
+        return self._sock is not None
+
+    def emit(self, record):
+        try:
+            self._pending.append( logcodec.encode_record( record ) )
+
+            if any([
+                    len(self._pending) >= self.batch_size,
+                    record.levelno >= self.flush_level,
+                    self.flush_interval and time.time() - self._last_flush >= self.flush_interval,
+                ]):
+                self.flush()
+
+        except Exception:
+            self.handleError( record )
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._last_flush = time.time()
+            if not self._pending:
+                return
+
+            if self._sock is None and time.time() >= self._connect_at:
+                self._connect()
+
+            if self._sock is not None:
+                payload = b''.join( self._pending )
+                try:
+                    self._sock.sendall( _frame_header.pack(len(payload)) + payload )
+                    self._pending.clear()
+                except( socket.error, OSError ):
+                    self._disconnect()
+
+            while len(self._pending) > self.buffer_size:
+                self._fallback( self._pending.popleft() )
+        finally:
+            self.release()
+
+    def _connect(self):
+        sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+        try:
+            sock.connect( self.path )
+        except( socket.error, OSError ):
+            sock.close()
+            self._connect_at = time.time() + self.reconnect_interval
+            return
+        self._sock = sock
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except( socket.error, OSError ):
+                pass
+            self._sock = None
+        self._connect_at = time.time() + self.reconnect_interval
+
+    def _fallback(self, data):
+        """
+        Writes an encoded record that could not be delivered to `fallback_stream`.
+        """
+        if self.fallback_stream is None:
+            self.dropped += 1
+            return
+
+        (record, _) = logcodec.decode_record( data )
+        try:
+            self.fallback_stream.write( self.format(record) + '\n' )
+            self.fallback_stream.flush()
+        except Exception:
+            self.dropped += 1
+
+    def close(self):
+        ## stop flusher before acquiring the lock (it may be waiting on it)
+        if self._flusher:
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flusher = None
+
+        self.acquire()
+        try:
+            self._connect_at = 0
+            self.flush()
+            while self._pending:
+                self._fallback( self._pending.popleft() )
+            self._disconnect()
+            logging.Handler.close(self)
+        finally:
+            self.release()
+
+    def __repr__(self):
+        return '<%s %s (%s)>' % ( self.__class__.__name__, self.path, logging.getLevelName(self.level) )
+
+
+class LogCollector(object):
+    """
+    Listens on a Unix socket for logrecords sent by `CollectorHandler`s, and passes
+    them to the handlers of `logger` (the root logger, configured by `SetLog` by default).
+
+    Each connection is read by it's own thread. The handlers are only ever used from
+    this process, so writes to the logfile are never interleaved, and it is rotated by one process.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    path       | '/tmp/program.sock'   |       | path of the Unix socket. (an existing socket is replaced,
+               |                       |       | unless another collector is listening on it)
+               |                       |       |
+    logger     | None, logging.Logger  | (opt) | the logger whose handlers records are passed to.
+               |                       |       |
+    """
+    def __init__(self, path, logger=None):
+        ## Arguments
+        self.path   = path
+        self.logger = logger or logging.root
+
+        ## Attributes
+        self.received = 0      ## number of records received
+        self._sock    = None
+        self._thread  = None
+        self._clients = set()
+        self._lock    = threading.Lock()
+
+    def listen(self):
+        """
+        Binds the Unix socket.
+        """
+        if os.path.exists( self.path ):
+            probe = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+            try:
+                probe.connect( self.path )
+            except( socket.error, OSError ):
+                os.remove( self.path )   ## stale socket
+            else:
+                raise RuntimeError( 'a log-collector is already listening on: %s' % self.path )
+            finally:
+                probe.close()
+
+        self._sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+        self._sock.bind( self.path )
+        self._sock.listen( 128 )
+
+    def start(self):
+        """
+        Accepts connections from a background thread.
+        """
+        if self._sock is None:
+            self.listen()
+        self._thread = threading.Thread( target=self.serve_forever, name='supercli.logcollector.LogCollector' )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def serve_forever(self):
+        if self._sock is None:
+            self.listen()
+
+        while True:
+            try:
+                (client, _) = self._sock.accept()
+            except( socket.error, OSError ):
+                break   ## closed
+
+            with self._lock:
+                self._clients.add( client )
+            thread = threading.Thread( target=self._receive, args=(client,), name='supercli.logcollector.client' )
+            thread.daemon = True
+            thread.start()
+
+    def stop(self):
+        """
+        Stops listening, and disconnects all clients.
+        """
+        if self._sock is not None:
+            try:
+                self._sock.shutdown( socket.SHUT_RDWR )
+            except( socket.error, OSError ):
+                pass
+            self._sock.close()
+            self._sock = None
+            if os.path.exists( self.path ):
+                os.remove( self.path )
+
+        with self._lock:
+            for client in self._clients:
+                try:
+                    client.shutdown( socket.SHUT_RDWR )
+                except( socket.error, OSError ):
+                    pass
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _receive(self, client):
+        try:
+            while True:
+                header = _recv_exactly( client, _frame_header.size )
+                if header is None:
+                    return
+                (length,) = _frame_header.unpack( header )
+                payload   = _recv_exactly( client, length )
+                if payload is None:
+                    return
+
+                offset = 0
+                while offset < length:
+                    (record, offset) = logcodec.decode_record( payload, offset )
+                    self.received += 1
+                    self.logger.handle( record )
+        except Exception:
+            import traceback
+            sys.stderr.write( '--- supercli.logcollector: error receiving records ---\n' )
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._clients.discard( client )
+            client.close()
+
+
+def _recv_exactly( sock, size ):
+    """
+    Receives `size` bytes from a socket (or None if it was closed first).
+    """
+    chunks = []
+    while size:
+        try:
+            chunk = sock.recv( min(size, 1024 * 1024) )
+        except( socket.error, OSError ):
+            return None
+        if not chunk:
+            return None
+        chunks.append( chunk )
+        size -= len(chunk)
+    return b''.join( chunks )
+
+def main( argv=None ):
+    import argparse
+    from .logging import SetLog
+
+    parser = argparse.ArgumentParser(
+        prog        = 'python -m supercli.logcollector',
+        description = 'Writes the logrecords of processes using `SetLog(logcollector=...)` to a logfile/stderr',
+    )
+    parser.add_argument( 'path', metavar='/tmp/program.sock',
+        help='path of the Unix socket to listen on' )
+    parser.add_argument( '-lf', '--logfile', nargs='+', default=None, metavar='/var/log/program.log',
+        help='writes records to these logfiles' )
+    parser.add_argument( '--silent', action='store_true',
+        help='disables writing records to stderr' )
+    parser.add_argument( '-f', '--logfmt', default=None,
+        help="lineformat preset ('dev', 'long', 'json') or a lineformat ('%%(levelname)s %%(message)s')" )
+    parser.add_argument( '--logfile-size', type=int, default=1000000,
+        help='size in bytes logfiles are rotated at' )
+    parser.add_argument( '--logfile-backups', type=int, default=1,
+        help='number of rotated logfiles to keep' )
+    parser.add_argument( '--logfile-compress', choices=['gzip', 'zstd'], default=None,
+        help='compress rotated logfiles' )
+
+    args = parser.parse_args( argv )
+
+    ## records were already filtered by the sending processes
+    SetLog(
+        lv               = 1,
+        logfile          = args.logfile,
+        logstream        = not args.silent,
+        logfmt           = args.logfmt,
+        logfile_size     = args.logfile_size,
+        logfile_backups  = args.logfile_backups,
+        logfile_compress = args.logfile_compress,
+    )
+
+    ## logfiles are flushed when the interpreter exits
+    import signal
+    signal.signal( signal.SIGTERM, lambda signum, frame: sys.exit(0) )
+
+    collector = LogCollector( args.path )
+    collector.listen()
+    try:
+        collector.serve_forever()
+    except( KeyboardInterrupt ):
+        pass
+    finally:
+        collector.stop()
+
+
+
+if __name__ == '__main__':
+    main()
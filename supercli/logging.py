@@ -13,20 +13,30 @@ ________________________________________________________________________________
 from   __future__    import unicode_literals
 from   __future__    import absolute_import
 from   numbers       import Number
+import collections
+import itertools
+import abc
 import logging
-import traceback
+import threading
+import signal
+import heapq
+import errno
+import copy
 import sys
+import weakref
+import struct
+import time
 import re
 import os
 ## external
-import colorama
 import six
+## custom
+from   .             import logcodec
 
 
 loc = locals
 
 #!TODO: Whitelist should match functions like blacklist
-#!TODO: Whitelist and blacklist should be able to be used together
 #!TODO: Dynamic logging widget (standard log-system)
 #!TODO: Dynamic logging widget (interactive, bundles info,functions with logs)
 
@@ -35,33 +45,169 @@ loc = locals
 # Filters
 # =======
 
-class Whitelist(logging.Filter):
-    def __init__(self, whitelist):
-        import logging
-        self.whitelist = [ logging.Filter(entry)  for entry in whitelist ]
+@six.add_metaclass(abc.ABCMeta)
+class _CompiledFilter(logging.Filter):
+    """
+    Base-class for supercli's filters.
+
+    All patterns are compiled once (into a single regex), and the
+    allow/deny decision for each `(record.name, record.funcName)` is memoized
+    so that chatty call-sites only pay for a dict-lookup.
+
+    Subclasses implement `_decide(name, funcName)`.
+    """
+    cache_size = 4096   ## max number of memoized decisions before the cache is reset
+
+    def __init__(self):
+        logging.Filter.__init__(self)
+        self._cache = {}
 
     def filter(self, record):
-        return any( entry.filter(record) for entry in self.whitelist )
+        key = (record.name, record.funcName)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
 
+        decision = self._decide( record.name, record.funcName )
 
-class Blacklist(logging.Filter):
-    def __init__(self, blacklist ):
+        ## bounded: cheaper to start over than to track usage
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[key] = decision
+
+        return decision
+
+    @abc.abstractmethod
+    def _decide(self, name, funcName):
+        """
+        Returns True if records logged from `funcName` in logger `name` are allowed.
+        """
+
+    @staticmethod
+    def _compile_whitelist( entries ):
+        """
+        Compiles logger-names into a regex with the same semantics as
+        `logging.Filter(entry)`:  the logger itself, or any of its children.
+
+        Returns True instead of a regex if any entry allows everything,
+        and None if there are no entries (nothing is allowed).
+        """
+        if not entries:
+            return None
+        if any( entry == ''  for entry in entries ):
+            return True
+
+        return re.compile(
+            '(?:%s)(?:\\.|$)' % '|'.join( re.escape(entry)  for entry in entries )
+        )
+
+    @staticmethod
+    def _compile_blacklist( entries ):
+        """
+        Compiles entries into a regex matching `fnmatch.fnmatch( modpath, '*entry*' )`
+        (including the platform's case-normalization).
+
+        Returns None if there are no entries (nothing is blocked).
+        """
+        import fnmatch
 
+        if not entries:
+            return None
+        return re.compile(
+            '(?:%s)' % '|'.join(
+                fnmatch.translate( os.path.normcase('*%s*' % entry) )  for entry in entries
+            )
+        )
+
+
+class Whitelist(_CompiledFilter):
+    """
+    Only logs records whose logger-name is (or is a child of)
+    one of the entries.
+    """
+    record_attrs = frozenset()     ## logrecord attributes used by this filter
+    def __init__(self, whitelist):
+        _CompiledFilter.__init__(self)
+        self.whitelist = list(whitelist)
+        self._regex    = self._compile_whitelist( self.whitelist )
+
+    def _decide(self, name, funcName):
+        if self._regex is True:
+            return 1
+        if self._regex is None:
+            return 0
+        return int(bool( self._regex.match(name) ))
+
+
+class Blacklist(_CompiledFilter):
+    """
+    Logs records unless '<record.name>.<record.funcName>'
+    matches '*<entry>*' for any entry.
+    """
+    record_attrs = frozenset(['funcName'])
+    def __init__(self, blacklist ):
+        _CompiledFilter.__init__(self)
         self.blacklist = [ '*%s*' % entry   for entry in blacklist ]
+        self._regex    = self._compile_blacklist( blacklist )
 
-    def filter(self, record):
+    def _decide(self, name, funcName):
         """
         If filter does not match any entry in blacklist,
         then log it.
         """
-        import fnmatch
+        if self._regex is None:
+            return 1
+
+        record_modpath = os.path.normcase( '%s.%s' % (name, funcName) )
+
+        if self._regex.match( record_modpath ):
+            return 0
+        return 1
+
 
-        record_modpath = '%s.%s' % (record.name, record.funcName)
+class WhiteBlacklist(_CompiledFilter):
+    """
+    Whitelist and Blacklist used together. A record is logged
+    if it matches the whitelist, and does not match the blacklist.
 
-        match_found = False
-        for entry in self.blacklist:
-            if fnmatch.fnmatch( record_modpath, entry ):
-                match_found = True
+    Either list may be omitted.
+
+    .. code-block:: python
+
+        SetLog(
+            filter_type    = WhiteBlacklist,
+            filter_matches = {'whitelist':['myprogram'], 'blacklist':['myprogram.chatty']},
+        )
+    """
+    record_attrs = frozenset(['funcName'])
+
+    def __init__(self, filter_matches=None, whitelist=None, blacklist=None ):
+        _CompiledFilter.__init__(self)
+
+        if filter_matches:
+            whitelist = filter_matches.get('whitelist', whitelist)
+            blacklist = filter_matches.get('blacklist', blacklist)
+
+        self.whitelist = list( whitelist or [] )
+        self.blacklist = [ '*%s*' % entry   for entry in (blacklist or []) ]
+
+        if self.whitelist:  self._white_regex = self._compile_whitelist( self.whitelist )
+        else:               self._white_regex = True
+
+        if blacklist:       self._black_regex = self._compile_blacklist( blacklist )
+        else:               self._black_regex = None
+
+        if blacklist:       self.record_attrs = frozenset(['funcName'])
+        else:               self.record_attrs = frozenset()
+
+    def _decide(self, name, funcName):
+        if self._white_regex is not True:
+            if not self._white_regex.match(name):
+                return 0
+
+        if self._black_regex is not None:
+            if self._black_regex.match( os.path.normcase('%s.%s' % (name,funcName)) ):
                 return 0
 
         return 1
@@ -69,11 +215,1862 @@ class Blacklist(logging.Filter):
 
 
 
+class RateLimit(logging.Filter):
+    """
+    Limits the number of records logged from each call-site (logger-name, pathname, lineno)
+    using a token-bucket, so that a single log-call in a loop cannot flood the log.
+
+    Every `summary_interval` seconds, a summary record is logged for each call-site
+    that had records suppressed:  'suppressed 48213 similar records from /path/module.py:123'
+    (by a timer, if no other record is logged. The last summaries are logged by `close()`,
+    which runs when `SetLog` replaces the filter, and at exit)
+
+    One instance can be shared by several handlers (a record is only counted once).
+
+    .. code-block:: python
+
+        SetLog( filter_type=RateLimit )
+        SetLog( filter_type=RateLimit, filter_matches={'rate':1.0, 'burst':10, 'debug_sample':0.1} )
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    filter_matches   | None, {'rate':1.0, ...}   | (opt) | keyword-arguments for this filter
+                     |                           |       | (so it can be configured with SetLog's filter_matches)
+                     |                           |       |
+    rate             | 10.0                      | (opt) | records/second allowed for each call-site
+                     |                           |       |
+    burst            | 100                       | (opt) | max number of records logged at once from a call-site
+                     |                           |       | before it is rate-limited.
+                     |                           |       |
+    debug_sample     | None, 0.1                 | (opt) | if set, only this fraction of DEBUG records is logged
+                     |                           |       |
+    summary_interval | 30.0                      | (opt) | seconds between summaries of suppressed records
+                     |                           |       |
+    """
+    needs_matches = False       ## SetLog uses this filter even without filter_matches
+    record_attrs  = frozenset(['pathname','lineno'])
+    summary_msg   = 'suppressed %s similar records from %s:%s'
+
+    def __init__(self, filter_matches=None, rate=10.0, burst=100, debug_sample=None, summary_interval=30.0 ):
+        import threading
+        import random
+        logging.Filter.__init__(self)
+
+        if filter_matches:
+            rate             = filter_matches.get( 'rate',             rate )
+            burst            = filter_matches.get( 'burst',            burst )
+            debug_sample     = filter_matches.get( 'debug_sample',     debug_sample )
+            summary_interval = filter_matches.get( 'summary_interval', summary_interval )
+
+        ## Arguments
+        self.rate             = float(rate)
+        self.burst            = float(burst)
+        self.debug_sample     = debug_sample
+        self.summary_interval = summary_interval
+
+        ## Attributes
+        self._sites        = {}                 ## {(name,pathname,lineno): [tokens, last_time, num_suppressed, levelno]}
+        self._lock         = threading.Lock()
+        self._last         = (None, 1)          ## (last record, decision)  (shared by handlers)
+        self._next_summary = time.time() + summary_interval
+        self._random       = random.Random().random
+        self._timer        = None               ## logs the summaries if no other record is logged
+        self._closed       = False
+
+        _ratelimits.add( self )
+        _register_atexit_ratelimits()
+
+    def filter(self, record):
+        last = self._last
+        if last[0] is record:
+            return last[1]
+
+        if getattr( record, 'ratelimit_summary', False ):
+            return 1
+
+        decision   = self._decide( record )
+        self._last = (record, decision)
+
+        if record.created >= self._next_summary:
+            self.log_summaries()
+
+        return decision
+
+    def _decide(self, record):
+        if self.debug_sample is not None and record.levelno < logging.INFO:
+            if self._random() >= self.debug_sample:
+                return 0
+
+        key = (record.name, record.pathname, record.lineno)
+        now = record.created
+
+        with self._lock:
+            site = self._sites.get( key )
+            if site is None:
+                site = self._sites[key] = [ self.burst, now, 0, record.levelno ]
+
+            tokens  = min( self.burst, site[0] + (now - site[1]) * self.rate )
+            site[1] = now
+
+            if tokens >= 1:
+                site[0] = tokens - 1
+                return 1
+
+            site[0]  = tokens
+            site[2] += 1
+            site[3]  = record.levelno
+            if self._timer is None and not self._closed:
+                self._start_timer()
+            return 0
+
+    def _start_timer(self):
+        import threading
+
+        self._timer = threading.Timer( max( 0.0, self._next_summary - time.time() ), self._timed_summaries )
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _timed_summaries(self):
+        with self._lock:
+            self._timer = None
+        self.log_summaries()
+
+    def close(self):
+        """
+        Logs the summaries of the records suppressed since the last summary (and stops the timer).
+        """
+        with self._lock:
+            (timer, self._timer) = (self._timer, None)
+            self._closed = True
+        if timer is not None:
+            timer.cancel()
+        self.log_summaries()
+
+    def log_summaries(self):
+        """
+        Logs a summary record for each call-site that had records suppressed
+        since the last summary.
+        """
+        summaries = []
+        with self._lock:
+            self._next_summary = time.time() + self.summary_interval
+
+            for ( (name, pathname, lineno), site ) in self._sites.items():
+                if site[2]:
+                    summaries.append( (name, pathname, lineno, site[3], site[2]) )
+                    site[2] = 0
+
+        for (name, pathname, lineno, levelno, num_suppressed) in summaries:
+            logger = logging.getLogger( name )
+            record = logger.makeRecord(
+                name, levelno, pathname, lineno,
+                self.summary_msg, (num_suppressed, pathname, lineno), None,
+            )
+            record.ratelimit_summary = True
+            logger.handle( record )
+
+
+class LevelFilter(logging.Filter):
+    """
+    Filters records below the loglevel of their logger's nearest configured
+    parent in `levels` (or `default`). The loglevel of each logger-name is memoized.
+
+    Used in place of a handler's loglevel when records below it must still
+    reach the handler from some loggers. (ex: the flight-recorder enables DEBUG records
+    of every logger, but only `module_levels` should be written)
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    levels      | {'pkg.mod': logging.DEBUG}  |       | loglevels of loggers (and their children)
+                |                             |       |
+    default     | logging.INFO                |       | loglevel of all other loggers
+                |                             |       |
+    """
+    cache_size   = 4096         ## max number of memoized loglevels before the cache is reset
+    record_attrs = frozenset()
+
+    def __init__(self, levels, default):
+        logging.Filter.__init__(self)
+        self.levels  = dict(levels)
+        self.default = default
+        self._cache  = {}
+
+    def filter(self, record):
+        try:
+            level = self._cache[ record.name ]
+        except KeyError:
+            level = self._decide( record.name )
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[ record.name ] = level
+
+        return record.levelno >= level
+
+    def _decide(self, name):
+        while name:
+            if name in self.levels:
+                return self.levels[ name ]
+            name = name.rpartition('.')[0]
+        return self.default
+
+
+class StackInfoFilter(logging.Filter):
+    """
+    Adds the attribute `stack` to logrecords (used by the lineformat '%(stack)s').
+
+    Should be the last filter on it's handler, so that only records that pass the handler's
+    level and other filters pay for the stack-capture. The stack is only captured if the
+    handler's formatter uses '%(stack)s', and it is captured cheaply (code-object, lineno)
+    from the frame-chain. It is only formatted when the record is formatted.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    limit       | 5                     | (opt) | max number of frames to capture
+                |                       |       |
+    handler     | logging.Handler       | (opt) | the handler this filter is attached to. If provided,
+                |                       |       | the stack is only captured if it's formatter uses '%(stack)s'.
+                |                       |       | (for an AsyncHandler, if the formatter of one
+                |                       |       | of it's handlers uses it, and the record passes that handler's level)
+                |                       |       |
+    """
+    record_attrs = frozenset()
+
+    def __init__(self, limit=5, handler=None):
+        logging.Filter.__init__(self)
+        self.limit   = limit
+        self.handler = handler
+        self._formats_stack = {}     ## {formatter: formatter uses '%(stack)s'}
+
+    def filter(self, record):
+        if isinstance( getattr(record, 'stack', None), LazyStack ):
+            return 1
+
+        if self.handler is not None:
+            if not self._handler_formats_stack( self.handler, record ):
+                return 1
+
+        record.stack = LazyStack( capture_stack(self.limit) )
+        return 1
+
+    def _handler_formats_stack(self, handler, record):
+        for target in getattr( handler, 'handlers', [handler] ):
+            if record.levelno < target.level:
+                continue
+
+            formatter = target.formatter
+            try:
+                formats_stack = self._formats_stack[ formatter ]
+            except( KeyError ):
+                attrs = getattr( formatter, 'record_attrs', None )
+                if attrs is not None:
+                    formats_stack = 'stack' in attrs
+                else:
+                    formats_stack = '%(stack)' in ( getattr( formatter, '_fmt', None ) or '' )
+                if len(self._formats_stack) > 32:
+                    self._formats_stack.clear()
+                self._formats_stack[ formatter ] = formats_stack
+
+            if formats_stack:
+                return True
+        return False
+
+
+
+
+# ==========
+# Formatters
+# ==========
+
+class Formatter(logging.Formatter):
+    """
+    A faster `logging.Formatter` (for '%'-style lineformats).
+
+        * The lineformat is compiled once into a render function
+          (no '%'-dict interpolation for each record).
+
+        * The formatted `asctime` is cached per time-bucket. (If `datefmt` does
+          not display seconds, it is only formatted once a minute)
+
+        * `asctime` is only computed if the lineformat uses '%(asctime)s'
+
+    Like `logging.Formatter`, it sets `record.message` (and `record.asctime` if it is used),
+    and caches the formatted traceback in `record.exc_text`.
+    """
+    _field_regex   = re.compile( '%\\(([^)]+)\\)([#0+ -]*)(\\d*)(?:\\.(\\d+))?([diouxXeEfFgGcrsa])|%%' )
+    _seconds_regex = re.compile( '%[SsTcXr]' )  ## strftime directives that display seconds
+
+    def __init__(self, fmt=None, datefmt=None):
+        logging.Formatter.__init__(self, fmt, datefmt)
+
+        fmt = fmt or '%(message)s'
+
+        self._render        = self._compile( fmt )
+        self._uses_message  = '%(message)' in fmt
+        self._uses_asctime  = '%(asctime)' in fmt
+        self._asctime_cache = (None, None)    ## (time-bucket, formatted asctime)
+
+        if datefmt and not self._seconds_regex.search( datefmt ):
+            self._asctime_bucket = 60
+        else:
+            self._asctime_bucket = 1
+
+    @property
+    def record_attrs(self):
+        """ logrecord attributes used by this formatter """
+        return fmt_record_attrs( self._fmt )
+
+    @classmethod
+    def _compile(cls, fmt):
+        """
+        Compiles a '%'-style lineformat into a function `render(record, message, asctime)`
+        """
+        parts = []
+        pos   = 0
+        for match in cls._field_regex.finditer( fmt ):
+            if match.start() > pos:
+                parts.append( repr( fmt[ pos : match.start() ] ) )
+            pos = match.end()
+
+            if match.group(0) == '%%':
+                parts.append( repr('%') )
+                continue
+
+            (name, flags, width, precision, conversion) = match.groups()
+
+            if   name == 'message':  value = 'message'
+            elif name == 'asctime':  value = 'asctime'
+            elif re.match( '^[a-zA-Z_][a-zA-Z0-9_]*$', name ):
+                value = 'record.%s' % name
+            else:
+                value = 'getattr(record, %s)' % repr(name)
+
+            if conversion == 's' and not precision and flags in ('', '-'):
+                if name not in ('message','asctime'):
+                    value = '_str(%s)' % value
+                if   width and flags == '-':   value = '%s.ljust(%s)' % (value, width)
+                elif width:                    value = '%s.rjust(%s)' % (value, width)
+            else:
+                spec  = '%%%s%s%s%s' % ( flags, width, ('.'+precision if precision else ''), conversion )
+                value = '(%s %% (%s,))' % ( repr(spec), value )
+
+            parts.append( value )
+
+        if pos < len(fmt):
+            parts.append( repr( fmt[pos:] ) )
+
+        source = 'def render(record, message, asctime):\n    return %s\n' % ( ' + '.join(parts) or repr('') )
+        namespace = {'_str': six.text_type}
+        exec( source, namespace )
+        return namespace['render']
+
+    def _format_message(self, record):
+        """ returns `record.message` as it is written in the lineformat """
+        return record.message
+
+    def _format_asctime(self, record):
+        bucket = int( record.created // self._asctime_bucket )
+
+        (cached_bucket, asctime) = self._asctime_cache
+        if cached_bucket != bucket:
+            if self.datefmt:
+                asctime = self.formatTime( record, self.datefmt )
+            else:
+                asctime = time.strftime( self.default_time_format, self.converter(record.created) )
+            self._asctime_cache = (bucket, asctime)
+
+        if self.datefmt:
+            return asctime
+        return self.default_msec_format % ( asctime, record.msecs )
+
+    def format(self, record):
+        message = asctime = None
+        record.message = record.getMessage()
+        if self._uses_message:  message = self._format_message( record )
+        if self._uses_asctime:  asctime = record.asctime = self._format_asctime( record )
+
+        text = self._render( record, message, asctime )
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException( record.exc_info )
+        exc_text = record.exc_text
+        if exc_text:
+            if text[-1:] != '\n':
+                text += '\n'
+            text += exc_text
+
+        stack_info = getattr( record, 'stack_info', None )
+        if stack_info:
+            if text[-1:] != '\n':
+                text += '\n'
+            text += self.formatStack( stack_info )
+
+        return text
+
+    ## python-2.7 does not define these
+    default_time_format = '%Y-%m-%d %H:%M:%S'
+    default_msec_format = '%s,%03d'
+
+
+class ColourFormatter(Formatter):
+    """
+    Formatter that colourizes the logged message by severity using
+    ANSI escape-sequences. (colours borrowed from unutbu/sorin on stack-overflow)
+
+    The colour is only added to the formatted output, `record.message` is not coloured.
+    (so other handlers receive the original message)
+    """
+    level_colours = (       ## (min levelno, colour)
+        (50, '\x1b[31m'),   # red
+        (40, '\x1b[31m'),   # red
+        (30, '\x1b[33m'),   # yellow
+        (20, '\x1b[32m'),   # green
+        (10, '\x1b[35m'),   # pink
+    )
+    default_colour = '\x1b[0m'  # normal
+    reset          = '\x1b[0m'  # normal
+
+    def __init__(self, fmt=None, datefmt=None):
+        Formatter.__init__(self, fmt, datefmt)
+        self._level_prefixes = {}  ## {levelno: colour}
+
+        for levelno in (0,10,20,30,40,50):
+            self._level_prefixes[ levelno ] = self.colour( levelno )
+
+    def colour(self, levelno):
+        for (min_levelno, colour) in self.level_colours:
+            if levelno >= min_levelno:
+                return colour
+        return self.default_colour
+
+    def _format_message(self, record):
+        try:
+            prefix = self._level_prefixes[ record.levelno ]
+        except( KeyError ):
+            prefix = self._level_prefixes[ record.levelno ] = self.colour( record.levelno )
+
+        return prefix + record.message + self.reset
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each logrecord as a compact, single-line JSON object (JSON-lines),
+    for log indexing tools.
+
+    .. code-block:: javascript
+
+        {"time":"2016-09-04T17:21:03.042Z","level":"INFO","logger":"myprog.core",
+         "file":"/src/myprog/core.py","line":82,"func":"main","message":"hello",
+         "user":"will"}
+
+    Keys:
+        * time, level, logger, file, line, func, message (always)
+        * exc, stack_info  (if the record has an exception/stack_info)
+        * stack            (if `StackInfoFilter` added one)
+        * every attribute added to the record with `logger.log(..., extra={...})`
+          (except supercli's own, ex: `ratelimit_summary`)
+
+    `orjson` is used to serialize records if it is installed (otherwise `json`).
+    Values that cannot be serialized are written as text.
+    """
+    record_attrs = frozenset([ 'name', 'levelname', 'pathname', 'lineno', 'funcName', 'message', 'created', 'msecs', 'stack' ])
+    _msecs_text  = tuple([ '.%03dZ' % msecs  for msecs in range(1000) ])
+
+    def __init__(self, datefmt=None):
+        logging.Formatter.__init__(self, None, datefmt)
+        self._encode        = json_encoder()
+        self._asctime_cache = (None, None)  ## (second, formatted time)
+
+    def _format_time(self, record):
+        second = int( record.created )
+
+        (cached_second, asctime) = self._asctime_cache
+        if cached_second != second:
+            if self.datefmt:
+                asctime = self.formatTime( record, self.datefmt )
+            else:
+                asctime = time.strftime( '%Y-%m-%dT%H:%M:%S', time.gmtime(second) )
+            self._asctime_cache = (second, asctime)
+
+        if self.datefmt:
+            return asctime
+        return asctime + self._msecs_text[ int(record.msecs) ]
+
+    def format(self, record):
+        attrs = record.__dict__
+
+        ## (records logged in the same second reuse the formatted time)
+        (second, asctime) = self._asctime_cache
+        if self.datefmt or second != int( attrs['created'] ):
+            asctime = self._format_time( record )
+        else:
+            asctime = asctime + self._msecs_text[ int(attrs['msecs']) ]
+
+        message = attrs['message'] = record.getMessage()
+        data    = {
+            'time'    : asctime,
+            'level'   : attrs['levelname'],
+            'logger'  : attrs['name'],
+            'file'    : attrs['pathname'],
+            'line'    : attrs['lineno'],
+            'func'    : attrs['funcName'],
+            'message' : message,
+        }
+
+        if attrs['exc_info'] and not attrs['exc_text']:
+            record.exc_text = self.formatException( attrs['exc_info'] )
+        exc_text = attrs['exc_text']
+        if exc_text:
+            data['exc'] = exc_text
+
+        stack_info = attrs.get( 'stack_info' )
+        if stack_info:
+            data['stack_info'] = self.formatStack( stack_info )
+
+        ## `extra` attributes, and the `stack` (records without them have no additional attributes
+        ## except 'message', and 'asctime' if another formatter used it).
+        ## dicts keep their order (python-3.7+), so they follow the standard attributes
+        if len(attrs) > _logrecord_size + 1 + ( 'asctime' in attrs ):
+            keys = itertools.islice( attrs, _logrecord_size, None )  if _ordered_dicts else  attrs
+            for key in keys:
+                if key not in _json_skip_attrs:
+                    data[ key ] = attrs[ key ]
+
+            stack = attrs.get( 'stack' )
+            if stack is not None:
+                data['stack'] = six.text_type( stack )
+
+        return self._encode( data )
+
+
+
+
+# ========
+# Handlers
+# ========
+
+class FanoutHandler(logging.Handler):
+    """
+    Passes each logrecord to several handlers, formatting it once per distinct
+    formatter (and encoding it once per encoding) instead of once per handler.
+
+        * `BufferedRotatingFileHandler`s are given the encoded record (see `emit_encoded()`)
+        * `logging.StreamHandler`s are given the formatted text
+        * other handlers (binary logfiles, log-collector, ...) format/encode records themselves
+
+    Handlers that share a formatter share it's output. `SetLog` gives terminals their own
+    `ColourFormatter`, so colour codes are only written to terminals.
+
+    __NOTE__: each handler's level and filters are still applied. A filter that replaces
+              the message/args (ex: redaction) causes the record to be formatted again.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    handlers    | [ logging.Handler, ... ] | (opt) | the handlers records are passed to.
+                |                          |       |
+    """
+    def __init__(self, handlers=None):
+        logging.Handler.__init__(self)
+        self.handlers = list( handlers or [] )
+
+    def set_handlers(self, handlers):
+        """
+        Replaces the handlers records are passed to.
+        """
+        self.handlers = list(handlers)
+
+    def handle(self, record):
+        """
+        Each handler acquires it's own lock, so unlike `logging.Handler.handle()`
+        the handler-lock is not acquired.
+        """
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record):
+        self.dispatch( record )
+
+    def dispatch(self, record):
+        """
+        Passes a record to each handler.
+        """
+        self.write( record, self.prepare(record) )
+
+    def prepare(self, record):
+        """
+        Applies each handler's level/filters, and formats/encodes the record for it.
+        Returns `[(handler, write, data)]` (`write` is None for handlers that are passed the record).
+        """
+        prepared  = []
+        formatted = {}      ## {id(formatter): (msg, args, text, {(encoding, terminator): bytes})}
+        writers   = self._writers
+
+        for handler in self.handlers:
+            if record.levelno < handler.level:
+                continue
+
+            try:
+                writer = writers[ type(handler) ]
+            except( KeyError ):
+                writer = writers[ type(handler) ] = self._writer( handler )
+
+            ## instrumented handlers (see `enable_stats()`) are passed the record, so that it is counted
+            if writer is None or 'handle' in handler.__dict__:
+                prepared.append( (handler, None, None) )
+                continue
+
+            try:
+                if handler.filters and not handler.filter( record ):
+                    continue
+
+                formatter = handler.formatter or logging._defaultFormatter
+                entry     = formatted.get( id(formatter) )
+                if entry is None or entry[0] is not record.msg or entry[1] is not record.args:
+                    entry = ( record.msg, record.args, formatter.format(record), {} )
+                    formatted[ id(formatter) ] = entry
+
+                prepared.append( (handler, writer[1], writer[0](handler, entry)) )
+            except Exception:
+                handler.handleError( record )
+
+        return prepared
+
+    def write(self, record, prepared):
+        """
+        Writes a record prepared by `prepare()` to each handler.
+        """
+        for (handler, write, data) in prepared:
+            if write is None:
+                try:
+                    handler.handle( record )
+                except Exception:
+                    handler.handleError( record )
+                continue
+
+            try:
+                handler.acquire()
+                try:
+                    write( handler, record, data )
+                finally:
+                    handler.release()
+            except Exception:
+                handler.handleError( record )
+
+    _writers = {}   ## {handler-class: (encode, write)}
+
+    @classmethod
+    def _writer(cls, handler):
+        """
+        Returns the functions that encode/write a formatted record for `handler`
+        (or None if the handler formats records itself)
+        """
+        if getattr( type(handler), 'emit_encoded', None ) is not None:
+            return ( cls._encode_bytes, cls._write_bytes )
+        if type(handler) is logging.StreamHandler:
+            return ( cls._encode_text, cls._write_text )
+        return None
+
+    @staticmethod
+    def _encode_bytes( handler, entry ):
+        key  = ( handler.encoding, handler.terminator )
+        data = entry[3].get( key )
+        if data is None:
+            data = entry[3][ key ] = ( entry[2] + handler.terminator ).encode( handler.encoding )
+        return data
+
+    @staticmethod
+    def _write_bytes( handler, record, data ):
+        handler.emit_encoded( record, data )
+
+    @staticmethod
+    def _encode_text( handler, entry ):
+        return entry[2] + handler.terminator
+
+    @staticmethod
+    def _write_text( handler, record, data ):
+        handler.stream.write( data )
+        handler.flush()
+
+    def __repr__(self):
+        return '<%s %s (%s)>' % ( self.__class__.__name__, repr(self.handlers), logging.getLevelName(self.level) )
+
+
+class AsyncHandler(FanoutHandler):
+    """
+    Puts logrecords on a queue so that the calling thread only pays the cost
+    of enqueueing them. A background listener-thread drains the queue, and passes
+    each record to `handlers` (formatting, colourizing, writing, ...).
+    Records are formatted once per distinct formatter (see `FanoutHandler`).
+
+    __NOTE__: records are formatted on the listener-thread. Objects passed as
+              log-arguments should not be modified after they are logged.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    handlers    | [ logging.Handler, ... ] | (opt) | the handlers records are passed to from the listener-thread.
+                |                          |       |
+    queue_size  | 10000                    | (opt) | max number of records waiting in the queue.
+                |                          |       | (0 is unbounded)
+                |                          |       |
+    overflow    | 'block', 'drop'          | (opt) | What to do when the queue is full.
+                |                          |       |   block: the calling thread waits for room in the queue.
+                |                          |       |   drop:  the record is discarded (counted in `self.dropped`)
+                |                          |       |
+    """
+    _sentinel = None
+
+    def __init__(self, handlers=None, queue_size=10000, overflow='block' ):
+        FanoutHandler.__init__(self, handlers)
+
+        if overflow not in ('block','drop'):
+            raise ValueError( "expected 'block' or 'drop' for argument `overflow`. received: %s" % overflow )
+
+        ## Arguments
+        self.queue_size = queue_size
+        self.overflow   = overflow
+
+        ## Attributes
+        self.dropped    = 0
+        self._queue     = six.moves.queue.Queue( maxsize=queue_size )
+        self._thread    = None
+
+        self.start()
+
+    def start(self):
+        """
+        Starts the listener thread (if it is not already running)
+        """
+        import threading
+        import atexit
+
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread( target=self._listen, name='supercli.logging.AsyncHandler' )
+        self._thread.daemon = True
+        self._thread.start()
+
+        ## flush all queued records before the interpreter exits
+        atexit.register( self.stop )
+
+    def stop(self, timeout=5.0):
+        """
+        Handles all records remaining in the queue, then stops the listener thread.
+        Waits at most `timeout` seconds for room in the queue, and for the listener to finish.
+        (records logged afterwards are handled by the calling thread)
+
+        If the listener does not finish in time, it keeps running (and handling records).
+        """
+        thread = self._thread
+        if thread is None:
+            return
+
+        try:
+            self._queue.put_nowait( self._sentinel )
+        except( six.moves.queue.Full ):
+            try:
+                self._queue.put( self._sentinel, timeout=timeout )
+            except( six.moves.queue.Full ):
+                pass
+        thread.join( timeout )
+        if thread.is_alive():
+            return
+
+        self._thread = None
+        unregister_atexit( self.stop )
+
+        ## records queued after the sentinel
+        self._drain()
+
+    def emit(self, record):
+        if self._thread is None:
+            ## stopped (ex: closed by a reconfiguration, or at exit): nothing drains the queue
+            self.dispatch( record )
+            return
+
+        if self.overflow == 'block':
+            self._queue.put( record )
+        else:
+            try:
+                self._queue.put_nowait( record )
+            except( six.moves.queue.Full ):
+                self.dropped += 1
+
+        if self._thread is None:
+            ## (stopped while it was queued)
+            self._drain()
+
+    def _drain(self):
+        """
+        Handles the records left in the queue from the calling thread (once the listener has stopped).
+        """
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except( six.moves.queue.Empty ):
+                return
+            if record is self._sentinel:
+                continue
+            try:
+                self.dispatch( record )
+            except Exception:
+                self.handleError( record )
+
+    def close(self):
+        self.stop()
+        logging.Handler.close(self)
+
+    def _listen(self):
+        queue = self._queue
+
+        while True:
+            record = queue.get()
+            if record is self._sentinel:
+                break
+
+            ## an error in one record must not stop the listener (callers would block on a full queue)
+            try:
+                self.dispatch( record )
+            except Exception:
+                self.handleError( record )
+
+
+class ThreadBufferedHandler(FanoutHandler):
+    """
+    Each thread formats/encodes it's records for `handlers` (see `FanoutHandler.prepare()`)
+    into a buffer of it's own, without acquiring a shared lock. A background writer-thread
+    merges the buffers of all threads, and writes them to `handlers`.
+
+    Only the writer-thread acquires the lock of each handler, so threads of a thread-pool
+    do not wait on each other to log (the limiting factor on free-threaded builds).
+
+    The buffers are merged when any of the following occur:
+
+        * `flush_interval` seconds have passed since the last merge
+        * a thread's buffer holds `buffer_size` records
+        * a record of `flush_level` or higher is logged
+        * `flush()` is called (ex: `logging.shutdown()`)
+
+    Ordering:
+
+        * the records of one thread are written in the order they were logged.
+        * records merged together are written in the order of their timestamp (`record.created`).
+        * records are not held back for records of other threads that are not buffered yet,
+          so a record logged while the buffers are merged may be written after records of
+          another thread with a later timestamp (at most one merge later).
+
+    __NOTE__: records are formatted when they are logged, but written from the writer-thread.
+              Handlers that format records themselves (ex: binary logfiles) format them on the writer-thread.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    handlers       | [ logging.Handler, ... ] | (opt) | the handlers records are written to from the writer-thread.
+                   |                          |       |
+    flush_interval | 0.1                      | (opt) | max seconds records wait in a thread's buffer
+                   |                          |       |
+    flush_level    | logging.WARNING          | (opt) | records of this level or higher are written immediately
+                   |                          |       |
+    buffer_size    | 1000                     | (opt) | the buffers are merged once a thread has buffered this many records.
+                   |                          |       | (threads do not wait for the writer-thread, buffers are unbounded)
+                   |                          |       |
+    """
+    def __init__(self, handlers=None, flush_interval=0.1, flush_level=logging.WARNING, buffer_size=1000 ):
+        FanoutHandler.__init__(self, handlers)
+
+        ## Arguments
+        self.flush_interval = flush_interval
+        self.flush_level    = flush_level
+        self.buffer_size    = buffer_size
+
+        ## Attributes
+        self._local    = threading.local()
+        self._buffers  = []                 ## [(thread, deque), ...]  one per thread that logged
+        self._lock     = threading.Lock()   ## guards `_buffers`
+        self._merging  = threading.Lock()   ## held while merged records are written
+        self._wakeup   = threading.Event()
+        self._stopping = False
+        self._thread   = None
+
+        self.start()
+
+    def start(self):
+        """
+        Starts the writer thread (if it is not already running)
+        """
+        import atexit
+
+        if self._thread is not None:
+            return
+
+        self._stopping = False
+        self._thread = threading.Thread( target=self._listen, name='supercli.logging.ThreadBufferedHandler' )
+        self._thread.daemon = True
+        self._thread.start()
+
+        ## write all buffered records before the interpreter exits
+        atexit.register( self.stop )
+
+    def stop(self):
+        """
+        Writes all buffered records, then stops the writer thread.
+        (records logged afterwards are written by the calling thread)
+        """
+        if self._thread is None:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        unregister_atexit( self.stop )
+
+        ## records buffered while the writer-thread was stopping
+        self.flush()
+
+    def set_handlers(self, handlers):
+        """
+        Writes the buffered records (to the current handlers), then replaces the handlers.
+        """
+        self.flush()
+        FanoutHandler.set_handlers( self, handlers )
+
+    def emit(self, record):
+        prepared = self.prepare( record )
+        if not prepared:
+            return
+
+        if self._thread is None:
+            ## stopped (ex: closed by a reconfiguration, or at exit): nothing merges the buffers
+            self.write( record, prepared )
+            return
+
+        try:
+            buffer = self._local.buffer
+        except( AttributeError ):
+            buffer = self._add_buffer()
+
+        buffer.append( (record.created, buffer.thread_no, next(buffer.seq), record, prepared) )
+
+        if self._thread is None:
+            ## (stopped while it was buffered)
+            self.flush()
+        elif record.levelno >= self.flush_level or len(buffer) >= self.buffer_size:
+            self._wakeup.set()
+
+    def _add_buffer(self):
+        """
+        Creates the buffer of the calling thread.
+        """
+        buffer = _ThreadBuffer()
+        buffer.seq = itertools.count()
+
+        with self._lock:
+            buffer.thread_no = next( self._thread_nos )
+            self._buffers.append( (threading.current_thread(), buffer) )
+
+        self._local.buffer = buffer
+        return buffer
+
+    _thread_nos = itertools.count()
+
+    def flush(self):
+        """
+        Merges the buffers of all threads, and writes them to `handlers`.
+        """
+        with self._merging:
+            batches = []
+            with self._lock:
+                buffers = list( self._buffers )
+
+            for (thread, buffer) in buffers:
+                ## (records appended while draining are left for the next merge)
+                batch = [ buffer.popleft()  for i in range(len(buffer)) ]
+                if batch:
+                    batches.append( batch )
+                elif not thread.is_alive():
+                    with self._lock:
+                        self._buffers.remove( (thread, buffer) )
+
+            if len(batches) == 1:
+                merged = batches[0]
+            else:
+                merged = heapq.merge( *batches )
+
+            for (created, thread_no, seq, record, prepared) in merged:
+                self.write( record, prepared )
+
+            for handler in self.handlers:
+                handler.flush()
+
+    def close(self):
+        self.stop()
+        logging.Handler.close(self)
+
+    def _listen(self):
+        while not self._stopping:
+            self._wakeup.wait( self.flush_interval )
+            self._wakeup.clear()
+            self.flush()
+
+        self.flush()
+
+
+class _ThreadBuffer(collections.deque):
+    """
+    The records buffered by one thread (see `ThreadBufferedHandler`)
+    """
+    __slots__ = ('thread_no', 'seq')
+
+
+
+class BufferedRotatingFileHandler(logging.Handler):
+    """
+    A replacement for `logging.handlers.RotatingFileHandler` that keeps
+    encoded records in a memory-buffer, and writes them to the logfile in large batches.
+
+    The buffer is written when any of the following occur:
+
+        * the buffer exceeds `buffer_size` bytes
+        * `flush_interval` seconds have passed since the last write
+        * a record of `flush_level` or higher is logged
+
+    The size of the logfile is tracked in memory, so deciding
+    when to rotate the logfile does not require a stat/seek per record.
+
+    Logfiles can be rotated by size and/or age. Rotated logfiles can be compressed
+    (gzip, or zstd if the `zstandard` module is installed). Compression (and the renaming of
+    backups) happens in a background thread, so logging does not stall during a rotation.
+
+    If `index` is enabled, each time the buffer is written the offsets of it's records
+    (by time, level and logger name) are appended to a sidecar index ('program.log.idx').
+    see `supercli.logquery`.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    filename       | '/var/log/program.log' |       | the file to log to
+                   |                        |       |
+    maxBytes       | 1000000                | (opt) | the logfile is rotated before it grows beyond this size.
+                   |                        |       | (0 never rotates)
+                   |                        |       |
+    backupCount    | 1                      | (opt) | number of rotated logfiles to keep ('program.log.1', ...).
+                   |                        |       | (0 never rotates)
+                   |                        |       |
+    rotate_interval| None, 86400            | (opt) | the logfile is rotated once it is this many seconds old.
+                   |                        |       |
+    compress       | None, 'gzip', 'zstd'   | (opt) | compress rotated logfiles ('program.log.1.gz', ...)
+                   |                        |       |
+    buffer_size    | 65536                  | (opt) | write the buffer once it contains this many bytes.
+                   |                        |       | (0 writes every record)
+                   |                        |       |
+    flush_interval | 1.0                    | (opt) | max seconds records wait in the buffer. (None disables)
+                   |                        |       |
+    flush_level    | logging.WARNING        | (opt) | records of this level or higher are written immediately
+                   |                        |       |
+    encoding       | 'utf-8'                | (opt) | encoding used to write the logfile
+                   |                        |       |
+    index          | False, True            | (opt) | maintain a sidecar index of the logfile
+                   |                        |       | ('program.log.idx') for `supercli.logquery`.
+                   |                        |       |
+    """
+    terminator = '\n'
+
+    compressors = {     ## {compress: file-extension}
+        'gzip' : '.gz',
+        'zstd' : '.zst',
+    }
+
+    def __init__(self, filename, maxBytes=0, backupCount=1, buffer_size=65536,
+                 flush_interval=1.0, flush_level=logging.WARNING, encoding='utf-8',
+                 rotate_interval=None, compress=None, index=False ):
+        logging.Handler.__init__(self)
+
+        if compress not in [None] + list(self.compressors):
+            raise ValueError( 'expected one of %s for argument `compress`. received: %s' % (
+                repr([None] + sorted(self.compressors)), compress ) )
+        if compress == 'zstd':
+            import zstandard  ## raise ImportError now instead of during rotation
+
+        ## Arguments
+        self.baseFilename   = os.path.abspath( filename )
+        self.maxBytes       = maxBytes
+        self.backupCount    = backupCount
+        self.rotate_interval = rotate_interval
+        self.compress       = compress
+        self.buffer_size    = buffer_size
+        self.flush_interval = flush_interval
+        self.flush_level    = flush_level
+        self.encoding       = encoding
+        self.index          = index
+
+        ## Attributes
+        self.stream      = None
+        self._index      = _LogIndexWriter( self.baseFilename )  if index else  None
+        self._buffer     = []     ## encoded records waiting to be written
+        self._buffered   = 0      ## bytes in self._buffer
+        self._size       = 0      ## bytes in logfile (including self._buffer)
+        self._last_flush = time.time()
+        self._flusher    = None
+        self._stop_flusher = None
+        self._rollover_at  = None
+
+        if rotate_interval:
+            if os.path.isfile( self.baseFilename ):
+                self._rollover_at = os.path.getmtime( self.baseFilename ) + rotate_interval
+            else:
+                self._rollover_at = time.time() + rotate_interval
+
+        self._open()
+        self._start_flusher()
+
+        ## logfiles whose rotation was interrupted (ex: process was killed)
+        if compress:
+            for pending in _rotation_worker.find_pending( self.baseFilename ):
+                _rotation_worker.rotate( pending, self.baseFilename, backupCount, self.compressors[compress] )
+
+    def _open(self):
+        self.stream = open( self.baseFilename, 'ab' )
+        self._size  = self.stream.tell() + self._buffered
+        if self._index:
+            self._index.open()
+
+    def _start_flusher(self):
+        """
+        Writes the buffer every `flush_interval` seconds, even if no records are logged.
+        """
+        import threading
+
+        if not self.flush_interval:
+            return
+
+        self._stop_flusher = threading.Event()
+
+        def flush_periodically():
+            while not self._stop_flusher.wait( self.flush_interval ):
+                if self._buffer:
+                    self.flush()
+
+        self._flusher = threading.Thread( target=flush_periodically, name='supercli.logging.BufferedRotatingFileHandler' )
+        self._flusher.daemon = True
+        self._flusher.start()
+
+    def _encode(self, record):
+        """
+        Returns the bytes that will be written to the logfile for `record`.
+        """
+        return ( self.format(record) + self.terminator ).encode( self.encoding )
+
+    def emit(self, record):
+        try:
+            data = self._encode( record )
+
+            if self.shouldRollover( len(data), record.created ):
+                self.doRollover()
+                data = self._encode( record )   ## (encoding may depend on the logfile)
+
+            self._append( record, data )
+
+        except Exception:
+            self.handleError( record )
+
+    def emit_encoded(self, record, data):
+        """
+        Writes a record that was already formatted/encoded (by a `FanoutHandler`).
+        """
+        try:
+            if self.shouldRollover( len(data), record.created ):
+                self.doRollover()
+            self._append( record, data )
+
+        except Exception:
+            self.handleError( record )
+
+    def _append(self, record, data):
+        if self._index:
+            self._index.add( self._size, record )
+
+        self._buffer.append( data )
+        self._buffered += len(data)
+        self._size     += len(data)
+
+        ## (`record.created` is used as the current time)
+        if ( self._buffered >= self.buffer_size
+                or record.levelno >= self.flush_level
+                or ( self.flush_interval and record.created - self._last_flush >= self.flush_interval ) ):
+            self.flush()
+
+    def shouldRollover(self, nbytes, now=None):
+        if self.backupCount <= 0 or self._size == 0:
+            return False
+
+        if self.maxBytes > 0  and  self._size + nbytes >= self.maxBytes:
+            return True
+
+        if self._rollover_at is not None:
+            if (now or time.time()) >= self._rollover_at:
+                return True
+
+        return False
+
+    def doRollover(self):
+        """
+        Writes the buffer, then rotates 'program.log' to 'program.log.1' (and so on).
+
+        If compressing, the logfile is renamed and a background thread
+        compresses it and rotates the backups.
+        """
+        self.flush()
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if self._index:
+            self._index.close()
+
+        if self.rotate_interval:
+            self._rollover_at = time.time() + self.rotate_interval
+
+        if self.compress:
+            if os.path.exists( self.baseFilename ):
+                pending = _rotation_worker.pending_name( self.baseFilename )
+                rename_logfile( self.baseFilename, pending )
+                _rotation_worker.rotate( pending, self.baseFilename, self.backupCount, self.compressors[self.compress] )
+            self._open()
+            return
+
+        for i in range( self.backupCount -1, 0, -1 ):
+            src = '%s.%s' % (self.baseFilename, i)
+            dst = '%s.%s' % (self.baseFilename, i+1)
+            if os.path.exists( src ):
+                rename_logfile( src, dst )
+
+        dst = '%s.1' % self.baseFilename
+        if os.path.exists( self.baseFilename ):
+            rename_logfile( self.baseFilename, dst )
+        else:
+            remove_logfile( dst )
+
+        self._open()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer and self.stream:
+                self.stream.write( b''.join(self._buffer) )
+                self.stream.flush()
+                self._buffer   = []
+                self._buffered = 0
+                if self._index:
+                    self._index.write_block( self._size )
+            self._last_flush = time.time()
+        finally:
+            self.release()
+
+    def close(self):
+        ## stop flusher before acquiring the lock (it may be waiting on it)
+        if self._flusher:
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flusher = None
+
+        self.acquire()
+        try:
+            self.flush()
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            if self._index:
+                self._index.close()
+            logging.Handler.close(self)
+        finally:
+            self.release()
+
+    def __repr__(self):
+        return '<%s %s (%s)>' % ( self.__class__.__name__, self.baseFilename, logging.getLevelName(self.level) )
+
+
+
+
+class BinaryLogHandler(BufferedRotatingFileHandler):
+    """
+    Writes logrecords to a binary logfile without formatting them.
+    Messages are formatted when the logfile is read (see `supercli.logview`)
+
+    .. code-block:: bash
+
+        python -m supercli.logview /var/log/program.binlog --logfmt dev
+
+    Each record is written as a 9-byte header (an interned call-site id, timestamp in milliseconds,
+    level) and it's raw arguments (see `supercli.logcodec`). The call-site (logger name, caller-info,
+    and the unformatted message) is written once per segment of the logfile, the first time it is used.
+    A segment starts each time the logfile is opened.
+
+    Rotation/Buffering/Compression are the same as `BufferedRotatingFileHandler`.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    filename       | '/var/log/program.binlog' |       | the file to log to
+                   |                           |       |
+    caller_info    | True, False               | (opt) | store caller-info (pathname, lineno, funcName).
+                   |                           |       | (disabling it lets `SetLog` skip the stack-walk per record)
+                   |                           |       |
+    max_sites      | 65536                     | (opt) | max number of interned call-sites per segment. (once
+                   |                           |       | exceeded, a new segment is started. max 65536)
+                   |                           |       |
+    **kwargs       | maxBytes=1000000, ...     | (opt) | see `BufferedRotatingFileHandler`
+                   |                           |       |
+    """
+    magic           = b'SCLIBL01'
+    _segment_header = struct.Struct( '<8sd' )    ## magic, time (call-site ids are reset)
+    _record_header  = struct.Struct( '<cHiH' )   ## tag, call-site id, msecs since segment time, levelno
+    _site_header    = struct.Struct( '<cH' )     ## tag, call-site id
+
+    emit_encoded    = None   ## records are not formatted (see `FanoutHandler`)
+
+    def __init__(self, filename, caller_info=True, max_sites=65536, **kwargs ):
+        if not 0 < max_sites <= 65536:
+            raise ValueError( 'expected a value between 1 and 65536 for argument `max_sites`. received: %s' % max_sites )
+
+        self.caller_info = caller_info
+        self.max_sites   = max_sites
+        self._sites      = {}   ## {(msg, name, pathname, lineno, funcName): call-site id}
+        self._time       = 0.0  ## time of the current segment
+        BufferedRotatingFileHandler.__init__(self, filename, **kwargs )
+
+    @property
+    def record_attrs(self):
+        if self.caller_info:
+            return frozenset([ 'name', 'pathname', 'lineno', 'funcName' ])
+        return frozenset([ 'name' ])
+
+    def _open(self):
+        BufferedRotatingFileHandler._open(self)
+        self._start_segment( time.time() )
+
+    def _start_segment(self, now):
+        data        = self._segment_header.pack( self.magic, now )
+        self._sites = {}
+        self._time  = now
+        self._buffer.append( data )
+        self._buffered += len(data)
+        self._size     += len(data)
+
+    def _encode(self, record):
+        args = []
+        msg  = logcodec.encode_message( record, args )   ## (formatted if the args cannot be stored as-is)
+
+        if self.caller_info:  key = ( msg, record.name, record.pathname, record.lineno, record.funcName )
+        else:                 key = ( msg, record.name, None, None, None )
+
+        msecs = int( (record.created - self._time) * 1000 )
+        if not -2**31 <= msecs < 2**31:
+            self._start_segment( record.created )
+            msecs = 0
+
+        out = []
+        try:
+            site = self._sites[ key ]
+        except( KeyError ):
+            if len(self._sites) >= self.max_sites:
+                self._start_segment( record.created )
+                msecs = 0
+            site = self._sites[ key ] = len(self._sites)
+            out.append( self._site_header.pack( b'C', site ) )
+            logcodec.encode_value( key, out )
+
+        if record.exc_info or record.exc_text:
+            out.append( self._record_header.pack( b'E', site, msecs, record.levelno ) )
+            out.extend( args )
+            logcodec.encode_value( logcodec.get_exc_text(record), out )
+        else:
+            out.append( self._record_header.pack( b'R', site, msecs, record.levelno ) )
+            out.extend( args )
+
+        return b''.join( out )
+
+    @classmethod
+    def read(cls, data):
+        """
+        Yields the logrecords stored in the bytes (or mmap) of a binary logfile.
+        A record that was only partially written (at the end of the file) is ignored,
+        a record whose call-site is missing is yielded with the logger-name '?' and it's raw args.
+        """
+        sites  = {}
+        now    = 0.0
+        offset = 0
+        end    = len(data)
+        size   = cls._record_header.size
+
+        while offset < end:
+            try:
+                tag = data[ offset : offset+1 ]
+
+                if tag == cls.magic[:1]:
+                    (magic, now) = cls._segment_header.unpack_from( data, offset )
+                    if magic != cls.magic:
+                        raise IOError( 'not a supercli binary logfile (offset %s)' % offset )
+                    sites   = {}
+                    offset += cls._segment_header.size
+
+                elif tag == b'C':
+                    (_, site)      = cls._site_header.unpack_from( data, offset )
+                    (key, offset)  = logcodec.decode_value( data, offset + cls._site_header.size )
+                    sites[site]    = key
+
+                elif tag in (b'R', b'E'):
+                    (_, site, msecs, levelno) = cls._record_header.unpack_from( data, offset )
+                    (args, offset) = logcodec.decode_value( data, offset + size )
+                    exc_text = None
+                    if tag == b'E':
+                        (exc_text, offset) = logcodec.decode_value( data, offset )
+
+                    if offset > end:
+                        return
+
+                    if site in sites:
+                        (msg, name, pathname, lineno, funcName) = sites[ site ]
+                    else:
+                        ## the call-site was not written (ex: part of the file is missing)
+                        (msg, name, pathname, lineno, funcName) = ( 'unknown call-site %s: %r', '?', None, None, None )
+                        args = ( site, args )
+                    yield logcodec.make_record({
+                        'name'       : name,
+                        'levelno'    : levelno,
+                        'pathname'   : pathname,
+                        'lineno'     : lineno,
+                        'funcName'   : funcName,
+                        'created'    : now + msecs / 1000.0,
+                        'msg'        : msg,
+                        'args'       : args,
+                        'exc_text'   : exc_text,
+                        'process'    : None,
+                        'threadName' : None,
+                    })
+
+                else:
+                    raise IOError( 'corrupt supercli binary logfile (offset %s)' % offset )
+
+            except( struct.error, ValueError ):
+                ## truncated record (still being written)
+                return
+
+
+class FlightRecorderHandler(logging.Handler):
+    """
+    Keeps the most recent logrecords (unformatted) in a preallocated ring-buffer.
+    The records are only formatted when they are dumped, which happens when
+    `supercli.excepttools.logexcept()` runs (including the `--pdb` excepthook),
+    or on demand (see `dump()`, `dump_flight_recorders()`).
+
+    This lets you keep DEBUG records around in production, and only pay to write them
+    when something has gone wrong.
+
+    If `path` is provided, the ring-buffer is a memory-mapped file, so
+    it survives hard crashes. (read it with `FlightRecorderHandler.read(path)`)
+    An existing file (ex: written by a process that crashed, before it was restarted)
+    is kept as `path + '.prev'` (see `previous_path`).
+
+    Each record is stored in a fixed-size slot (records that do not fit are
+    stored with their message formatted, and truncated).
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    capacity    | 5000                      | (opt) | max number of records kept
+                |                           |       |
+    max_bytes   | None, 4*1024*1024         | (opt) | if provided, capacity is the number of slots that fit in `max_bytes`
+                |                           |       |
+    slot_size   | 512                       | (opt) | bytes reserved for each record
+                |                           |       |
+    path        | None, '/tmp/program.ring' | (opt) | memory-map this file instead of anonymous memory
+                |                           |       |
+    target      | [ logging.Handler, ... ]  | (opt) | handlers records are written to when dumped
+                |                           |       |
+    """
+    magic        = b'SCLIFR02'
+    _file_header = struct.Struct( '<8sII' )     ## magic, slot_size, capacity
+    _slot_header = struct.Struct( '<QI' )       ## sequence-number, length
+    record_attrs = frozenset()                  ## stores caller-info only if it is enabled by other handlers
+
+    def __init__(self, capacity=5000, max_bytes=None, slot_size=512, path=None, target=None ):
+        import mmap
+        logging.Handler.__init__(self)
+
+        if max_bytes:
+            capacity = max( 1, (max_bytes - self._file_header.size) // slot_size )
+
+        ## Arguments
+        self.capacity  = capacity
+        self.slot_size = slot_size
+        self.path      = path
+        self.target    = list( target or [] )
+
+        ## Attributes
+        self._seq   = 0
+        self._fd    = None
+        size        = self._file_header.size + capacity * slot_size
+
+        if path:
+            if os.path.isfile( path ):
+                getattr( os, 'replace', os.rename )( path, self.previous_path( path ) )
+            self._fd = open( path, 'w+b' )
+            self._fd.truncate( size )
+            self._mmap = mmap.mmap( self._fd.fileno(), size )
+        else:
+            self._mmap = mmap.mmap( -1, size )
+
+        self._mmap[ 0 : self._file_header.size ] = self._file_header.pack( self.magic, slot_size, capacity )
+
+        _flight_recorders.add( self )
+
+    def emit(self, record):
+        try:
+            data     = logcodec.encode_record( record )
+            max_size = self.slot_size - self._slot_header.size
+
+            if len(data) > max_size:
+                data = self._encode_truncated( record, max_size )
+
+            self._seq += 1
+            offset = self._file_header.size + ((self._seq - 1) % self.capacity) * self.slot_size
+            start  = offset + self._slot_header.size
+
+            ## the sequence-number is written last, so a torn write is never read
+            self._mmap[ offset : start ]             = self._slot_header.pack( 0, len(data) )
+            self._mmap[ start : start + len(data) ]  = data
+            self._mmap[ offset : offset + 8 ]        = struct.pack( '<Q', self._seq )
+
+        except Exception:
+            self.handleError( record )
+
+    def _encode_truncated(self, record, max_size):
+        """
+        Encodes a record whose message is formatted, and truncated to fit within `max_size`.
+        """
+        record = logging.makeLogRecord( dict(record.__dict__) )
+        msg    = record.getMessage()
+        record.args     = None
+        record.exc_info = None
+        record.exc_text = None
+
+        while True:
+            record.msg = msg
+            data = logcodec.encode_record( record )
+            if len(data) <= max_size:
+                return data
+            msg = msg[ : max( 0, len(msg) - (len(data) - max_size) - 3 ) ] + '...'
+            if len(msg) <= 3:
+                record.pathname = record.funcName = ''
+                for attr in logcodec.extra_attrs( record ):
+                    delattr( record, attr )
+                return logcodec.encode_record( record )[ :max_size ]
+
+    def records(self):
+        """
+        Returns the stored logrecords, oldest first.
+        """
+        return self._read_records( self._mmap, self._file_header.size, self.slot_size, self.capacity )
+
+    @staticmethod
+    def previous_path( path ):
+        """
+        Returns the path the ring-buffer file left by the previous process is moved to.
+        """
+        return path + '.prev'
+
+    @classmethod
+    def read(cls, path):
+        """
+        Returns the logrecords stored in a memory-mapped ring-buffer file
+        (ex: after the process that wrote it crashed)
+        """
+        with open( path, 'rb' ) as fd:
+            data = fd.read()
+
+        (magic, slot_size, capacity) = cls._file_header.unpack_from( data, 0 )
+        if magic != cls.magic:
+            raise IOError( 'not a supercli flight-recorder file: %s' % path )
+
+        return cls._read_records( data, cls._file_header.size, slot_size, capacity )
+
+    @classmethod
+    def _read_records(cls, data, start, slot_size, capacity):
+        slots = []
+        for i in range(capacity):
+            offset = start + i * slot_size
+            (seq, length) = cls._slot_header.unpack_from( data, offset )
+            if seq and length <= slot_size - cls._slot_header.size:
+                slots.append( (seq, offset + cls._slot_header.size, length) )
+
+        records = []
+        for (seq, offset, length) in sorted( slots ):
+            try:
+                (record, _) = logcodec.decode_record( bytes(data[ offset : offset + length ]) )
+            except Exception:
+                continue
+            records.append( record )
+        return records
+
+    def clear(self):
+        for i in range( self.capacity ):
+            offset = self._file_header.size + i * self.slot_size
+            self._mmap[ offset : offset + self._slot_header.size ] = self._slot_header.pack( 0, 0 )
+
+    def dump(self, target=None, clear=True):
+        """
+        Formats and writes all stored records to the `target` handlers.
+        (by default, the ring-buffer is cleared afterwards so records are not dumped twice)
+        """
+        targets = target or self.target
+
+        self.acquire()
+        try:
+            records = self.records()
+            if clear:
+                self.clear()
+        finally:
+            self.release()
+
+        if not records:
+            return
+
+        def marker(msg):
+            return logging.makeLogRecord({
+                'name' : 'supercli.logging', 'msg' : msg, 'levelno' : logging.WARNING, 'levelname' : 'WARNING',
+            })
+
+        records = (
+            [ marker('---- flight-recorder: last %s records ----' % len(records)) ] +
+            records +
+            [ marker('---- flight-recorder: end ----') ]
+        )
+        for record in records:
+            for handler in targets:
+                handler.handle( record )
+
+    def close(self):
+        _flight_recorders.discard( self )
+        self.acquire()
+        try:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            if self._fd is not None:
+                self._fd.close()
+                self._fd = None
+        finally:
+            self.release()
+        logging.Handler.close(self)
+
+    def __repr__(self):
+        return '<%s %s records (%s)>' % ( self.__class__.__name__, self.capacity, logging.getLevelName(self.level) )
+
+
+class _RotationWorker(object):
+    """
+    Background thread that compresses rotated logfiles, and rotates their backups
+    (so that the thread that triggered the rotation is not blocked).
+
+    Jobs are handled in order by a single thread, so backups are never
+    renamed by two threads at once.
+    """
+    pending_suffix = '.rotating'
+
+    def __init__(self):
+        self._queue   = None
+        self._thread  = None
+        self._counter = 0
+
+    def pending_name(self, filename):
+        """ unique name a logfile is renamed to, while it waits to be compressed """
+        self._counter += 1
+        return '%s.%s-%s-%s%s' % ( filename, int(time.time()), os.getpid(), self._counter, self.pending_suffix )
+
+    def find_pending(self, filename):
+        """
+        Returns the pending logfiles of `filename` whose process exited before compressing them (ex: killed).
+        Pending logfiles of running processes (including this one) are still being compressed, and are skipped.
+        Each logfile is renamed to a pending name of this process first, so only one process resumes it.
+        """
+        import glob
+
+        pattern = '%s.*%s' % ( glob.escape(filename) if hasattr(glob,'escape') else filename, self.pending_suffix )
+        owner   = re.compile( '-([0-9]+)-[0-9]+%s$' % re.escape(self.pending_suffix) )
+        claimed = []
+        for pending in sorted( glob.glob( pattern ) ):
+            match = owner.search( pending )
+            if match and process_exists( int(match.group(1)) ):
+                continue
+
+            name = self.pending_name( filename )
+            try:
+                os.rename( pending, name )
+            except( OSError ):
+                continue    ## claimed by another process (or still open, on windows)
+            if os.path.exists( logfile_index_path(pending) ):
+                os.rename( logfile_index_path(pending), logfile_index_path(name) )
+            claimed.append( name )
+        return claimed
+
+    def rotate(self, pending, filename, backupCount, ext):
+        """
+        Compresses `pending` into `filename.1<ext>`, after renaming
+        `filename.1<ext>` to `filename.2<ext>` (and so on).
+        """
+        self._start()
+        self._queue.put( (pending, filename, backupCount, ext) )
+
+    def wait(self):
+        """ blocks until all queued rotations are finished """
+        if self._queue is not None:
+            self._queue.join()
+
+    def _start(self):
+        import threading
+        import atexit
+
+        if self._thread is not None:
+            return
+
+        self._queue  = six.moves.queue.Queue()
+        self._thread = threading.Thread( target=self._work, name='supercli.logging.RotationWorker' )
+        self._thread.daemon = True
+        self._thread.start()
+
+        ## finish compressing before the interpreter exits
+        atexit.register( self.wait )
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._rotate( *job )
+            except Exception:
+                import traceback
+                sys.stderr.write( '--- supercli.logging: error rotating logfile %s ---\n' % job[0] )
+                traceback.print_exc()
+            finally:
+                self._queue.task_done()
+
+    def _rotate(self, pending, filename, backupCount, ext):
+        compressed = pending + ext
+        self._compress( pending, compressed, ext )
+        os.remove( pending )
+
+        ## retention
+        i = backupCount
+        while os.path.exists( '%s.%s%s' % (filename, i, ext) ):
+            remove_logfile( '%s.%s%s' % (filename, i, ext) )
+            i += 1
+
+        for i in range( backupCount -1, 0, -1 ):
+            src = '%s.%s%s' % (filename, i, ext)
+            dst = '%s.%s%s' % (filename, i+1, ext)
+            if os.path.exists( src ):
+                rename_logfile( src, dst )
+
+        rename_logfile( compressed, '%s.1%s' % (filename, ext) )
+
+    def _compress(self, src, dst, ext):
+        import shutil
+
+        tmp = dst + '.tmp'
+        with open( src, 'rb' ) as fd_src:
+            if ext == '.gz':
+                import gzip
+                with gzip.open( tmp, 'wb' ) as fd_dst:
+                    shutil.copyfileobj( fd_src, fd_dst, 1024 * 1024 )
+            else:
+                import zstandard
+                with open( tmp, 'wb' ) as fd_tmp:
+                    compressor = zstandard.ZstdCompressor()
+                    with compressor.stream_writer( fd_tmp, closefd=False ) as fd_dst:
+                        shutil.copyfileobj( fd_src, fd_dst, 1024 * 1024 )
+        os.rename( tmp, dst )
+
+
+_rotation_worker = _RotationWorker()
+
+
+class _LogIndexWriter(object):
+    """
+    Appends a block to a logfile's sidecar index each time it's handler writes
+    it's buffer. (the format is described in `supercli.logquery`)
+    """
+    version = 1
+
+    def __init__(self, logfile):
+        self.path     = logfile_index_path( logfile )
+        self._fd      = None
+        self._records = []      ## [(offset, created, levelno, name), ...] of unindexed records
+
+    def open(self):
+        import json
+        self._fd = open( self.path, 'ab' )
+        if not self._fd.tell():
+            self._fd.write( json.dumps( {'version': self.version}, separators=(',',':') ).encode('utf-8') + b'\n' )
+
+    def add(self, offset, record):
+        self._records.append( (offset, record.created, record.levelno, record.name) )
+
+    def write_block(self, end):
+        """
+        Indexes the records added since the last block. (`end` is the offset after the last record)
+        """
+        import json
+
+        records = self._records
+        if not records or self._fd is None:
+            return
+        self._records = []
+
+        start   = records[0][0]
+        t0      = min([ r[1]  for r in records ])
+        loggers = {}    ## {name: {levelno: [offset, msecs, offset, msecs, ...]}}
+        for (offset, created, levelno, name) in records:
+            entries = loggers.setdefault( name, {} ).setdefault( levelno, [] )
+            entries.append( offset - start )
+            entries.append( int( (created - t0) * 1000 ) )
+
+        block = {
+            'start'   : start,
+            'end'     : end,
+            't0'      : t0,
+            't1'      : max([ r[1]  for r in records ]),
+            'levels'  : sorted( set([ r[2]  for r in records ]) ),
+            'loggers' : loggers,
+        }
+        self._fd.write( json.dumps( block, separators=(',',':') ).encode('utf-8') + b'\n' )
+        self._fd.flush()
+
+    def close(self):
+        self._records = []
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
+
+
+
+
 # ==============
 # LogHander Mgmt
 # ==============
 
 class SetLog( object ):
+    ## lineformat presets
+    linefmt_norm  = '[ %(asctime)s ] %(levelname)-8s: %(message)s'
+    linefmt_dev   = '[ %(funcName)-35s ]ln%(lineno)-4s %(levelname)-8s: %(message)s'
+    linefmt_long  = '[ %(asctime)s ] %(levelname)-8s: %(message)s\n[    ln %(lineno)-4s  ]              %(name)s.%(funcName)-90s \n'
+    linefmt_stack = '[ %(asctime)s ] %(levelname)-8s: %(message)s\n[    ln %(lineno)-4s  ]              %(name)s.%(funcName)-90s \n%(stack)s'
+    datefmt_norm  = '%Y/%m/%d |%I:%M %p|'
+
     def __init__(
                     self,
                     str_arg        = None,
@@ -85,10 +2082,28 @@ class SetLog( object ):
                     logfile        = None,
                     logstream      = True,
                     logfile_size   = 1000000, # 8Mb
+                    logfile_buffer = 65536,
+                    logfile_backups = 1,
+                    logfile_rotate_interval = None,
+                    logfile_compress = None,
+                    logfile_index  = False,
+                    binlog         = None,
+                    binlog_caller_info = True,
+                    logcollector   = None,
                     debug_mode     = False,
                     logfmt         = False,
                     stack_logging  = False,
                     very_verbose   = False,
+                    async_logging  = False,
+                    async_queue_size = 10000,
+                    async_overflow = 'block',
+                    flight_recorder = None,
+                    flight_recorder_bytes = None,
+                    flight_recorder_path = None,
+                    log_signals    = False,
+                    module_levels  = None,
+                    fanout         = False,
+                    thread_buffered = False,
                 ):
         """
         More powerful replacement for logging.baseConfig().
@@ -124,6 +2139,7 @@ class SetLog( object ):
                        |                             |       |   d  = 'developper logging (caller-info instead of time)'
                        |                             |       |   l  = 'multiline logrecords'
                        |                             |       |   s  = 'show 5x frames from log-callers stack'
+                       |                             |       |   j  = 'JSON-lines output (one JSON object per logrecord)'
                        |                             |       |
                        |                             |       |
                        |                             |       |
@@ -131,6 +2147,11 @@ class SetLog( object ):
                        | 5, 10, 20, ...              |       | 'info' by default. case-insensitive.
                        |                             |       | (overridden by str_arg)
                        |                             |       |
+        module_levels  | None,                       | (opt) | loglevels of specific loggers (and their children),
+                       | 'pkg.mod=DEBUG,other=WARN', |       | that override `lv`. Unlike `lv='DEBUG'`, disabled records
+                       | {'pkg.mod': 'DEBUG'}        |       | of other loggers stay as cheap as they are at INFO.
+                       |                             |       | (see `set_module_levels()`)
+                       |                             |       |
         reuse          | True, False                 | (opt) | Try to reuse existing loghandlers if
                        |                             |       | they exist. If not set to true, in IPython/maya python sessions
                        |                             |       | we would continually creating and printing duplicates of streams.
@@ -145,14 +2166,48 @@ class SetLog( object ):
                        |                             |       | in the format '*<filter_match>*'.
                        |                             |       |
                        |                             |       |
-        filter_type    | WhiteList, BlackList        | (opt) | A subclass of logging.Filter that you want to
-                       |                             |       | use to filter the log results. Should be the class object itself.
+        filter_type    | WhiteList, BlackList,       | (opt) | A subclass of logging.Filter that you want to
+                       | WhiteBlacklist, RateLimit   |       | use to filter the log results. Should be the class object itself.
+                       |                             |       | (WhiteBlacklist expects a dict of filter_matches:
+                       |                             |       |  {'whitelist':[...], 'blacklist':[...]} )
+                       |                             |       | (RateLimit does not require filter_matches, but accepts
+                       |                             |       |  a dict of it's arguments: {'rate':1.0, 'burst':10} )
                        |                             |       |
         logfile        | None, '/tmp/mylog.log'      | (opt) | If logging to a file, what file you want to log to.
-                       |                             |       | (otherwise, logs to a streamhandler)
+                       | ['/tmp/a.log','/tmp/b.log'] |       | (otherwise, logs to a streamhandler)
+                       |                             |       | Records are buffered in memory, and written in batches.
+                       |                             |       | (see `BufferedRotatingFileHandler`)
                        |                             |       |
         logfile_size   | 100000000                   | (opt) | Size in bytes of logfile. Defaults to 8 Megabytes.
                        |                             |       |
+        logfile_buffer | 65536                       | (opt) | Size in bytes of the logfile's write-buffer.
+                       |                             |       | (0 writes every record immediately)
+                       |                             |       |
+        logfile_backups| 1                           | (opt) | Number of rotated logfiles to keep.
+                       |                             |       |
+        logfile_rotate_interval | None, 86400        | (opt) | Also rotate the logfile once it is this many seconds old.
+                       |                             |       |
+        logfile_compress | None, 'gzip', 'zstd'      | (opt) | Compress rotated logfiles (in a background thread).
+                       |                             |       | ('zstd' requires the `zstandard` module)
+                       |                             |       |
+        logfile_index  | False, True                 | (opt) | Maintain a sidecar index of each logfile ('mylog.log.idx')
+                       |                             |       | so it can be queried quickly by time/level/logger:
+                       |                             |       | `supercli-logquery -l ERROR -n pkg.mod --since 1h /tmp/mylog.log`
+                       |                             |       |
+        binlog         | None, '/tmp/mylog.binlog'   | (opt) | Also log to a binary logfile. Records are not formatted,
+                       | ['/tmp/a.binlog', ...]      |       | messages are formatted when the logfile is read:
+                       |                             |       | `python -m supercli.logview /tmp/mylog.binlog`
+                       |                             |       | (rotated like `logfile`. see `BinaryLogHandler`)
+                       |                             |       |
+        binlog_caller_info | True, False             | (opt) | Store caller-info (pathname, lineno, funcName) in `binlog`,
+                       |                             |       | so any lineformat can be used when it is read.
+                       |                             |       | (disable it to skip the stack-walk per record)
+                       |                             |       |
+        logcollector   | None, '/tmp/prog.sock'      | (opt) | Send records to a log-collector process over this Unix socket
+                       |                             |       | (instead of writing `logfile`/stream from this process).
+                       |                             |       | For many processes that share a logfile.
+                       |                             |       | (see `supercli.logcollector`)
+                       |                             |       |
         logstream      | True, False                 | (opt) | By default, we will always log to a stream. However,
                        |                             |       | you can disable the stream if for example you want to log to a file and not to stdout
                        |                             |       |
@@ -160,6 +2215,7 @@ class SetLog( object ):
                        |                             |       | Not intended for production.
                        |                             |       |
         logfmt         | None, 'long', 'dev', 'stack'| (opt) | Some optional logformat presets that you can use,
+                       | 'json'                      |       |
                        | '%(message)s'               |       | or you can set your own lineformat here.
                        |                             |       |
                        |                             |       | None:  (1x line) time, level, message (good for users)
@@ -168,6 +2224,9 @@ class SetLog( object ):
                        |                             |       | stack: (many lines) same as dev, but with a default of
                        |                             |       |        traceback (obeys stack_logging argument).
                        |                             |       |        If stack_logging is not enabled, it will be made enabled.
+                       |                             |       | json:  (1x line) a JSON object per logrecord (time, level,
+                       |                             |       |        logger, caller-info, message, exception, `extra` attrs)
+                       |                             |       |        for log-indexing tools. (see `JsonFormatter`)
                        |                             |       |
         stack_logging  | False, 5                    | (opt) | if `stack_logging` is enabled, logrecords gain the
                        |                             |       | additional LogRecord attribute: '%(stack)s' that
@@ -175,9 +2234,43 @@ class SetLog( object ):
                        |                             |       |
         very_verbose   | True, False                 | (opt) | Disables log-filters
                        |                             |       |
+        async_logging  | True, False                 | (opt) | Records are put on a queue, and formatted/written
+                       |                             |       | by all handlers from a background thread.
+                       |                             |       | (see `AsyncHandler`)
+                       |                             |       |
+        async_queue_size | 10000                     | (opt) | max number of records queued when `async_logging`
+                       |                             |       | is enabled. (0 is unbounded)
+                       |                             |       |
+        async_overflow | 'block', 'drop'             | (opt) | When the queue is full, block the logging thread
+                       |                             |       | until there is room, or drop the record.
+                       |                             |       |
+        fanout         | False, True                 | (opt) | Records are passed to all handlers by a `FanoutHandler`,
+                       |                             |       | which formats each record once (instead of once per handler).
+                       |                             |       | (always the case with `async_logging`)
+                       |                             |       |
+        thread_buffered| False, True                 | (opt) | Each thread formats records into a buffer of it's own,
+                       |                             |       | and a background thread writes them to all handlers,
+                       |                             |       | so threads do not wait on handler-locks.
+                       |                             |       | (see `ThreadBufferedHandler` for ordering)
+                       |                             |       |
+        flight_recorder| None, 5000                  | (opt) | Keep the last N records (including DEBUG records, regardless
+                       |                             |       | of the loglevel) in a ring-buffer. They are written to the
+                       |                             |       | handlers when `supercli.excepttools.logexcept()` runs.
+                       |                             |       | (see `FlightRecorderHandler`)
+                       |                             |       |
+        flight_recorder_bytes | None, 4194304        | (opt) | Size the flight-recorder's ring-buffer in bytes instead of records.
+                       |                             |       |
+        flight_recorder_path | None, '/tmp/prog.ring'| (opt) | memory-map the flight-recorder's ring-buffer to this file,
+                       |                             |       | so it survives a hard crash.
+                       |                             |       |
+        log_signals    | False, True                 | (opt) | SIGUSR1/SIGUSR2 increase/decrease the verbosity
+                       |                             |       | (INFO, DEBUG, very-verbose), SIGQUIT writes the logging
+                       |                             |       | configuration to stderr. (see `LogSignals`)
+                       |                             |       |
         """
 
         ## Arguments
+        self._config         = dict([ (name, value)  for (name, value) in loc().items()  if name != 'self' ])
         self.str_arg         = str_arg
         self.lv              = lv
         self.reuse           = reuse
@@ -186,6 +2279,14 @@ class SetLog( object ):
         self.filter_type     = filter_type
         self.logfile         = logfile
         self.logfile_size    = logfile_size
+        self.logfile_buffer  = logfile_buffer
+        self.logfile_backups = logfile_backups
+        self.logfile_rotate_interval = logfile_rotate_interval
+        self.logfile_compress = logfile_compress
+        self.logfile_index   = logfile_index
+        self.binlog          = binlog
+        self.binlog_caller_info = binlog_caller_info
+        self.logcollector    = logcollector
         self.logstream       = logstream
         self.debug_mode      = debug_mode
 
@@ -193,14 +2294,27 @@ class SetLog( object ):
         self.stack_logging   = stack_logging
         self.very_verbose    = very_verbose
 
+        self.async_logging    = async_logging
+        self.async_queue_size = async_queue_size
+        self.async_overflow   = async_overflow
+        self.fanout           = fanout
+        self.thread_buffered  = thread_buffered
+
+        self.flight_recorder       = flight_recorder
+        self.flight_recorder_bytes = flight_recorder_bytes
+        self.flight_recorder_path  = flight_recorder_path
+
+        self.log_signals     = log_signals
+        self.module_levels   = module_levels
+
         ## Attributes
-        self.is_maya = False        ## set to true if running python within maya (NOT mayapy)
+        self.is_maya  = False       ## set to true if running python within maya (NOT mayapy)
+        self.handlers = []          ## handlers configured by this instance
+        self.dispatch_handlers = [] ## handlers records are passed to from the logging thread
+        self.flight_recorder_handler = None
+        self._staged  = None        ## {handler: {attr: value}} assigned by `_publish()` (while a configuration is built)
 
-        self.linefmt_norm  = '[ %(asctime)s ] %(levelname)-8s: %(message)s'
-        self.linefmt_dev   = '[ %(funcName)-35s ]ln%(lineno)-4s %(levelname)-8s: %(message)s'
-        self.linefmt_long  = '[ %(asctime)s ] %(levelname)-8s: %(message)s\n[    ln %(lineno)-4s  ]              %(name)s.%(funcName)-90s \n'
-        self.linefmt_stack = '[ %(asctime)s ] %(levelname)-8s: %(message)s\n[    ln %(lineno)-4s  ]              %(name)s.%(funcName)-90s \n%(stack)s'
-        self.datefmt       = '%Y/%m/%d |%I:%M %p|'
+        self.datefmt       = self.datefmt_norm
 
 
         self.main()
@@ -210,7 +2324,133 @@ class SetLog( object ):
         self.is_running_mayagui()
         self.parse_logfmt_args()
         self.create_loghandlers()
-        self.colorize_log()
+        self.set_record_attrs()
+        self.set_log_signals()
+
+        if _log_stats is not None:
+            _log_stats.instrument()
+
+    def reconfigure(self, **changes):
+        """
+        Changes some of this SetLog's arguments while other threads are logging.
+
+        Only the parts of the configuration that are affected are rebuilt:
+
+            * level:   the loglevel of the root logger (and handlers), and `module_levels`
+            * format:  the formatters, colourization and stack_logging
+            * filters: the filters of each handler
+            * sinks:   handlers are created/removed (unchanged handlers are reused)
+            * signals: signal-handlers are installed/removed (see `log_signals`)
+
+        The new formatter, filters and level of every handler are built first, then assigned
+        together with the root logger's handlers while holding `logging._lock`. Records logged after
+        `reconfigure()` returns only see the new configuration. (threads do not take `logging._lock`
+        to log, so a record being handled while it is assigned may be filtered by the old configuration
+        and formatted by the new one). Handlers that are removed are closed after they are replaced.
+
+        Returns the set of the parts that were changed.
+
+        .. code-block:: python
+
+            setlog = SetLog( lv='INFO', logfile='/tmp/mylog.log' )
+            setlog.reconfigure( lv='DEBUG' )        ## {'level'}
+            setlog.reconfigure( logfmt='dev' )      ## {'format'}
+            setlog.reconfigure( logstream=False )   ## {'sinks'}
+
+        ________________________________________________________________________________________________________
+        INPUT:
+        ________________________________________________________________________________________________________
+        changes   | lv='DEBUG', logfmt='dev', ...   |       | any of SetLog's arguments.
+                  |                                 |       |
+        """
+        unknown = [ name  for name in changes  if name not in self._config ]
+        if unknown:
+            raise TypeError( 'unexpected SetLog argument(s): %s' % ', '.join(sorted(unknown)) )
+
+        config = dict( self._config )
+        config.update( changes )
+
+        with _reconfigure_lock:
+            planned = self._plan( config )
+
+            changed = set()
+            if planned._level_key()  != self._level_key():     changed.add('level')
+            if planned._format_key() != self._format_key():    changed.add('format')
+            if planned._filter_key() != self._filter_key():    changed.add('filters')
+            if any( config[name] != self._config[name]  for name in self._sink_args ):
+                changed.add('sinks')
+
+            if changed:
+                ## attributes used by the new configuration are computed before it is used
+                if planned.record_attrs != self.record_attrs:
+                    set_record_attrs( None )
+
+                if 'sinks' in changed:
+                    planned.create_loghandlers( retire=self.handlers )
+                else:
+                    planned._staged = {}
+                    if 'level' in changed:
+                        planned._set_loglevel()
+                    if 'format' in changed:
+                        planned._set_logformat( planned.handlers )
+                    if 'filters' in changed:
+                        planned._set_filters( planned.handlers )
+                    if 'format' in changed:
+                        planned._set_stack_filters()
+                    planned._publish()
+
+                planned.set_record_attrs()
+                if _log_stats is not None:
+                    _log_stats.instrument()
+
+            self.__dict__.update( planned.__dict__ )
+            self._config = config
+
+            if 'log_signals' in changes and bool( config['log_signals'] ) != bool( _log_signals is not None and _log_signals.setlog is self ):
+                self.set_log_signals()
+                changed.add('signals')
+
+        self.logdebug( 'reconfigured: %s' % sorted(changed) )
+        return changed
+
+    def _plan(self, config):
+        """
+        Returns a copy of this SetLog with the arguments `config`,
+        parsed but not applied (existing handlers are reused).
+        """
+        planned = copy.copy( self )
+        planned.__dict__.update( config )
+        planned.reuse   = True
+        planned.datefmt = planned.datefmt_norm
+
+        planned.validate_args()
+        planned.is_running_mayagui()
+        planned.parse_logfmt_args()
+        return planned
+
+    ## arguments that require handlers to be created/removed
+    _sink_args = (
+        'logfile', 'logstream', 'logfile_size', 'logfile_buffer', 'logfile_backups',
+        'logfile_rotate_interval', 'logfile_compress', 'logfile_index', 'binlog', 'binlog_caller_info', 'logcollector',
+        'async_logging', 'async_queue_size', 'async_overflow', 'fanout', 'thread_buffered',
+        'flight_recorder', 'flight_recorder_bytes', 'flight_recorder_path',
+    )
+
+    def _loglevel(self):
+        if isinstance( self.lv, six.text_type ):
+            return getattr( logging, self.lv.upper() )
+        return self.lv
+
+    def _level_key(self):
+        return ( self._loglevel(), self.module_levels )
+
+    def _format_key(self):
+        return ( self.json, self.linefmt, self.datefmt, self.colorize, self.stack_logging )
+
+    def _filter_key(self):
+        if not self.use_filter:
+            return (False,)
+        return ( True, self.filter_type, self.filter_matches )
 
     def validate_args(self):
         """
@@ -228,8 +2468,26 @@ class SetLog( object ):
             raise TypeError('self.filter_type must be a subclass of logging.Filter')
 
         ## logfile
+        self.logfiles = []
         if self.logfile:
-            self.logfile = os.path.realpath( self.logfile ).replace( '\\','/' )
+            if isinstance( self.logfile, six.string_types ):
+                self.logfile = os.path.realpath( self.logfile ).replace( '\\','/' )
+                self.logfiles = [ self.logfile ]
+            else:
+                self.logfile  = [ os.path.realpath( path ).replace( '\\','/' )  for path in self.logfile ]
+                self.logfiles = self.logfile
+
+        ## module_levels  {'pkg.mod': 10}
+        self.module_levels = parse_module_levels( self.module_levels )
+
+        ## binlog
+        self.binlogs = []
+        if self.binlog:
+            if isinstance( self.binlog, six.string_types ):
+                self.binlogs = [ self.binlog ]
+            else:
+                self.binlogs = list( self.binlog )
+            self.binlogs = [ os.path.realpath( path ).replace( '\\','/' )  for path in self.binlogs ]
 
 
         if self.stack_logging != False:
@@ -255,9 +2513,11 @@ class SetLog( object ):
         c  = 'critical'
         l  = 'multiline logrecords'
         d  = 'dev-mode (replace datetime with __name__ & lineno)
+        j  = 'JSON-lines output'
         """
 
         self.linefmt = self.linefmt_norm
+        self.json    = False
 
         if self.str_arg == None:
             self.str_arg = ''
@@ -277,14 +2537,22 @@ class SetLog( object ):
         ## In your program, you might want to tone down the logging on
         #  some of the more chatty library modules. The 'vv' flag
         #  gives the user the power to disable these filters.
-        if self.filter_matches:
-            if 'vv' in self.str_arg or self.very_verbose:
-                self.filter_matches = []
+        self.use_filter = bool( self.filter_type ) and any([
+            self.filter_matches,
+            not getattr( self.filter_type, 'needs_matches', True ),
+        ])
+        if 'vv' in self.str_arg or self.very_verbose:
+            self.filter_matches = []
+            self.use_filter     = False
 
 
         ## logrecord formatting
         ##
-        if   'l' in self.str_arg   or  self.logfmt  == 'long':
+        if   'j' in self.str_arg   or  self.logfmt  == 'json':
+            self.json    = True
+            self.linefmt = None
+
+        elif 'l' in self.str_arg   or  self.logfmt  == 'long':
             self.linefmt = self.linefmt_long
             self.datefmt = None
 
@@ -299,13 +2567,28 @@ class SetLog( object ):
 
         ## allow user to set their own lineformat
         ##
-        if self.logfmt not in (None, False, 'dev', 'long', 'stack'):
+        if self.logfmt not in (None, False, 'dev', 'long', 'stack', 'json'):
             self.linefmt = self.logfmt
 
 
+        ## logrecord attributes used by the lineformat/filters.
+        ##  (so that unused attributes are not computed for every record)
+        if self.json:
+            self.record_attrs = set( JsonFormatter.record_attrs )
+        else:
+            self.record_attrs = fmt_record_attrs( self.linefmt )
+        if self.use_filter:
+            filter_attrs = getattr( self.filter_type, 'record_attrs', None )
+            if filter_attrs is None:
+                self.record_attrs = None
+            else:
+                self.record_attrs |= filter_attrs
+
+
         self.logdebug( 'loglevel:    %s' % self.lv )
         self.logdebug( 'lineformat:  %s' % self.linefmt )
         self.logdebug( 'dateformat:  %s' % self.datefmt )
+        self.logdebug( 'recordattrs: %s' % self.record_attrs )
 
     def is_running_mayagui(self):
         """
@@ -329,42 +2612,194 @@ class SetLog( object ):
             if not 'mayapy' in python_bin:
                 self.is_maya = True
 
-    def create_loghandlers(self):
+    def create_loghandlers(self, retire=()):
         """
         Creates a new loghandler, or
         if self.reuse, try to reuse an existing one.
+
+        Handlers are configured before they are added to the root logger, and the
+        root logger's handlers are replaced together with their configuration (see `_publish()`).
+        Handlers that are no longer used (`retire` handlers that were not reused, AsyncHandlers, ...)
+        are closed afterwards.
         """
 
         handlers           = []
+        self._staged       = {}
 
         ## Create Handlers
-        if self.logfile:
-            handlers.extend( self._create_loghandler_file() )
+        if self.logcollector:
+            ## the collector writes the logfile/stream
+            handlers.extend( self._create_loghandler_collector() )
 
-        if self.logstream:
-            handlers.extend( self._create_loghandler_stream() )
+        else:
+            if self.logfiles:
+                handlers.extend( self._create_loghandler_file() )
 
-        ## Add stack info to message (by wrapping handler)
-        if self.stack_logging != False:
-            for handler in handlers:
-                method = handler.handle
+            if self.binlogs:
+                handlers.extend( self._create_loghandler_binlog() )
 
-                def handle_and_add_stackinfo(record):
-                    ## the logrecord is 5 levels deep, so we will
-                    ## trim off the top
-                    stack = ''.join(
-                        str(row) for row in traceback.format_stack(limit=self.stack_logging+5)[:-5]
-                    )
-                    record.stack = '\x1b[36m%s\x1b[0m' % stack
-                    return method(record)
-                handler.handle = handle_and_add_stackinfo
+            if self.logstream:
+                handlers.extend( self._create_loghandler_stream() )
 
+        closing       = [ h  for h in retire  if h not in handlers ]
+        root_handlers = [ h  for h in logging.root.handlers  if h not in closing ]
 
+        self.handlers = handlers
+        self._set_flight_recorder( handlers, root_handlers, closing )
         self.logdebug('using handlers: %s' % repr(handlers))
         self._set_loglevel()
         self._set_logformat( handlers )
         self._set_filters(   handlers )
 
+        ## Handlers called from the logging thread
+        self.dispatch_handlers = self._set_dispatcher( handlers, root_handlers, closing )
+        self._set_stack_filters()
+        self._publish( root_handlers )
+
+        for handler in closing:
+            self.logdebug('Closing LogHandler: %s' % repr(handler) )
+            handler.close()
+
+    def _set_stack_filters(self):
+        """
+        Adds a StackInfoFilter to each handler (after all other filters), if `stack_logging`
+        is enabled, so the stack is only captured for records that pass it's level and filters.
+
+        (a FanoutHandler/ThreadBufferedHandler applies them in the thread that logged the record)
+        An AsyncHandler passes records to it's handlers from the listener-thread, so the StackInfoFilter
+        is added to it instead (the stack is captured in the thread that logged the record,
+        if it passes the level of one of it's handlers).
+        """
+        threaded = [ h  for h in self.dispatch_handlers  if isinstance( h, AsyncHandler ) ]
+        stacked  = threaded or self.handlers
+
+        for handler in self.handlers + [ h  for h in self.dispatch_handlers  if h not in self.handlers ]:
+            filters = [ f  for f in self._current( handler, 'filters' )  if not isinstance( f, StackInfoFilter ) ]
+            if self.stack_logging != False and handler in stacked:
+                filters.append( StackInfoFilter( limit=self.stack_logging, handler=handler ) )
+            self._stage( handler, filters=filters )
+
+    def _current(self, handler, name, default=None):
+        """
+        Returns the attribute of a handler, as it will be once the staged configuration is published.
+        """
+        if self._staged and name in self._staged.get( handler, () ):
+            return self._staged[ handler ][ name ]
+        return getattr( handler, name, default )
+
+    def _stage(self, handler, **attrs):
+        """
+        Sets attributes of a handler (formatter, filters, level, ...).
+        While a configuration is built, they are kept until `_publish()` instead.
+        """
+        if self._staged is None:
+            for (name, value) in attrs.items():
+                setattr( handler, name, value )
+        else:
+            self._staged.setdefault( handler, {} ).update( attrs )
+
+    def _publish(self, root_handlers=None):
+        """
+        Assigns the staged attributes of every handler (and the root logger's handlers)
+        together, while holding `logging._lock`.
+        """
+        (staged, self._staged) = ( self._staged or {}, None )
+        retired = []
+        with logging._lock:
+            for (handler, attrs) in staged.items():
+                if 'filters' in attrs:
+                    retired.extend([ f  for f in handler.filters  if f not in attrs['filters'] ])
+                for (name, value) in attrs.items():
+                    setattr( handler, name, value )
+            if root_handlers is not None:
+                logging.root.handlers = root_handlers
+
+        ## filters that are no longer used log what they kept (ex: RateLimit's summaries)
+        for _filter in set( retired ):
+            if getattr( _filter, '_supercli_filter', False ) and hasattr( _filter, 'close' ):
+                _filter.close()
+
+    def _set_dispatcher(self, handlers, root_handlers, closing):
+        """
+        If `async_logging` (or `thread_buffered`, `fanout`), moves handlers behind an AsyncHandler
+        (or ThreadBufferedHandler, FanoutHandler) on the root logger.
+        Otherwise, moves handlers out of an existing AsyncHandler/FanoutHandler back onto the root logger.
+        (modifies the list `root_handlers`. Handlers to close are appended to `closing`)
+
+        Returns the handlers that records are passed to from the logging thread.
+        """
+        dispatchers = [ h  for h in root_handlers  if isinstance(h, FanoutHandler) ]
+
+        if not ( self.async_logging or self.thread_buffered or self.fanout ):
+            for dispatcher in dispatchers:
+                root_handlers.remove( dispatcher )
+                closing.append( dispatcher )
+                for handler in dispatcher.handlers:
+                    if handler not in root_handlers and handler not in closing:
+                        root_handlers.append( handler )
+                self.logdebug('Removed Dispatch LogHandler: %s' % repr(dispatcher) )
+
+            for handler in handlers:
+                if handler not in root_handlers:
+                    root_handlers.append( handler )
+            return handlers
+
+
+        ## handlers from previous runs that are not reused are still kept
+        targets = list(handlers)
+        for dispatcher in dispatchers:
+            for handler in dispatcher.handlers:
+                if handler not in targets and handler not in closing:
+                    targets.append( handler )
+
+        dispatcher = None
+        for existing in dispatchers:
+            if self.async_logging:
+                reusable = all([
+                    isinstance( existing, AsyncHandler ),
+                    existing.queue_size == self.async_queue_size,
+                    existing.overflow   == self.async_overflow,
+                ])
+            elif self.thread_buffered:
+                reusable = type(existing) is ThreadBufferedHandler
+            else:
+                reusable = type(existing) is FanoutHandler
+
+            if all([ self.reuse, reusable, dispatcher is None ]):
+                dispatcher = existing
+                self.logdebug('Found Dispatch LogHandler: %s' % repr(existing) )
+            else:
+                root_handlers.remove( existing )
+                closing.append( existing )
+
+        if dispatcher is None:
+            if self.async_logging:
+                dispatcher = AsyncHandler( queue_size=self.async_queue_size, overflow=self.async_overflow )
+            elif self.thread_buffered:
+                dispatcher = ThreadBufferedHandler()
+            else:
+                dispatcher = FanoutHandler()
+            root_handlers.append( dispatcher )
+            self.logdebug('Created Dispatch LogHandler: %s' % repr(dispatcher) )
+
+        dispatcher.set_handlers( targets )
+        for handler in targets:
+            if handler in root_handlers:
+                root_handlers.remove( handler )
+
+        return [ dispatcher ]
+
+    def _iter_root_handlers(self):
+        """
+        Yields every handler on the root logger, including
+        the handlers behind an AsyncHandler/FanoutHandler.
+        """
+        for handler in logging.root.handlers:
+            if isinstance( handler, FanoutHandler ):
+                for target in handler.handlers:
+                    yield target
+            else:
+                yield handler
 
     def _create_loghandler_stream(self):
         """
@@ -389,7 +2824,7 @@ class SetLog( object ):
         create_handler = True
         if self.reuse:
             if logging.root.handlers:
-                for handler in logging.root.handlers:
+                for handler in self._iter_root_handlers():
 
                     ## most handlers are subclasses of logging.StreamHandler
                     ## we need to test explicitly for logging.StreamHandler.
@@ -402,7 +2837,6 @@ class SetLog( object ):
         ## Create handler if necessary
         if create_handler:
             handler = streamhandler_type()
-            logging.root.addHandler( handler )
             handlers.append( handler )
             self.logdebug('Created Stream LogHandler: %s' % repr(handler) )
 
@@ -410,107 +2844,285 @@ class SetLog( object ):
 
     def _create_loghandler_file(self):
         """
-        Create/Modify a file loghandler
+        Create/Modify a file loghandler for each logfile
         """
         import logging.handlers
 
         handlers = []
 
+        for logfile in self.logfiles:
 
-        ## create empty logfile if not exist
-        if self.logfile:
-            if not os.path.isdir( os.path.dirname( self.logfile ) ):
-                os.makedirs( os.path.dirname(self.logfile) )
+            ## create empty logfile if not exist
+            if not os.path.isdir( os.path.dirname( logfile ) ):
+                os.makedirs( os.path.dirname(logfile) )
 
-            if not os.path.isfile( self.logfile ):
-                open( self.logfile, 'a' ).close()
+            if not os.path.isfile( logfile ):
+                open( logfile, 'a' ).close()
 
 
-        ## Search for existing RotatingFileHandlers
-        create_handler = True
+            ## Search for existing file handlers writing to this logfile
+            create_handler = True
+            if self.reuse:
+                if logging.root.handlers:
+                    for handler in self._iter_root_handlers():
+
+                        if not isinstance( handler, (BufferedRotatingFileHandler, logging.handlers.RotatingFileHandler) ):
+                            continue
+                        if isinstance( handler, BinaryLogHandler ):
+                            continue
+
+                        if os.path.realpath( handler.baseFilename ) == os.path.realpath( logfile ):
+                            create_handler = False
+                            handlers.append( handler )
+                            self.logdebug('Found File LogHandler: %s' % repr(handler) )
+
+
+            ## create a new handler if necessary (or configured)
+            if create_handler:
+                handler = BufferedRotatingFileHandler(
+                        logfile,
+                        maxBytes        = self.logfile_size,
+                        backupCount     = self.logfile_backups,
+                        buffer_size     = self.logfile_buffer,
+                        rotate_interval = self.logfile_rotate_interval,
+                        compress        = self.logfile_compress,
+                        index           = self.logfile_index,
+                    )
+                handlers.append( handler )
+                self.logdebug('Created File LogHandler: %s' % repr(handler) )
+
+
+        return handlers
+
+    def _create_loghandler_collector(self):
+        """
+        Create/Reuse a CollectorHandler that sends records to the log-collector.
+        """
+        from .logcollector import CollectorHandler
+
         if self.reuse:
-            if logging.root.handlers:
-                for handler in logging.root.handlers:
+            for handler in self._iter_root_handlers():
+                if isinstance( handler, CollectorHandler ) and handler.path == self.logcollector:
+                    self.logdebug('Found Collector LogHandler: %s' % repr(handler) )
+                    return [ handler ]
 
-                    if isinstance( handler, logging.handlers.RotatingFileHandler ):
-                        create_handler = False
-                        handlers.append( handler )
-                        self.logdebug('Found File LogHandler: %s' % repr(handler) )
+        handler = CollectorHandler( self.logcollector, fallback_stream=(sys.stderr if self.logstream else None) )
+        self.logdebug('Created Collector LogHandler: %s' % repr(handler) )
+        return [ handler ]
 
+    def _create_loghandler_binlog(self):
+        """
+        Create/Modify a BinaryLogHandler for each binlog.
+        """
+        handlers    = []
+        caller_info = bool( self.binlog_caller_info )
+
+        for binlog in self.binlogs:
+
+            if not os.path.isdir( os.path.dirname( binlog ) ):
+                os.makedirs( os.path.dirname(binlog) )
+
+            ## Search for existing binlog handlers writing to this file
+            handler = None
+            if self.reuse:
+                for existing in self._iter_root_handlers():
+                    if isinstance( existing, BinaryLogHandler ):
+                        if os.path.realpath( existing.baseFilename ) == os.path.realpath( binlog ):
+                            handler = existing
+                            handler.caller_info = caller_info
+                            self.logdebug('Found Binary LogHandler: %s' % repr(handler) )
+
+            ## create a new handler if necessary (or configured)
+            if handler is None:
+                handler = BinaryLogHandler(
+                        binlog,
+                        caller_info     = caller_info,
+                        maxBytes        = self.logfile_size,
+                        backupCount     = self.logfile_backups,
+                        buffer_size     = self.logfile_buffer,
+                        rotate_interval = self.logfile_rotate_interval,
+                        compress        = self.logfile_compress,
+                    )
+                self.logdebug('Created Binary LogHandler: %s' % repr(handler) )
 
-        ## create a new handler if necessary (or configured)
-        if create_handler:
-            handler = logging.handlers.RotatingFileHandler( self.logfile, maxBytes=self.logfile_size, backupCount=1 )
-            logging.root.addHandler( handler )
             handlers.append( handler )
-            self.logdebug('Created File LogHandler: %s' % repr(handler) )
-
 
         return handlers
 
     def _set_loglevel(self):
-        if isinstance( self.lv, six.text_type ):
-            logging.root.level = getattr( logging, self.lv.upper() )
+        lv = self._loglevel()
+
+        ## the flight-recorder keeps DEBUG records, so the loglevel
+        ## is set on the other handlers instead.
+        if self.flight_recorder_handler:
+            logging.root.setLevel( min( lv, logging.DEBUG ) )
+
+            ## loggers in `module_levels` may be more verbose than `lv`
+            level_filters = []
+            if self.module_levels:
+                level_filters = [ LevelFilter( self.module_levels, default=lv ) ]
+                lv = min( [lv] + list(self.module_levels.values()) )
+
+            for handler in self.handlers:
+                filters = level_filters + [ f  for f in self._current( handler, 'filters' )  if not isinstance( f, LevelFilter ) ]
+                self._stage( handler, level=lv, _supercli_level=True, filters=filters )
         else:
-            logging.root.level = self.lv
+            logging.root.setLevel( lv )
+            for handler in self.handlers:
+                if self._current( handler, '_supercli_level', False ):
+                    filters = [ f  for f in self._current( handler, 'filters' )  if not isinstance( f, LevelFilter ) ]
+                    self._stage( handler, level=logging.NOTSET, _supercli_level=False, filters=filters )
+
+        set_module_levels( self.module_levels )
+
+    def _set_flight_recorder(self, handlers, root_handlers, closing):
+        """
+        Adds/Reuses/Removes a FlightRecorderHandler on the root logger.
+        (it is never behind an AsyncHandler, so records are stored even if the logging thread crashes)
+        """
+        self.flight_recorder_handler = None
+        enabled = bool( self.flight_recorder or self.flight_recorder_bytes )
+
+        for existing in [ h  for h in root_handlers  if isinstance(h, FlightRecorderHandler) ]:
+            if all([
+                    enabled,
+                    self.reuse,
+                    self.flight_recorder_handler is None,
+                    existing.path == self.flight_recorder_path,
+                    existing.capacity == (self.flight_recorder or existing.capacity),
+                ]):
+                self.flight_recorder_handler = existing
+                self.logdebug('Found FlightRecorder LogHandler: %s' % repr(existing) )
+            else:
+                root_handlers.remove( existing )
+                closing.append( existing )
+
+        if enabled and self.flight_recorder_handler is None:
+            self.flight_recorder_handler = FlightRecorderHandler(
+                    capacity  = self.flight_recorder or 5000,
+                    max_bytes = self.flight_recorder_bytes,
+                    path      = self.flight_recorder_path,
+                )
+            self.flight_recorder_handler.setLevel( logging.DEBUG )
+            root_handlers.append( self.flight_recorder_handler )
+            self.logdebug('Created FlightRecorder LogHandler: %s' % repr(self.flight_recorder_handler) )
+
+        if self.flight_recorder_handler:
+            self.flight_recorder_handler.target = list(handlers)
 
     def _set_logformat( self, handlers ):
 
-        logformat = logging.Formatter(
-                fmt      = self.linefmt,
-                datefmt  = self.datefmt,
-            )
+        if self.json:
+            logformat = JsonFormatter()
+        else:
+            logformat = Formatter(
+                    fmt      = self.linefmt,
+                    datefmt  = self.datefmt,
+                )
 
+        ## terminals are given a ColourFormatter (instead of being formatted twice)
+        colour = self.colorize and not self.json
         for handler in handlers:
-            handler.setFormatter( logformat )
-
-    def _set_filters( self, handlers ):
+            if not ( colour and is_tty_handler( handler ) ):
+                self._stage( handler, formatter=logformat )
 
-        if self.filter_type and self.filter_matches:
-            for handler in handlers:
+        self.colorize_log()
 
-                ## Delete existing filter(s)
-                for _filter in handler.filters:
-                    handler.removeFilter( _filter )
+    def _set_filters( self, handlers ):
+        """
+        Replaces the filters on each handler with a single instance of `filter_type`.
+        (shared by all handlers). If filters are disabled, filters added by SetLog are removed.
+        """
+        _filter = None
+        if self.use_filter:
+            _filter = self.filter_type( self.filter_matches )
+            _filter._supercli_filter = True
 
-                ## Add the user-defined filter
-                handler.addFilter(
-                            self.filter_type( self.filter_matches )
-                        )
+        for handler in handlers:
+            filters = self._current( handler, 'filters' )
+            if _filter is not None:
+                ## replaces existing filter(s), the LevelFilter stays first and the StackInfoFilter last
+                filters = (
+                    [ f  for f in filters  if isinstance( f, LevelFilter ) ]
+                    + [ _filter ]
+                    + [ f  for f in filters  if isinstance( f, StackInfoFilter ) ]
+                )
+            else:
+                filters = [ f  for f in filters  if not getattr( f, '_supercli_filter', False ) ]
+            self._stage( handler, filters=filters )
 
 
     def colorize_log(self):
         """
-        If user wants colorized logs, choose the most
-        appropriate method of colorizing logs.
+        If user wants colorized logs, replaces the formatter of
+        every handler that writes to a terminal with a `ColourFormatter`.
+
+        (safe to run repeatedly)
         """
+        global _colorama_initialized
+
+        if not self.colorize or self.json:
+            return
 
-        if self.colorize:
+        ## colorama converts ANSI escape-sequences to win32 calls (it is only needed on windows)
+        if not _colorama_initialized and sys.platform.startswith('win'):
+            import colorama
             colorama.init()
-            logging.StreamHandler.emit = self._add_color_ANSI(logging.StreamHandler.emit)
-
-    def _add_color_ANSI(self,fn):
-        """
-        Adds colour to logs in terminal using ansi escape sequences.
-        (shamelessly borrowed from unutbu/sorin on stack-overflow)
-        """
-        def new(*args):
-            levelno = args[1].levelno
-            if(levelno>=50):
-                color = '\x1b[31m' # red
-            elif(levelno>=40):
-                color = '\x1b[31m' # red
-            elif(levelno>=30):
-                color = '\x1b[33m' # yellow
-            elif(levelno>=20):
-                color = '\x1b[32m' # green
-            elif(levelno>=10):
-                color = '\x1b[35m' # pink
-            else:
-                color = '\x1b[0m' # normal
-            args[1].msg = color + args[1].msg +  '\x1b[0m'  # normal
-            return fn(*args)
-        return new
+            _colorama_initialized = True
+
+        for handler in self.handlers:
+            if is_tty_handler( handler ):
+                self._stage( handler, formatter=ColourFormatter( fmt=self.linefmt, datefmt=self.datefmt ) )
+
+    def set_log_signals(self):
+        """
+        Installs (or removes) the signal-handlers that change the verbosity, if `log_signals`.
+        (signal-handlers are process-wide, and change the last SetLog. A newer SetLog
+        without `log_signals` removes them, so they never reconfigure an older setup)
+        """
+        global _log_signals
+
+        if _log_signals is not None:
+            if self.log_signals and _log_signals.setlog is self:
+                return
+            _log_signals.uninstall()
+            _log_signals = None
+
+        if self.log_signals:
+            if not hasattr( signal, 'SIGUSR1' ):
+                self.logdebug('log_signals are not supported on this platform')
+                return
+            _log_signals = LogSignals( self ).install()
+            self.logdebug('Installed log signal-handlers')
+
+    def set_record_attrs(self):
+        """
+        Disables the (process-wide) computation of logrecord attributes that are
+        not used by any handler/filter. Caller-info in particular (funcName, lineno, ...)
+        requires a walk of the stack for every logrecord.
+
+        __NOTE__: handlers added after SetLog are not considered. Run SetLog again
+                  after adding them. `logger.log(..., stack_info=True)` requires caller-info.
+        """
+        attrs = self.record_attrs
+        if attrs is not None:
+            attrs = set(attrs)
+            for (handler, filters) in iter_handlers_and_filters():
+                handler_attrs = handler_record_attrs( handler )
+                if handler_attrs is None:
+                    attrs = None
+                    break
+                attrs |= handler_attrs
+
+                filters_attrs = [ filter_record_attrs(_filter)  for _filter in filters ]
+                if None in filters_attrs:
+                    attrs = None
+                    break
+                for filter_attrs in filters_attrs:
+                    attrs |= filter_attrs
+
+        self.logdebug( 'enabled record attrs: %s' % (attrs if attrs is not None else 'all') )
+        set_record_attrs( attrs )
 
     def logdebug( self, msg ):
         """
@@ -520,6 +3132,887 @@ class SetLog( object ):
             print( 'loggingTools.SetLog: %s' % msg )
 
 
+class LogSignals(object):
+    """
+    Changes the verbosity of a running program when it receives signals.
+    (see `SetLog(log_signals=True)`)
+
+    .. code-block:: bash
+
+        kill -USR1 <pid>    ## more verbose:  INFO -> DEBUG -> very-verbose (filters disabled)
+        kill -USR2 <pid>    ## less verbose:  very-verbose -> DEBUG -> INFO
+        kill -QUIT <pid>    ## writes the logging configuration to stderr
+
+    The signal-handler only writes the signal's number to a (non-blocking) pipe, it does
+    not allocate or acquire locks. The logging configuration is changed by a background
+    thread (using `SetLog.reconfigure()`), so a signal that arrives while the main
+    thread holds a logging lock cannot deadlock.
+
+    __NOTE__: signal handlers can only be installed from the main thread.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    setlog     | SetLog()               |       | the logging configuration that is changed
+               |                        |       |
+    more       | signal.SIGUSR1         | (opt) | signal that increases the verbosity
+               |                        |       |
+    less       | signal.SIGUSR2         | (opt) | signal that decreases the verbosity
+               |                        |       |
+    dump       | signal.SIGQUIT, None   | (opt) | signal that writes the logging configuration to `stream`
+               |                        |       | (None does not install it)
+               |                        |       |
+    stream     | None, sys.stderr       | (opt) | where the logging configuration is written (stderr by default)
+               |                        |       |
+    """
+    _default = object()     ## (a `dump` signal was not provided)
+
+    def __init__(self, setlog, more=None, less=None, dump=_default, stream=None ):
+        ## Arguments
+        self.setlog = setlog
+        self.more   = more or signal.SIGUSR1
+        self.less   = less or signal.SIGUSR2
+        self.dump   = signal.SIGQUIT if dump is self._default else dump
+        self.stream = stream
+
+        ## Attributes
+        self.steps     = [ (logging.INFO, False), (logging.DEBUG, False), (logging.DEBUG, True) ]   ## [(level, very_verbose)]
+        self._previous = {}      ## {signum: previous signal-handler}
+        self._rfd      = None
+        self._wfd      = None
+        self._thread   = None
+
+        ## a program that logs WARNING and higher can return to it's original loglevel
+        level = setlog._loglevel()
+        if level > logging.INFO:
+            self.steps.insert( 0, (level, False) )
+
+    def install(self):
+        """
+        Installs the signal-handlers, and starts the thread that reconfigures logging.
+        """
+        import fcntl
+
+        (self._rfd, self._wfd) = os.pipe()
+        flags = fcntl.fcntl( self._wfd, fcntl.F_GETFL )
+        fcntl.fcntl( self._wfd, fcntl.F_SETFL, flags | os.O_NONBLOCK )
+
+        self._thread = threading.Thread( target=self._watch, name='supercli.logging.LogSignals' )
+        self._thread.daemon = True
+        self._thread.start()
+
+        ## everything the signal-handler uses is created ahead of time
+        wfd    = self._wfd
+        write  = os.write
+        tokens = dict([ (signum, six.int2byte(signum))  for signum in (self.more, self.less, self.dump)  if signum ])
+
+        def handle_signal( signum, frame ):
+            try:
+                write( wfd, tokens[ signum ] )
+            except OSError:     ## pipe is full (the signal is dropped)
+                pass
+
+        for signum in tokens:
+            self._previous[ signum ] = signal.signal( signum, handle_signal )
+
+        return self
+
+    def uninstall(self):
+        """
+        Restores the previous signal-handlers, and stops the thread.
+        """
+        for (signum, handler) in self._previous.items():
+            signal.signal( signum, handler if handler is not None else signal.SIG_DFL )
+        self._previous = {}
+
+        if self._wfd is not None:
+            os.close( self._wfd )      ## the thread reads EOF
+            self._thread.join()
+            os.close( self._rfd )
+            (self._rfd, self._wfd, self._thread) = (None, None, None)
+
+    def _watch(self):
+        while True:
+            try:
+                data = os.read( self._rfd, 64 )
+            except( OSError ) as e:
+                if e.errno == errno.EINTR:
+                    continue
+                return
+            if not data:
+                return
+
+            for signum in bytearray( data ):
+                try:
+                    if   signum == self.more:  self.step( 1 )
+                    elif signum == self.less:  self.step( -1 )
+                    elif signum == self.dump:  self.write_config()
+                except Exception:
+                    import traceback
+                    sys.stderr.write( '--- supercli.logging: error handling signal %s ---\n' % signum )
+                    traceback.print_exc()
+
+    def current_step(self):
+        """
+        Returns the index in `steps` of the SetLog's current verbosity
+        (or of the nearest loglevel)
+        """
+        level        = self.setlog._loglevel()
+        very_verbose = bool( self.setlog.very_verbose or 'vv' in (self.setlog.str_arg or '') )
+
+        if (level, very_verbose) in self.steps:
+            return self.steps.index( (level, very_verbose) )
+        return min( range(len(self.steps)), key=lambda i: abs( self.steps[i][0] - level ) )
+
+    def step(self, direction):
+        """
+        Increases (1) or decreases (-1) the verbosity by one step.
+        """
+        index = max( 0, min( len(self.steps) - 1, self.current_step() + direction ) )
+        (level, very_verbose) = self.steps[ index ]
+
+        ## loglevel letters in str_arg take precedence over `lv`
+        self.setlog.reconfigure(
+            lv           = level,
+            very_verbose = very_verbose,
+            str_arg      = re.sub( '[vwic]', '', self.setlog._config['str_arg'] or '' ),
+        )
+        logging.getLogger( __name__ ).warning(
+            'log verbosity changed to %s%s', logging.getLevelName(level), ' (filters disabled)' if very_verbose else '' )
+
+    def write_config(self):
+        stream = self.stream or sys.stderr
+        stream.write( format_logging_config() )
+        stream.flush()
+
+
+_log_signals = None    ## the installed LogSignals
+
+
+
+# ===============
+# Instrumentation
+# ===============
+
+class LatencyHistogram(object):
+    """
+    Histogram of durations in power-of-2 microsecond buckets.
+    (bucket N counts durations shorter than 2**N microseconds, that did not fit in bucket N-1)
+    """
+    num_buckets = 32
+
+    def __init__(self):
+        self.count   = 0
+        self.total   = 0.0
+        self.max     = 0.0
+        self.buckets = [0] * self.num_buckets
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[ min( int(seconds * 1000000).bit_length(), self.num_buckets - 1 ) ] += 1
+
+    def percentile(self, percent):
+        """
+        Returns the upper-bound (in seconds) of the bucket containing the percentile.
+        """
+        target = self.count * percent / 100.0
+        seen   = 0
+        for (i, count) in enumerate( self.buckets ):
+            seen += count
+            if count and seen >= target:
+                return 2**i / 1000000.0
+        return 0.0
+
+    def snapshot(self):
+        return {
+            'count'   : self.count,
+            'total'   : self.total,
+            'max'     : self.max,
+            'mean'    : (self.total / self.count)  if self.count else 0.0,
+            'p50'     : self.percentile(50),
+            'p99'     : self.percentile(99),
+            'buckets' : dict([ ('<%sus' % 2**i, count)  for (i, count) in enumerate(self.buckets)  if count ]),
+        }
+
+
+class _RecordCounts(object):
+    """
+    Number of records, by level and by logger.
+    """
+    def __init__(self):
+        self.total   = 0
+        self.levels  = {}    ## {levelno: count}
+        self.loggers = {}    ## {name: count}
+
+    def add(self, record):
+        self.total += 1
+        levels  = self.levels
+        loggers = self.loggers
+        levels[ record.levelno ] = levels.get( record.levelno, 0 ) + 1
+        loggers[ record.name ]   = loggers.get( record.name, 0 ) + 1
+
+    def snapshot(self):
+        return {
+            'total'   : self.total,
+            'levels'  : dict([ (logging.getLevelName(levelno), count)  for (levelno, count) in self.levels.items() ]),
+            'loggers' : dict( self.loggers ),
+        }
+
+
+class _HandlerStats(object):
+    """
+    Counts the records passed to a handler, and times it's `handle()`/`emit()`.
+    (by replacing the methods on the handler instance)
+    """
+    def __init__(self, handler, count_seen=None):
+        self.handler        = handler
+        self.handled        = _RecordCounts()   ## records passed to handle()
+        self.filtered       = _RecordCounts()   ## records dropped by the handler's filters
+        self.emitted        = _RecordCounts()   ## records passed to emit()
+        self.handle_latency = LatencyHistogram()
+        self.emit_latency   = LatencyHistogram()
+
+        handle = handler.handle
+        emit   = handler.emit
+
+        def instrumented_handle(record):
+            if count_seen:
+                count_seen( record )
+            start = _clock()
+            rv    = handle( record )
+            self.handle_latency.add( _clock() - start )
+            self.handled.add( record )
+            if not rv:
+                self.filtered.add( record )
+            return rv
+
+        def instrumented_emit(record):
+            start = _clock()
+            emit( record )
+            self.emit_latency.add( _clock() - start )
+            self.emitted.add( record )
+
+        handler.handle = instrumented_handle
+        handler.emit   = instrumented_emit
+
+    def uninstall(self):
+        self.handler.__dict__.pop( 'handle', None )
+        self.handler.__dict__.pop( 'emit',   None )
+
+    def snapshot(self):
+        data = {
+            'handled'        : self.handled.snapshot(),
+            'filtered'       : self.filtered.snapshot(),
+            'emitted'        : self.emitted.snapshot(),
+            'handle_latency' : self.handle_latency.snapshot(),
+            'emit_latency'   : self.emit_latency.snapshot(),
+        }
+        dropped = getattr( self.handler, 'dropped', None )
+        if dropped is not None:
+            data['dropped'] = dropped
+        return data
+
+
+class LogStats(object):
+    """
+    Instrumentation of the logging handlers (opt-in, see `enable_stats()`).
+
+        * records seen (created by loggers), by level and by logger
+        * for each handler: records handled, dropped by it's filters, and emitted (by level and by logger)
+        * for each handler: histograms of the time spent in it's `handle()`/`emit()`
+
+    Counters are not locked, so counts from several threads are approximate.
+    """
+    def __init__(self):
+        self.started   = time.time()
+        self.seen      = _RecordCounts()
+        self._handlers = {}       ## {handler: _HandlerStats}
+        self._factory  = None     ## logrecord-factory that counts seen records
+        self._last     = None     ## last record counted (if there is no logrecord-factory)
+
+    def instrument(self):
+        """
+        Instruments every handler (of every logger) that is not instrumented yet.
+        (including the handlers behind an AsyncHandler)
+        """
+        count_seen = None
+        if hasattr( logging, 'setLogRecordFactory' ):
+            if self._factory is None:
+                self._install_factory()
+        else:
+            count_seen = self._count_seen
+
+        loggers = [ logging.root ] + [
+            logger  for logger in list(logging.Logger.manager.loggerDict.values())
+                    if isinstance( logger, logging.Logger )
+        ]
+        for logger in loggers:
+            for handler in logger.handlers:
+                if handler not in self._handlers:
+                    self._handlers[ handler ] = _HandlerStats( handler, count_seen )
+                for target in getattr( handler, 'handlers', [] ):
+                    if target not in self._handlers:
+                        self._handlers[ target ] = _HandlerStats( target )
+
+    def _install_factory(self):
+        previous = logging.getLogRecordFactory()
+
+        def factory(*args, **kwargs):
+            record = previous( *args, **kwargs )
+            if record.name is not None:    ## (not `logging.makeLogRecord()`)
+                self.seen.add( record )
+            return record
+
+        factory.previous = previous
+        self._factory    = factory
+        logging.setLogRecordFactory( factory )
+
+    def _count_seen(self, record):
+        ## a record is passed to each handler of it's logger (and it's parents)
+        if record is not self._last:
+            self._last = record
+            self.seen.add( record )
+
+    def close(self):
+        """
+        Removes the instrumentation.
+        """
+        for handler_stats in self._handlers.values():
+            handler_stats.uninstall()
+        self._handlers = {}
+
+        if self._factory is not None:
+            if logging.getLogRecordFactory() is self._factory:
+                logging.setLogRecordFactory( self._factory.previous )
+            self._factory = None
+
+    def snapshot(self):
+        """
+        Returns the stats as a dict.
+
+        .. code-block:: python
+
+            {
+                'seconds'  : 12.5,
+                'seen'     : {'total': 1200, 'levels': {'DEBUG': 1000, 'INFO': 200}, 'loggers': {'pkg.mod': 1200}},
+                'handlers' : {
+                    '<StreamHandler <stderr> (NOTSET)>': {
+                        'handled'        : {'total': 1200, 'levels': {...}, 'loggers': {...}},
+                        'filtered'       : {'total': 1000, ...},
+                        'emitted'        : {'total': 200, ...},
+                        'handle_latency' : {'count': 1200, 'total': 0.004, 'max': 0.0002, 'mean': 3.1e-06,
+                                            'p50': 2e-06, 'p99': 3.2e-05, 'buckets': {'<2us': 1000, ...}},
+                        'emit_latency'   : {...},
+                    },
+                },
+            }
+        """
+        handlers = {}
+        for (handler, handler_stats) in list( self._handlers.items() ):
+            name = repr( handler )
+            i    = 1
+            while name in handlers:
+                i   += 1
+                name = '%s #%s' % ( repr(handler), i )
+            handlers[ name ] = handler_stats.snapshot()
+
+        return {
+            'seconds'  : time.time() - self.started,
+            'seen'     : self.seen.snapshot(),
+            'handlers' : handlers,
+        }
+
+
+def format_stats( snapshot ):
+    """
+    Formats a `LogStats.snapshot()` as a readable report.
+    """
+    def fmt_levels( counts ):
+        return ', '.join([ '%s: %s' % item  for item in sorted( counts['levels'].items() ) ])
+
+    def fmt_latency( latency ):
+        return 'mean %.1fus  p50 <%.0fus  p99 <%.0fus  max %.1fus' % (
+            latency['mean'] * 1e6, latency['p50'] * 1e6, latency['p99'] * 1e6, latency['max'] * 1e6 )
+
+    lines = [
+        '---- supercli.logging stats (%.1fs) ----' % snapshot['seconds'],
+        'records seen: %s  (%s)' % ( snapshot['seen']['total'], fmt_levels(snapshot['seen']) ),
+    ]
+    for name in sorted( snapshot['handlers'] ):
+        stats = snapshot['handlers'][ name ]
+        lines.append( name )
+        lines.append( '    handled %s  filtered %s  emitted %s%s' % (
+            stats['handled']['total'], stats['filtered']['total'], stats['emitted']['total'],
+            ('  dropped %s' % stats['dropped'])  if 'dropped' in stats else '',
+        ))
+        lines.append( '    handle  %s' % fmt_latency( stats['handle_latency'] ) )
+        lines.append( '    emit    %s' % fmt_latency( stats['emit_latency'] ) )
+
+    return '\n'.join( lines ) + '\n'
+
+
+
+# =========
+# Functions
+# =========
+
+_colorama_initialized = False
+
+_flight_recorders = weakref.WeakSet()   ## every open FlightRecorderHandler
+
+def dump_flight_recorders():
+    """
+    Writes the records stored by every `FlightRecorderHandler` to their target handlers.
+    """
+    for recorder in list(_flight_recorders):
+        try:
+            recorder.dump()
+        except Exception:
+            import traceback
+            traceback.print_exc()
+
+def logfile_index_path( logfile ):
+    """
+    Returns the path of a logfile's sidecar index. (see `supercli.logquery`)
+    ('program.log' -> 'program.log.idx',  'program.log.1.gz' -> 'program.log.1.idx')
+    """
+    for ext in BufferedRotatingFileHandler.compressors.values():
+        if logfile.endswith( ext ):
+            logfile = logfile[ : -len(ext) ]
+    return logfile + '.idx'
+
+def rename_logfile( src, dst ):
+    """
+    Renames a logfile (and it's sidecar index), replacing `dst`.
+    """
+    for (src, dst) in ( (src, dst), (logfile_index_path(src), logfile_index_path(dst)) ):
+        if os.path.exists( dst ):
+            os.remove( dst )
+        if os.path.exists( src ):
+            os.rename( src, dst )
+
+def remove_logfile( path ):
+    """
+    Deletes a logfile (and it's sidecar index)
+    """
+    for path in ( path, logfile_index_path(path) ):
+        if os.path.exists( path ):
+            os.remove( path )
+
+def unregister_atexit( func ):
+    """
+    Removes a function registered with `atexit.register()`.
+    (python-2 cannot unregister it, it stays registered)
+    """
+    import atexit
+    unregister = getattr( atexit, 'unregister', None )
+    if unregister is not None:
+        unregister( func )
+
+def process_exists( pid ):
+    """
+    Returns True if a process with the id `pid` is running.
+    (on windows, only this process is known to exist. `os.kill(pid, 0)` would terminate it)
+    """
+    if pid == os.getpid():
+        return True
+    if sys.platform.startswith('win'):
+        return False
+    try:
+        os.kill( pid, 0 )
+    except( OSError ) as e:
+        return e.errno != errno.ESRCH   ## (EPERM: it belongs to another user)
+    return True
+
+_log_stats = None    ## LogStats, if enabled
+
+_ratelimits = weakref.WeakSet()   ## RateLimit filters whose summaries are logged at exit
+_ratelimits_atexit = False
+
+def _register_atexit_ratelimits():
+    """
+    Logs the summaries of every RateLimit at exit (registered once).
+    """
+    global _ratelimits_atexit
+    import atexit
+
+    if not _ratelimits_atexit:
+        atexit.register( _close_ratelimits )
+        _ratelimits_atexit = True
+
+def _close_ratelimits():
+    for ratelimit in list( _ratelimits ):
+        ratelimit.close()
+
+_reconfigure_lock = threading.RLock()   ## serializes `SetLog.reconfigure()`
+
+_module_levels = {}    ## {logger-name: (level set by `set_module_levels()`, the logger's level before it)}
+
+def parse_module_levels( spec ):
+    """
+    Parses the loglevels of loggers.
+
+    .. code-block:: python
+
+        parse_module_levels( 'pkg.mod=DEBUG,other=WARNING' )    ## {'pkg.mod': 10, 'other': 30}
+        parse_module_levels( {'pkg.mod': 'DEBUG'} )             ## {'pkg.mod': 10}
+    """
+    if not spec:
+        return {}
+
+    if isinstance( spec, six.string_types ):
+        items = []
+        for entry in spec.split(','):
+            if not entry.strip():
+                continue
+            if '=' not in entry:
+                raise ValueError( "expected 'logger=LEVEL'. received: %s" % entry )
+            (name, level) = entry.split( '=', 1 )
+            items.append( (name.strip(), level.strip()) )
+    else:
+        items = spec.items()
+
+    levels = {}
+    for (name, level) in items:
+        if not name:
+            raise ValueError( 'expected a logger name for loglevel: %s' % level )
+        if isinstance( level, six.string_types ):
+            level = int(level) if level.isdigit() else logging.getLevelName( level.upper() )
+        if not isinstance( level, Number ):
+            raise ValueError( 'unknown loglevel for logger %s: %s' % (name, level) )
+        levels[ name ] = level
+    return levels
+
+def set_module_levels( levels ):
+    """
+    Sets the loglevel of loggers `{logger-name: level}`.
+
+    Loggers set by the previous call that are not in `levels` get back the level they had
+    before it (unless the program has changed their level since).
+    """
+    global _module_levels
+
+    previous = {}
+    for (name, (level, before)) in _module_levels.items():
+        logger = logging.getLogger( name )
+        if name in levels:
+            previous[ name ] = before
+        elif logger.level == level:
+            logger.setLevel( before )
+
+    configured = {}
+    for (name, level) in levels.items():
+        logger = logging.getLogger( name )
+        configured[ name ] = ( level, previous.get( name, logger.level ) )
+        logger.setLevel( level )
+    _module_levels = configured
+
+def enable_stats():
+    """
+    Enables the instrumentation of all handlers (handlers added later are instrumented
+    by `SetLog`, or by calling `enable_stats()` again). Returns the `LogStats`.
+    see `stats_snapshot()`, `dump_stats()`
+    """
+    global _log_stats
+    if _log_stats is None:
+        _log_stats = LogStats()
+    _log_stats.instrument()
+    return _log_stats
+
+def disable_stats():
+    """
+    Removes the instrumentation of all handlers (and discards the stats)
+    """
+    global _log_stats
+    if _log_stats is not None:
+        _log_stats.close()
+        _log_stats = None
+
+def stats_snapshot():
+    """
+    Returns the stats collected since `enable_stats()` as a dict (or None if disabled).
+    see `LogStats.snapshot()`
+    """
+    if _log_stats is None:
+        return None
+    return _log_stats.snapshot()
+
+def dump_stats( stream=None ):
+    """
+    Writes a report of the stats collected since `enable_stats()` (to stderr by default).
+    """
+    if _log_stats is None:
+        return
+    ( stream or sys.stderr ).write( format_stats( _log_stats.snapshot() ) )
+
+def wait_for_rotations():
+    """
+    Blocks until all rotated logfiles have been compressed.
+    """
+    _rotation_worker.wait()
+
+## LogRecord attributes that are not `extra` attributes
+_logrecord_size  = len( logging.makeLogRecord({}).__dict__ )
+_logrecord_attrs = frozenset( list(logging.makeLogRecord({}).__dict__) + ['message', 'asctime'] )
+_ordered_dicts   = sys.version_info >= (3, 7)
+
+## attributes that are not written as `extra` attributes by the JsonFormatter (including supercli's own)
+_json_skip_attrs = _logrecord_attrs | frozenset([ 'stack', 'ratelimit_summary' ])
+
+def json_encoder():
+    """
+    Returns a function that serializes a dict as a single-line JSON string.
+    (using `orjson` if it is installed, otherwise `json`)
+    """
+    import json
+    encoder = json.JSONEncoder( ensure_ascii=False, separators=(',',':'), default=_json_default )
+
+    try:
+        import orjson
+    except( ImportError ):
+        return encoder.encode
+
+    dumps = orjson.dumps
+
+    def encode( data ):
+        try:
+            return dumps( data, default=_json_default ).decode('utf-8')
+        except( TypeError ):
+            ## non-text dict keys, integers larger than 64bits, invalid unicode, ...
+            return encoder.encode( data )
+
+    return encode
+
+def _json_default( value ):
+    try:
+        return six.text_type( value )
+    except Exception:
+        return repr( value )
+
+_clock = getattr( time, 'perf_counter', time.time )
+
+## LogRecord attributes that can be disabled process-wide
+_logging_srcfile = logging._srcfile
+_caller_attrs    = frozenset([ 'pathname', 'filename', 'module', 'funcName', 'lineno' ])
+
+def fmt_record_attrs( fmt ):
+    """
+    Returns the set of logrecord attributes used in a lineformat.
+    ( '%(name)s', '{name}' or '${name}' style )
+    """
+    attrs = set()
+    for match in re.finditer( '%\\(([a-zA-Z_][a-zA-Z0-9_]*)\\)|\\{([a-zA-Z_][a-zA-Z0-9_]*)|\\$\\{?([a-zA-Z_][a-zA-Z0-9_]*)', fmt or '' ):
+        attrs.add( match.group(1) or match.group(2) or match.group(3) )
+    return attrs
+
+def handler_record_attrs( handler ):
+    """
+    Returns the set of logrecord attributes used by a handler (and it's formatter),
+    or None if they cannot be determined.
+    """
+    attrs = getattr( handler, 'record_attrs', None )
+    if attrs is not None:
+        return set(attrs)
+
+    ## handlers that only use their formatter
+    ## (if `logging.handlers` was never imported, the handler cannot be a SocketHandler)
+    if not isinstance( handler, (logging.StreamHandler, logging.NullHandler, BufferedRotatingFileHandler) ):
+        return None
+    handlers_module = sys.modules.get( 'logging.handlers' )
+    if handlers_module is not None and isinstance( handler, handlers_module.SocketHandler ):
+        return None
+
+    formatter = handler.formatter
+    if formatter is None:
+        return set(['message'])
+
+    attrs = getattr( formatter, 'record_attrs', None )
+    if attrs is not None:
+        return set(attrs)
+
+    format_method = getattr( type(formatter).format, '__func__', type(formatter).format )
+    if format_method is not getattr( logging.Formatter.format, '__func__', logging.Formatter.format ):
+        return None
+
+    return fmt_record_attrs( formatter._fmt )
+
+def filter_record_attrs( _filter ):
+    """
+    Returns the set of logrecord attributes used by a filter,
+    or None if they cannot be determined.
+    """
+    attrs = getattr( _filter, 'record_attrs', None )
+    if attrs is not None:
+        return set(attrs)
+    if type(_filter) is logging.Filter:
+        return set(['name'])
+    return None
+
+def iter_handlers_and_filters():
+    """
+    Yields `(handler, filters)` for every handler on every logger, where
+    filters are the handler's filters and it's logger's filters.
+    """
+    loggers = [ logging.root ] + [
+        logger  for logger in list(logging.Logger.manager.loggerDict.values())
+                if isinstance( logger, logging.Logger )
+    ]
+
+    for logger in loggers:
+        for handler in logger.handlers:
+            for target in getattr( handler, 'handlers', [handler] ):
+                yield ( target, logger.filters + handler.filters + (target.filters if target is not handler else []) )
+
+def set_record_attrs( attrs=None ):
+    """
+    Enables/Disables the computation of logrecord attributes process-wide.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    attrs     | None, set(['message','lineno'])   | (opt) | the logrecord attributes that are used.
+              |                                   |       | caller-info, thread, process and processName are
+              |                                   |       | only computed if they are used. (None enables all)
+              |                                   |       |
+    """
+    def enabled( *names ):
+        return attrs is None or any( name in attrs  for name in names )
+
+    if enabled( *_caller_attrs ):   logging._srcfile = _logging_srcfile
+    else:                           logging._srcfile = None
+
+    logging.logThreads         = enabled( 'thread', 'threadName' )
+    logging.logProcesses       = enabled( 'process' )
+    logging.logMultiprocessing = enabled( 'processName' )
+    if hasattr( logging, 'logAsyncioTasks' ):
+        logging.logAsyncioTasks = enabled( 'taskName' )
+
+
+_stack_internal_files = set([
+    six.get_function_code( logging.Logger.handle ).co_filename,
+    os.path.splitext(__file__)[0] + '.py',
+])
+_stack_line_cache = {}        ## {(code, lineno): formatted stack line}
+_stack_line_cache_size = 4096 ## max number of cached stack lines before the cache is reset
+
+def capture_stack( limit=5 ):
+    """
+    Captures up to `limit` frames from the stack of the caller
+    (skipping frames from the `logging` module, and this module)
+    as a list of `(code, lineno)`, ordered outermost-first like `traceback.format_stack()`.
+    """
+    frame = sys._getframe(1)
+
+    while frame is not None  and  frame.f_code.co_filename in _stack_internal_files:
+        frame = frame.f_back
+
+    frames = []
+    while frame is not None  and  len(frames) < limit:
+        frames.append( (frame.f_code, frame.f_lineno) )
+        frame = frame.f_back
+
+    frames.reverse()
+    return frames
+
+def format_stack_frame( code, lineno ):
+    """
+    Formats a frame-line like `traceback.format_stack()` (cached by `(code,lineno)`)
+    """
+    key = (code, lineno)
+    try:
+        return _stack_line_cache[key]
+    except( KeyError ):
+        pass
+
+    import linecache
+
+    line = '  File "%s", line %s, in %s\n' % ( code.co_filename, lineno, code.co_name )
+    source = linecache.getline( code.co_filename, lineno ).strip()
+    if source:
+        line += '    %s\n' % source
+
+    if len(_stack_line_cache) >= _stack_line_cache_size:
+        _stack_line_cache.clear()
+    _stack_line_cache[key] = line
+
+    return line
+
+
+class LazyStack(object):
+    """
+    A stack captured by `capture_stack()` that is only formatted
+    when it is converted to a string.
+    """
+    __slots__ = ('frames', '_text')
+
+    def __init__(self, frames):
+        self.frames = frames
+        self._text  = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = '\x1b[36m%s\x1b[0m' % ''.join(
+                format_stack_frame( code, lineno )   for (code,lineno) in self.frames
+            )
+        return self._text
+
+    __unicode__ = __str__
+
+def format_logging_config():
+    """
+    Describes the level, filters and handlers (formatters, filters, ...) of every
+    logger that has been configured. (see `LogSignals`)
+    """
+    def describe_filters( filters, indent ):
+        return [ '%sfilter:    %s' % ( indent, repr(_filter) )  for _filter in filters ]
+
+    def describe_handler( handler, indent ):
+        lines = [ '%s%s' % ( indent, repr(handler) ) ]
+        indent += '    '
+        if handler.formatter is not None:
+            fmt = getattr( handler.formatter, '_fmt', None )
+            lines.append( '%sformatter: %s %s' % ( indent, type(handler.formatter).__name__, repr(fmt) if fmt else '' ) )
+        lines.extend( describe_filters( handler.filters, indent ) )
+
+        targets = getattr( handler, 'handlers', None ) or getattr( handler, 'target', None ) or []
+        for target in ( targets if isinstance(targets, list) else [targets] ):
+            lines.extend( describe_handler( target, indent ) )
+        return lines
+
+    loggers = [ logging.root ] + sorted([
+        logger  for logger in list(logging.Logger.manager.loggerDict.values())
+                if isinstance( logger, logging.Logger ) and ( logger.level or logger.handlers or logger.filters )
+    ], key=lambda logger: logger.name )
+
+    lines = [ '---- supercli.logging config ----' ]
+    for logger in loggers:
+        lines.append( '%s  level=%s%s' % (
+            logger.name, logging.getLevelName(logger.level), '' if logger.propagate else '  propagate=False' ) )
+        lines.extend( describe_filters( logger.filters, '    ' ) )
+        for handler in logger.handlers:
+            lines.extend( describe_handler( handler, '    ' ) )
+
+    lines.append( 'caller-info: %s' % ( 'on' if logging._srcfile else 'off' ) )
+    return '\n'.join( lines ) + '\n'
+
+def is_tty_handler( handler ):
+    """
+    Returns True if `handler` writes to a terminal.
+    """
+    if not isinstance( handler, logging.StreamHandler ):
+        return False
+    if isinstance( handler, logging.FileHandler ):
+        return False
+
+    isatty = getattr( handler.stream, 'isatty', None )
+    try:
+        return bool( isatty and isatty() )
+    except( ValueError ):   ## closed stream
+        return False
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Name :          supercli/logquery.py
+Created :       Oct 16 2026
+Author :        Will Pittman
+Contact :       willjpittman@gmail.com
+________________________________________________________________________________
+Description :   Finds logrecords in (rotated) logfiles written by `SetLog(logfile_index=True)`
+                by time, level and logger name, without reading the whole logfile.
+
+                    supercli-logquery -l ERROR -n pkg.mod --since 1h /var/log/program.log
+                    python -m supercli.logquery --since '2016-09-04 17:00' --until 5m /var/log/program.log
+
+
+                The sidecar index ('program.log.idx') is appended to by `BufferedRotatingFileHandler`
+                each time it writes it's buffer. It is a JSON-lines file:
+
+                    {"version":1}
+                    {"start":0,"end":1830,"t0":1473012063.04,"t1":1473012064.8,"levels":[20,40],
+                     "loggers":{"pkg.mod":{"20":[0,0,82,17,...],"40":[164,1760]}}}
+                    ...
+
+                Each line after the first describes a block of the logfile: it's byte-range, the
+                time of it's first/last record, and for each logger/level pair the offset (from `start`)
+                and time (msecs after `t0`) of each record. A record ends where the next one starts.
+
+                Queries skip blocks that cannot match (by time, level), and only
+                read the matching records from the memory-mapped logfile.
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import logging
+import json
+import time
+import glob
+import sys
+import re
+import os
+## custom
+from   .logging      import logfile_index_path, BufferedRotatingFileHandler
+from   .logview      import open_logfile
+
+
+loc = locals
+
+
+def read_index( logfile ):
+    """
+    Returns the blocks of a logfile's sidecar index (a partially written last line is ignored).
+    """
+    path = logfile_index_path( logfile )
+    if not os.path.isfile( path ):
+        return []
+
+    blocks = []
+    with open( path, 'rb' ) as fd:
+        for line in fd:
+            try:
+                block = json.loads( line.decode('utf-8') )
+            except( ValueError ):
+                continue
+            if 'start' in block:
+                blocks.append( block )
+    return blocks
+
+def find_logfiles( logfile ):
+    """
+    Returns a logfile, and it's rotated backups (oldest first).
+    ( ['program.log.2.gz', 'program.log.1.gz', 'program.log'] )
+    """
+    exts    = [''] + sorted( BufferedRotatingFileHandler.compressors.values() )
+    pattern = re.compile( '^%s\\.(\\d+)(%s)$' % ( re.escape(os.path.basename(logfile)), '|'.join([ re.escape(e) for e in exts ]) ) )
+
+    backups = []
+    for path in glob.glob( logfile + '.*' ):
+        match = pattern.match( os.path.basename(path) )
+        if match:
+            backups.append( (int(match.group(1)), path) )
+
+    return [ path  for (i, path) in sorted( backups, reverse=True ) ] + [ logfile ]
+
+def match_logger( name, loggers ):
+    """
+    True if `name` is one of `loggers` or a child of one of them (same as `logging.Filter`)
+    """
+    for logger in loggers:
+        if name == logger or name.startswith( logger + '.' ):
+            return True
+    return False
+
+def query( logfile, since=None, until=None, level=None, loggers=None, unindexed=None ):
+    """
+    Yields `(created, data)` for each logrecord in a logfile that matches the query.
+    Records are yielded in the order they were written.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    logfile    | '/var/log/program.log'    |       | logfile written with `SetLog(logfile_index=True)`
+               |                           |       | (may be a compressed backup)
+               |                           |       |
+    since      | None, 1473012063.0        | (opt) | only records logged at/after this time
+               |                           |       |
+    until      | None, 1473012063.0        | (opt) | only records logged at/before this time
+               |                           |       |
+    level      | None, logging.WARNING     | (opt) | only records of this level or higher
+               |                           |       |
+    loggers    | None, ['pkg.mod', ...]    | (opt) | only records from these loggers (or their children)
+               |                           |       |
+    unindexed  | None, []                  | (opt) | if provided, the byte-ranges `(start, end)` of the logfile
+               |                           |       | that are not indexed are appended to this list.
+               |                           |       |
+    """
+    blocks = read_index( logfile )
+
+    with open_logfile( logfile ) as data:
+        size    = len(data)
+        covered = 0
+
+        for block in blocks:
+            (start, end, t0) = ( block['start'], block['end'], block['t0'] )
+
+            ## index written for a different logfile
+            if end > size or start < covered:
+                continue
+
+            if unindexed is not None and start > covered:
+                unindexed.append( (covered, start) )
+            covered = end
+
+            if since is not None and block['t1'] < since:     continue
+            if until is not None and t0 > until:              continue
+            if level is not None and block['levels'][-1] < level: continue
+
+            offsets  = []    ## every record in the block
+            selected = []    ## [(offset, created)] matching records
+            for (name, levels) in block['loggers'].items():
+                name_matches = not loggers or match_logger( name, loggers )
+
+                for (levelno, entries) in levels.items():
+                    level_matches = name_matches and ( level is None or int(levelno) >= level )
+
+                    for i in range( 0, len(entries), 2 ):
+                        offsets.append( entries[i] )
+                        if not level_matches:
+                            continue
+
+                        created = t0 + entries[i+1] / 1000.0
+                        if since is not None and created < since:   continue
+                        if until is not None and created > until:   continue
+                        selected.append( (entries[i], created) )
+
+            if not selected:
+                continue
+
+            offsets.sort()
+            next_offsets = dict( zip( offsets, offsets[1:] + [end - start] ) )
+            for (offset, created) in sorted( selected ):
+                yield ( created, data[ start + offset : start + next_offsets[offset] ] )
+
+        if unindexed is not None and covered < size:
+            unindexed.append( (covered, size) )
+
+def parse_time( text, now=None ):
+    """
+    Parses a time as seconds since the epoch.
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    text     | '30s', '5m', '1h', '2d'                |       | a duration before `now`,
+             | '2016-09-04', '2016-09-04 17:21[:03]'  |       | a local date/time,
+             | '1473012063.0'                         |       | or seconds since the epoch.
+             |                                        |       |
+    """
+    if now is None:
+        now = time.time()
+
+    match = re.match( '^(\\d+(?:\\.\\d+)?)([smhd])$', text )
+    if match:
+        seconds = { 's':1, 'm':60, 'h':3600, 'd':86400 }[ match.group(2) ]
+        return now - float(match.group(1)) * seconds
+
+    if re.match( '^\\d+(\\.\\d+)?$', text ):
+        return float(text)
+
+    for fmt in ( '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M', '%Y-%m-%d' ):
+        try:
+            return time.mktime( time.strptime( text, fmt ) )
+        except( ValueError ):
+            pass
+
+    raise ValueError( 'unable to parse time: %s' % text )
+
+def main( argv=None ):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog        = 'supercli-logquery',
+        description = 'Finds logrecords in logfiles written by `SetLog(logfile_index=True)` (and their rotated backups)',
+    )
+    parser.add_argument( 'logfiles', nargs='+', metavar='/var/log/program.log',
+        help='logfiles to search (rotated backups of each logfile are also searched)' )
+    parser.add_argument( '-l', '--level', default=None,
+        help="only records of this level or higher ('WARNING', 30, ...)" )
+    parser.add_argument( '-n', '--logger', action='append', default=None, metavar='pkg.mod',
+        help='only records from this logger (or it\'s children). (may be repeated)' )
+    parser.add_argument( '--since', default=None, metavar='1h',
+        help="only records logged since this time ('30m', '1h', '2016-09-04 17:21', ...)" )
+    parser.add_argument( '--until', default=None, metavar='5m',
+        help="only records logged before this time ('30m', '1h', '2016-09-04 17:21', ...)" )
+    parser.add_argument( '--no-backups', action='store_true',
+        help='do not search rotated backups of the logfiles' )
+
+    args = parser.parse_args( argv )
+
+    level = args.level
+    if level is not None:
+        level = int(level) if level.isdigit() else logging.getLevelName( level.upper() )
+        if not isinstance( level, int ):
+            parser.error( 'unknown loglevel: %s' % args.level )
+
+    try:
+        now   = time.time()
+        since = parse_time( args.since, now )  if args.since else None
+        until = parse_time( args.until, now )  if args.until else None
+    except( ValueError ) as e:
+        parser.error( str(e) )
+
+    stdout = getattr( sys.stdout, 'buffer', sys.stdout )
+    for logfile in args.logfiles:
+        paths = [ logfile ] if args.no_backups else find_logfiles( logfile )
+
+        for path in paths:
+            if not os.path.isfile( path ):
+                continue
+
+            unindexed = []
+            for (created, data) in query( path, since, until, level, args.logger, unindexed ):
+                stdout.write( data )
+
+            nbytes = sum([ end - start  for (start, end) in unindexed ])
+            if nbytes:
+                stdout.flush()
+                sys.stderr.write( 'supercli-logquery: %s bytes of %s are not indexed (not searched)\n' % (nbytes, path) )
+
+    stdout.flush()
+
+
+
+if __name__ == '__main__':
+    main()
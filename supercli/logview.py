@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Name :          supercli/logview.py
+Created :       Oct 16 2026
+Author :        Will Pittman
+Contact :       willjpittman@gmail.com
+________________________________________________________________________________
+Description :   Reads binary logfiles (written by `supercli.logging.BinaryLogHandler`),
+                and formats their records using one of `SetLog`'s lineformat presets.
+
+                    python -m supercli.logview /var/log/program.binlog
+                    python -m supercli.logview -f dev -l WARNING /var/log/program.binlog*
+________________________________________________________________________________
+"""
+## builtins
+from   __future__    import unicode_literals
+from   __future__    import absolute_import
+from   __future__    import print_function
+import contextlib
+import logging
+import mmap
+import sys
+import os
+## external
+import six
+## custom
+from   .logging      import SetLog, Formatter, JsonFormatter, BinaryLogHandler
+
+
+loc = locals
+
+## {logfmt: (linefmt, datefmt)}
+presets = {
+    'norm'  : ( SetLog.linefmt_norm, SetLog.datefmt_norm ),
+    'dev'   : ( SetLog.linefmt_dev,  SetLog.datefmt_norm ),
+    'long'  : ( SetLog.linefmt_long, None ),
+}
+
+
+@contextlib.contextmanager
+def open_logfile( path ):
+    """
+    Context-manager that provides the contents of a binary logfile
+    (memory-mapped, or decompressed if it was compressed on rotation)
+    """
+    if path.endswith('.gz'):
+        import gzip
+        with contextlib.closing( gzip.open(path, 'rb') ) as fd:
+            yield fd.read()
+        return
+
+    if path.endswith('.zst'):
+        import zstandard
+        with open( path, 'rb' ) as fd:
+            yield zstandard.ZstdDecompressor().decompressobj().decompress( fd.read() )
+        return
+
+    with open( path, 'rb' ) as fd:
+        if not os.fstat( fd.fileno() ).st_size:
+            yield b''
+            return
+        data = mmap.mmap( fd.fileno(), 0, access=mmap.ACCESS_READ )
+        try:
+            yield data
+        finally:
+            data.close()
+
+def iter_records( paths, level=None ):
+    """
+    Yields the logrecords stored in each binary logfile (in the order provided).
+
+    ________________________________________________________________________________________________________
+    INPUT:
+    ________________________________________________________________________________________________________
+    paths     | ['/var/log/program.binlog']  |       | binary logfiles to read
+              |                              |       |
+    level     | None, logging.WARNING        | (opt) | only yield records of this level or higher
+              |                              |       |
+    """
+    for path in paths:
+        with open_logfile( path ) as data:
+            for record in BinaryLogHandler.read( data ):
+                if level is None or record.levelno >= level:
+                    yield record
+
+def get_formatter( logfmt='norm' ):
+    """
+    Returns a formatter for one of `presets`, 'json', or a '%'-style lineformat.
+    """
+    if logfmt == 'json':
+        return JsonFormatter()
+    if logfmt in presets:
+        (linefmt, datefmt) = presets[ logfmt ]
+        return Formatter( fmt=linefmt, datefmt=datefmt )
+    return Formatter( fmt=logfmt )
+
+def format_record( formatter, record ):
+    """
+    Formats a record. If the message's arguments no longer match it's
+    format-string (ex: an argument that was stored as text), they are appended to the message.
+    """
+    try:
+        return formatter.format( record )
+    except( TypeError, ValueError, KeyError ):
+        record = logging.makeLogRecord( dict(record.__dict__) )
+        record.msg  = '%s %s' % ( record.msg, repr(record.args) )
+        record.args = ()
+        return formatter.format( record )
+
+def main( argv=None ):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog        = 'python -m supercli.logview',
+        description = 'Formats the records of binary logfiles written by `supercli.logging.BinaryLogHandler`',
+    )
+    parser.add_argument( 'paths', nargs='+', metavar='/var/log/program.binlog',
+        help='binary logfiles (rotated/compressed logfiles are accepted)' )
+    parser.add_argument( '-f', '--logfmt', default='norm',
+        help="lineformat preset ('norm', 'dev', 'long', 'json') or a lineformat ('%%(levelname)s %%(message)s')" )
+    parser.add_argument( '-l', '--level', default=None,
+        help="only display records of this level or higher ('WARNING', 30, ...)" )
+
+    args = parser.parse_args( argv )
+
+    level = args.level
+    if level is not None:
+        level = int(level) if level.isdigit() else logging.getLevelName( level.upper() )
+        if not isinstance( level, int ):
+            parser.error( 'unknown loglevel: %s' % args.level )
+
+    formatter = get_formatter( args.logfmt )
+    for record in iter_records( args.paths, level ):
+        text = format_record( formatter, record ) + '\n'
+        if six.PY2:
+            text = text.encode('utf-8')
+        sys.stdout.write( text )
+
+
+
+if __name__ == '__main__':
+    main()
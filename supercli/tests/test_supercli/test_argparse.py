@@ -0,0 +1,230 @@
+import unittest
+try:
+    import mock
+except:
+    from unittest import mock
+
+import argparse
+import logging
+import os
+import supercli.argparse
+
+
+class CacheTestCase( unittest.TestCase ):
+    """
+    Replaces `supercli.argparse.colourize_cache` with a cache in a temporary directory.
+    """
+    def setUp(self):
+        import tempfile
+        self.tempdir   = tempfile.mkdtemp()
+        self.cachepath = os.path.join( self.tempdir, 'supercli', 'colourize.json' )
+        self._cache    = supercli.argparse.colourize_cache
+        supercli.argparse.colourize_cache = supercli.argparse.ColourizeCache( self.cachepath )
+
+    def tearDown(self):
+        import shutil
+        supercli.argparse.colourize_cache = self._cache
+        shutil.rmtree( self.tempdir )
+
+
+class TestHelpColourization( CacheTestCase ):
+    def setUp(self):
+        CacheTestCase.setUp(self)
+        self._root_handlers = logging.root.handlers[:]
+        self._root_level    = logging.root.level
+
+        self.parser = supercli.argparse.ArgumentParser( description='Does ``things``', autocomp_cmd='prog', prog='prog' )
+        self.parser.add_argument( '--opt', help='Sets *opt* (default: %(default)s)', default=3 )
+        subparsers = self.parser.add_subparsers( dest='cmd' )
+        self.subparser = subparsers.add_parser( 'run', help='Runs ``it``', description='Runs ``it``' )
+
+    def tearDown(self):
+        for handler in logging.root.handlers:
+            if handler not in self._root_handlers:
+                handler.close()
+        logging.root.handlers = self._root_handlers
+        logging.root.setLevel( self._root_level )
+        CacheTestCase.tearDown(self)
+
+    def test_help_is_stored_raw(self):
+        actions = dict([ (a.dest, a)  for a in self.parser._actions ])
+        self.assertEqual( actions['opt'].help, 'Sets *opt* (default: %(default)s)' )
+        self.assertEqual( self.parser.description, 'Does ``things``' )
+        self.assertEqual( self.subparser.get_info()['help'], 'Runs ``it``' )
+
+    def test_parse_args_does_not_colourize(self):
+        with mock.patch( 'sys.argv', ['prog'] ):
+            with mock.patch( 'supercli.argparse.highlight' ) as highlight:
+                args = self.parser.parse_args( ['--opt', '5'] )
+        self.assertEqual( args.opt, '5' )
+        self.assertEqual( highlight.call_count, 0 )
+
+    def test_format_help_colourizes(self):
+        text = self.parser.format_help()
+        self.assertIn( '\033[', text )
+        self.assertIn( 'default: 3', text )
+        self.assertIn( '\033[', self.subparser.format_help() )
+
+    def test_lexer_is_created_once_per_help(self):
+        from pygments.lexers.markup import RstLexer
+        created = []
+        class Lexer( RstLexer ):
+            def __init__(self, *args, **kwds):
+                created.append( self )
+                RstLexer.__init__(self, *args, **kwds)
+
+        parser = supercli.argparse.ArgumentParser( description='text', autocomp_cmd='prog', helpline_lexer=Lexer )
+        parser.add_argument( '--a', help='a' )
+        parser.add_argument( '--b', help='b' )
+        parser.format_help()
+        self.assertEqual( len(created), 1 )
+
+    def test_builtin_highlighter_is_not_cached(self):
+        self.parser.format_help()
+        supercli.argparse.colourize_cache.save()
+        self.assertFalse( os.path.isfile(self.cachepath) )
+
+
+class TestDefaultParser( unittest.TestCase ):
+    def setUp(self):
+        self._root_handlers = logging.root.handlers[:]
+        self._root_level    = logging.root.level
+
+        self.parser = supercli.argparse.ArgumentParser( description='Does ``things``', autocomp_cmd='prog', prog='prog' )
+        self.parser.add_argument( 'src' )
+        subparsers = self.parser.add_subparsers( dest='cmd' )
+        subparser  = subparsers.add_parser( 'run', help='Runs ``it``' )
+        subparser.add_argument( '--fast', action='store_true' )
+        self.parser.add_argument( '--late', default=3 )
+
+    def tearDown(self):
+        for handler in logging.root.handlers:
+            if handler not in self._root_handlers:
+                handler.close()
+        logging.root.handlers = self._root_handlers
+        logging.root.setLevel( self._root_level )
+
+    def test_built_from_specs(self):
+        default_parser = self.parser.default_parser
+        self.assertIs( type(default_parser), argparse.ArgumentParser )
+        self.assertNotIn( '\033[', default_parser.format_help() )
+
+        args = default_parser.parse_args( ['a', '--late', '4', 'run', '--fast'] )
+        self.assertEqual( (args.src, args.late, args.cmd, args.fast), ('a', '4', 'run', True) )
+
+    def test_cached(self):
+        default_parser = self.parser.default_parser
+        default_parser.add_argument( '--extra' )
+        self.assertIs( self.parser.default_parser, default_parser )
+        self.assertEqual( default_parser.parse_args( ['a', '--extra', 'b'] ).extra, 'b' )
+
+    def test_rebuilt_after_changes(self):
+        default_parser = self.parser.default_parser
+        self.parser.add_argument( '--added' )
+        self.assertIsNot( self.parser.default_parser, default_parser )
+        self.assertEqual( self.parser.default_parser.parse_args( ['a', '--added', 'b'] ).added, 'b' )
+
+        ## arguments added to a subparser
+        default_parser = self.parser.default_parser
+        self.parser.subparsers_obj.get_subparsers()[0].add_argument( '--slow', action='store_true' )
+        self.assertIsNot( self.parser.default_parser, default_parser )
+        self.assertTrue( self.parser.default_parser.parse_args( ['a', 'run', '--slow'] ).slow )
+
+    def test_only_built_with_flag(self):
+        build_default_parser = supercli.argparse.ArgumentParser._build_default_parser
+        with mock.patch.object( supercli.argparse.ArgumentParser, '_build_default_parser',
+                                autospec=True, side_effect=build_default_parser ) as build:
+            with mock.patch( 'sys.argv', ['prog', 'a', 'run'] ):
+                self.parser.parse_args( ['a', 'run'] )
+            self.assertEqual( build.call_count, 0 )
+
+            with mock.patch( 'sys.argv', ['prog', '--default-parser', 'a', 'run'] ):
+                args = self.parser.parse_args( ['--default-parser', 'a', 'run'] )
+            self.assertTrue( build.called )
+            self.assertEqual( (args.src, args.cmd, args.default_parser), ('a', 'run', True) )
+
+
+class TestLogStats( unittest.TestCase ):
+    def test_stats_dumped_after_loghandlers_stop(self):
+        parser = supercli.argparse.ArgumentParser( autocomp_cmd='prog', prog='prog' )
+        calls  = mock.Mock()
+        with mock.patch( 'supercli.argparse.atexit', calls.atexit ):
+            with mock.patch.object( parser, '_build_loghandler', calls.build_loghandler ):
+                with mock.patch( 'sys.argv', ['prog', '--log-stats'] ):
+                    try:
+                        parser.parse_args( ['--log-stats'] )
+                    finally:
+                        supercli.logging.disable_stats()
+
+        ## (loghandlers register their `stop()` when they are built. atexit calls them first)
+        self.assertEqual( [ c[0] for c in calls.mock_calls ], ['atexit.register', 'build_loghandler'] )
+        self.assertIs( calls.atexit.register.call_args[0][0], supercli.logging.dump_stats )
+
+
+class TestColourizeCache( CacheTestCase ):
+    def test_cached_text_is_read_by_other_processes(self):
+        from pygments.lexers.markup import RstLexer
+        from pygments.formatters    import TerminalFormatter
+        text = supercli.argparse.colourize_text( 'Sets ``opt``', RstLexer, TerminalFormatter )
+        supercli.argparse.colourize_cache.save()
+        self.assertTrue( os.path.isfile(self.cachepath) )
+
+        supercli.argparse.colourize_cache = supercli.argparse.ColourizeCache( self.cachepath )
+        with mock.patch( 'supercli.argparse.highlight' ) as highlight:
+            self.assertEqual( supercli.argparse.colourize_text( 'Sets ``opt``', RstLexer, TerminalFormatter ), text )
+        self.assertEqual( highlight.call_count, 0 )
+
+    def test_key(self):
+        from pygments.lexers.markup import RstLexer, MarkdownLexer
+        from pygments.formatters    import TerminalFormatter
+        key = supercli.argparse.ColourizeCache.key
+
+        self.assertEqual(    key('a', RstLexer, TerminalFormatter), key('a', RstLexer, TerminalFormatter) )
+        self.assertNotEqual( key('a', RstLexer, TerminalFormatter), key('b', RstLexer, TerminalFormatter) )
+        self.assertNotEqual( key('a', RstLexer, TerminalFormatter), key('a', MarkdownLexer, TerminalFormatter) )
+
+        current = key( 'a', RstLexer, TerminalFormatter )
+        with mock.patch( 'pygments.__version__', '0.0' ):
+            self.assertNotEqual( key('a', RstLexer, TerminalFormatter), current )
+
+    def test_least_recently_used_are_evicted(self):
+        cache = supercli.argparse.ColourizeCache( self.cachepath, max_bytes=10 )
+        with mock.patch( 'time.time', return_value=1 ):
+            cache.set( 'old', 'aaaaa' )
+        with mock.patch( 'time.time', return_value=2 ):
+            cache.set( 'new', 'bbbbbb' )
+        cache.save()
+
+        cache = supercli.argparse.ColourizeCache( self.cachepath )
+        self.assertEqual( cache.get('new'), 'bbbbbb' )
+        self.assertIsNone( cache.get('old') )
+
+    def test_merges_entries_of_other_processes(self):
+        first  = supercli.argparse.ColourizeCache( self.cachepath )
+        second = supercli.argparse.ColourizeCache( self.cachepath )
+        first.set( 'a', 'A' )
+        second.set( 'b', 'B' )
+        first.save()
+        second.save()
+
+        cache = supercli.argparse.ColourizeCache( self.cachepath )
+        self.assertEqual( (cache.get('a'), cache.get('b')), ('A', 'B') )
+
+    def test_corrupt_cache_is_ignored(self):
+        os.makedirs( os.path.dirname(self.cachepath) )
+        with open( self.cachepath, 'w' ) as fd:
+            fd.write( '{"version": 1, "entr' )
+
+        cache = supercli.argparse.ColourizeCache( self.cachepath )
+        self.assertIsNone( cache.get('a') )
+        cache.set( 'a', 'A' )
+        cache.save()
+        self.assertEqual( supercli.argparse.ColourizeCache( self.cachepath ).get('a'), 'A' )
+
+    def test_disabled(self):
+        with mock.patch.dict( os.environ, {'SUPERCLI_NO_CACHE': '1'} ):
+            cache = supercli.argparse.ColourizeCache( self.cachepath )
+        cache.set( 'a', 'A' )
+        cache.save()
+        self.assertIsNone( cache.get('a') )
+        self.assertFalse( os.path.exists(self.cachepath) )
@@ -0,0 +1,85 @@
+import unittest
+import re
+
+from pygments                import highlight as pygments_highlight
+from pygments.lexers.markup  import RstLexer
+from pygments.formatters     import TerminalFormatter as PygmentsTerminalFormatter
+from pygments.formatters     import HtmlFormatter
+
+from supercli.highlight import highlight, uses_pygments, RstHelpLexer, TerminalFormatter
+
+
+def visible( text ):
+    """
+    Returns [(char, ansi-code)] for each character of text coloured with ANSI codes
+    (whitespace is uncoloured, since it looks the same)
+    """
+    chars = []
+    code  = ''
+    for match in re.finditer( '\033\\[([0-9;]*)m|(.)', text, re.DOTALL ):
+        if match.group(2) is None:
+            code = '' if match.group(1) == '39;49;00' else match.group(1)
+        else:
+            char = match.group(2)
+            chars.append( (char, '' if char.isspace() else code) )
+    return chars
+
+
+class TestRstHelpLexer( unittest.TestCase ):
+    samples = [
+        'plain text',
+        'Sets ``opt`` (default: %(default)s)',
+        'see `interpreted`, *emphasis* and **strong**',
+        'a `link <http://example.com>`_ and a `reference`_',
+        ':role:`text` and `text`:role: and [1]_',
+        'escaped \\`text\\` and ``a`b``',
+        'Title\n=====\n\ntext',
+        '- item\n* item\n1. item',
+        '.. note:: text',
+        '\n\nleading and trailing newlines\n\n',
+        'Sets the loglevel of specific loggers\nex: ``--log-level mypkg.mymodule=DEBUG``',
+    ]
+
+    def test_same_as_pygments(self):
+        for text in self.samples:
+            self.assertEqual(
+                visible( highlight( text, RstHelpLexer(), TerminalFormatter() ) ),
+                visible( pygments_highlight( text, RstLexer(), PygmentsTerminalFormatter() ) ),
+                text,
+            )
+
+    def test_tokens(self):
+        self.assertEqual(
+            RstHelpLexer().get_tokens( 'Sets ``opt``' ),
+            [ ('Text', 'Sets '), ('Literal.String', '``opt``'), ('Text', '\n') ],
+        )
+
+    def test_role_tokens(self):
+        self.assertEqual(
+            RstHelpLexer().get_tokens( ':ref:`x`' ),
+            [ ('Name.Attribute', ':ref:'), ('Name.Variable', '`x`'), ('Text', '\n') ],
+        )
+
+
+class TestHighlight( unittest.TestCase ):
+    def test_uses_pygments(self):
+        self.assertFalse( uses_pygments( RstHelpLexer,   TerminalFormatter ) )
+        self.assertFalse( uses_pygments( RstHelpLexer(), TerminalFormatter() ) )
+        self.assertTrue(  uses_pygments( RstLexer,       TerminalFormatter ) )
+        self.assertTrue(  uses_pygments( RstHelpLexer,   HtmlFormatter ) )
+
+    def test_pygments_formatter(self):
+        self.assertEqual(
+            highlight( 'Sets ``opt``', RstHelpLexer(), HtmlFormatter() ),
+            pygments_highlight( 'Sets ``opt``', RstLexer(), HtmlFormatter() ),
+        )
+
+    def test_pygments_lexer(self):
+        self.assertEqual(
+            visible( highlight( 'Sets ``opt``', RstLexer(), TerminalFormatter() ) ),
+            visible( pygments_highlight( 'Sets ``opt``', RstLexer(), PygmentsTerminalFormatter() ) ),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import subprocess
+import sys
+import os
+
+import supercli
+
+
+## modules that are only needed by some code-paths, and must not be imported by `import supercli.argparse`
+lazy_modules = (
+    'pygments', 'colorama', 'subprocess', 'tempfile', 'hashlib', 'json', 'datetime', 'shlex',
+    'supercli.autocomplete', 'supercli.excepttools', 'supercli.logcollector',
+)
+
+## max time `import supercli.argparse` may take, relative to the stdlib modules it cannot avoid (argparse, logging)
+budget = 2.5
+
+
+def import_times( module ):
+    """
+    Imports a module in a new interpreter using `python -X importtime`.
+    Returns `{module: cumulative-microseconds}` of every module it imported.
+    """
+    env = dict( os.environ )
+    env.pop( 'PYTHONDONTWRITEBYTECODE', None )   ## (otherwise modules edited since they were compiled are compiled each time)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ os.path.dirname(os.path.dirname(os.path.abspath(supercli.__file__))) ]
+        + [ p  for p in env.get('PYTHONPATH', '').split(os.pathsep)  if p ]
+    )
+    output = subprocess.check_output(
+        [ sys.executable, '-X', 'importtime', '-c', 'import %s' % module ],
+        stderr = subprocess.STDOUT,
+        env    = env,
+    ).decode('utf-8')
+
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        (_, cumulative, name) = line[ len('import time:'): ].split('|')
+        times[ name.strip() ] = int( cumulative )
+    return times
+
+
+@unittest.skipIf( sys.version_info < (3, 7), '-X importtime requires python-3.7+' )
+class TestImportTime( unittest.TestCase ):
+    def test_lazy_modules_are_not_imported(self):
+        times = import_times( 'supercli.argparse' )
+        self.assertIn( 'supercli.argparse', times )
+        for module in lazy_modules:
+            self.assertNotIn( module, times )
+
+    def test_import_time_budget(self):
+        import_times( 'supercli.argparse' )   ## writes the bytecode of modules that changed
+
+        ## best of 3 (the machine may be busy)
+        ratios = []
+        for i in range(3):
+            times = import_times( 'supercli.argparse' )
+            ratios.append( float( times['supercli.argparse'] ) / ( times['argparse'] + times['logging'] ) )
+
+        self.assertLess( min(ratios), budget )
+
+
+if __name__ == '__main__':
+    unittest.main()
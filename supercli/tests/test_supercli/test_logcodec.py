@@ -0,0 +1,75 @@
+
+import unittest
+import logging
+
+import supercli.logcodec
+
+
+class TestValues( unittest.TestCase ):
+    def assertRoundTrip(self, value):
+        out = []
+        supercli.logcodec.encode_value( value, out )
+        data = b''.join(out)
+        self.assertEqual( supercli.logcodec.decode_value( data ), (value, len(data)) )
+
+    def test_values(self):
+        for value in (
+                None, True, False, 0, -1, 2**31, -2**31, 2**70, 1.5, 'text', u'\u00fcn\u00efcode', b'bytes',
+                'x' * 300, (1, 'a', None), tuple(range(300)), [1, [2]], {'key': 1.5},
+            ):
+            self.assertRoundTrip( value )
+
+    def test_opaque(self):
+        class Custom(object):
+            def __str__(self):
+                return 'custom'
+
+        out = []
+        supercli.logcodec.encode_value( Custom(), out )
+        (value, _) = supercli.logcodec.decode_value( b''.join(out) )
+        self.assertEqual( '%s %r' % (value, value), 'custom custom' )
+
+
+class TestRecords( unittest.TestCase ):
+    def test_record(self):
+        record = logging.LogRecord( 'pkg.mod', logging.WARNING, '/path/to/mod.py', 10, 'value %s: %d', ('a', 1), None, func='run' )
+        (decoded, offset) = supercli.logcodec.decode_record( supercli.logcodec.encode_record(record) )
+
+        for attr in ('name','levelno','levelname','pathname','filename','module','lineno','funcName','created','msg','args'):
+            self.assertEqual( getattr(decoded, attr), getattr(record, attr), attr )
+        self.assertEqual( decoded.getMessage(), 'value a: 1' )
+
+    def test_real_numbers_are_stored_as_floats(self):
+        import fractions
+        record = logging.LogRecord( 'pkg', logging.INFO, 'mod.py', 10, '%d %.2f', (2, fractions.Fraction(3, 2)), None )
+        (decoded, offset) = supercli.logcodec.decode_record( supercli.logcodec.encode_record(record) )
+        self.assertEqual( decoded.args, (2, 1.5) )
+        self.assertEqual( decoded.getMessage(), '2 1.50' )
+
+    def test_args_that_cannot_be_stored_are_formatted(self):
+        import decimal
+        record = logging.LogRecord( 'pkg', logging.INFO, 'mod.py', 10, '%.2f %d%%', (decimal.Decimal('1.5'), 3), None )
+        (decoded, offset) = supercli.logcodec.decode_record( supercli.logcodec.encode_record(record) )
+        self.assertEqual( decoded.getMessage(), '1.50 3%' )
+        self.assertEqual( decoded.args, () )
+
+    def test_extra_attributes(self):
+        import decimal
+        record = logging.makeLogRecord({ 'name': 'pkg', 'msg': 'msg', 'user': 'alice', 'amount': decimal.Decimal('2') })
+        record.stack_info = 'Stack (most recent call last):'
+        (decoded, offset) = supercli.logcodec.decode_record( supercli.logcodec.encode_record(record) )
+        self.assertEqual( decoded.user, 'alice' )
+        self.assertEqual( '%s' % decoded.amount, '2' )
+        self.assertEqual( decoded.stack_info, 'Stack (most recent call last):' )
+        self.assertEqual( logging.Formatter('%(user)s %(message)s').format(decoded).split('\n')[0], 'alice msg' )
+
+    def test_exception(self):
+        import sys
+        try:
+            raise RuntimeError('error')
+        except RuntimeError:
+            record = logging.LogRecord( 'pkg', logging.ERROR, 'mod.py', 10, 'msg', None, sys.exc_info() )
+
+        (decoded, offset) = supercli.logcodec.decode_record( supercli.logcodec.encode_record(record) )
+        self.assertIn( 'RuntimeError: error', decoded.exc_text )
+        self.assertIsNone( record.exc_text )
@@ -0,0 +1,138 @@
+import unittest
+import logging
+import time
+import os
+import six
+import supercli.logging
+import supercli.logcollector
+
+
+class ListHandler( logging.Handler ):
+    def __init__(self, *args, **kwds):
+        logging.Handler.__init__(self, *args, **kwds)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append( record )
+
+
+def make_record( msg, args=None, levelno=logging.INFO ):
+    return logging.LogRecord( 'pkg.mod', levelno, '/path/to/module.py', 10, msg, args, None, func='func' )
+
+def wait_for( condition, timeout=5.0 ):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep( 0.01 )
+
+
+class TestLogCollector( unittest.TestCase ):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+        self.path    = os.path.join( self.tempdir, 'test.sock' )
+        self.logger  = logging.Logger( 'collector' )
+        self.target  = ListHandler()
+        self.logger.addHandler( self.target )
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree( self.tempdir )
+
+    def start_collector(self):
+        collector = supercli.logcollector.LogCollector( self.path, logger=self.logger )
+        collector.start()
+        self.addCleanup( collector.stop )
+        return collector
+
+    def test_batches_delivered(self):
+        self.start_collector()
+        handlers = [ supercli.logcollector.CollectorHandler( self.path, batch_size=3, flush_interval=None )  for i in range(2) ]
+        for i in range(6):
+            handlers[ i % 2 ].handle( make_record( 'record %s', (i,) ) )
+
+        wait_for( lambda: len(self.target.records) == 6 )
+        self.assertEqual( sorted([ r.getMessage() for r in self.target.records ]), [ 'record %s' % i  for i in range(6) ] )
+        self.assertEqual( self.target.records[0].funcName, 'func' )
+
+        for handler in handlers:
+            handler.close()
+
+    def test_args_and_extra_attributes(self):
+        import decimal
+        self.start_collector()
+        handler = supercli.logcollector.CollectorHandler( self.path, flush_interval=None )
+        record  = make_record( 'total %d', (decimal.Decimal('3'),), levelno=logging.WARNING )
+        record.user = 'alice'
+        handler.handle( record )
+
+        wait_for( lambda: len(self.target.records) == 1 )
+        formatter = logging.Formatter( '%(user)s %(message)s' )
+        self.assertEqual( formatter.format( self.target.records[0] ), 'alice total 3' )
+        handler.close()
+
+    def test_warning_sent_immediately(self):
+        self.start_collector()
+        handler = supercli.logcollector.CollectorHandler( self.path, flush_interval=None )
+        handler.handle( make_record( 'info' ) )
+        handler.handle( make_record( 'warning', levelno=logging.WARNING ) )
+
+        wait_for( lambda: len(self.target.records) == 2 )
+        self.assertEqual( [ r.getMessage() for r in self.target.records ], ['info', 'warning'] )
+        handler.close()
+
+    def test_buffered_while_collector_is_gone(self):
+        handler = supercli.logcollector.CollectorHandler( self.path, batch_size=1, flush_interval=None, reconnect_interval=0 )
+        handler.handle( make_record( 'buffered' ) )
+        self.assertFalse( handler.connected )
+
+        self.start_collector()
+        handler.handle( make_record( 'sent' ) )
+        wait_for( lambda: len(self.target.records) == 2 )
+        self.assertEqual( [ r.getMessage() for r in self.target.records ], ['buffered', 'sent'] )
+        handler.close()
+
+    def test_overflow_written_to_fallback(self):
+        stream  = six.StringIO()
+        handler = supercli.logcollector.CollectorHandler( self.path, batch_size=1, flush_interval=None, buffer_size=2, fallback_stream=stream )
+        for i in range(3):
+            handler.handle( make_record( 'record %s', (i,) ) )
+        self.assertEqual( stream.getvalue(), 'record 0\n' )
+
+        handler.close()
+        self.assertEqual( stream.getvalue(), 'record 0\nrecord 1\nrecord 2\n' )
+
+    def test_overflow_dropped_without_fallback(self):
+        handler = supercli.logcollector.CollectorHandler( self.path, batch_size=1, flush_interval=None, buffer_size=2, fallback_stream=None )
+        for i in range(3):
+            handler.handle( make_record( 'record %s', (i,) ) )
+        handler.close()
+        self.assertEqual( handler.dropped, 3 )
+
+    def test_stale_socket_replaced(self):
+        import socket
+        sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+        sock.bind( self.path )
+        sock.close()
+
+        self.start_collector()
+        with self.assertRaises( RuntimeError ):
+            supercli.logcollector.LogCollector( self.path ).listen()
+
+
+class TestSetLogCollector( unittest.TestCase ):
+    def setUp(self):
+        self._root_handlers = logging.root.handlers[:]
+        self._root_level    = logging.root.level
+        logging.root.handlers = []
+
+    def tearDown(self):
+        for handler in logging.root.handlers:
+            handler.close()
+        logging.root.handlers = self._root_handlers
+        logging.root.setLevel( self._root_level )
+        supercli.logging.set_record_attrs( None )
+
+    def test_collector_replaces_logfile_and_stream(self):
+        for i in range(2):
+            supercli.logging.SetLog( logcollector='/tmp/supercli-test.sock', logfile='/tmp/supercli-test.log' )
+        self.assertEqual( [ type(h) for h in logging.root.handlers ], [ supercli.logcollector.CollectorHandler ] )
@@ -5,7 +5,10 @@ try:
 except:
     from unittest import mock
 
+import logging
+import os
 import supercli.logging
+import supercli.logquery
 
 class TestTesting( unittest.TestCase ):
     def test_testing(self):
@@ -16,3 +19,1543 @@ class TestTesting( unittest.TestCase ):
         self.assertEqual( 'a', 'b' )
 
 
+
+
+def make_record( name, funcName='func', levelno=logging.INFO, msg='msg', args=None ):
+    record = logging.LogRecord( name, levelno, '/path/to/module.py', 10, msg, args, None, func=funcName )
+    return record
+
+
+class TestCompiledFilter( unittest.TestCase ):
+    def test_decide_is_abstract(self):
+        with self.assertRaises( TypeError ):
+            supercli.logging._CompiledFilter()
+
+
+class TestBlacklist( unittest.TestCase ):
+    def test_matches_fnmatch_semantics(self):
+        import fnmatch
+        entries = ['chatty', 'pkg.mod.func_*', 'a?c']
+        _filter = supercli.logging.Blacklist( entries )
+
+        for (name,funcName) in [
+                ('pkg.chatty','run'), ('pkg.mod','func_a'), ('pkg.mod','other'),
+                ('abc','x'), ('ac','x'), ('root','chattyfunc'), ('quiet','run'),
+            ]:
+            modpath  = '%s.%s' % (name,funcName)
+            expected = not any( fnmatch.fnmatch(modpath,'*%s*' % e)  for e in entries )
+            self.assertEqual( bool(_filter.filter( make_record(name,funcName) )), expected, modpath )
+
+    def test_decision_is_cached(self):
+        _filter = supercli.logging.Blacklist( ['chatty'] )
+        with mock.patch.object( _filter, '_decide', wraps=_filter._decide ) as decide:
+            for i in range(3):
+                _filter.filter( make_record('pkg.chatty') )
+            self.assertEqual( decide.call_count, 1 )
+
+    def test_no_entries_allows_all(self):
+        _filter = supercli.logging.Blacklist( [] )
+        self.assertTrue( _filter.filter( make_record('anything') ) )
+
+    def test_cache_is_bounded(self):
+        _filter = supercli.logging.Blacklist( ['chatty'] )
+        _filter.cache_size = 4
+        for i in range(10):
+            _filter.filter( make_record('pkg.mod%s' % i) )
+        self.assertLessEqual( len(_filter._cache), 4 )
+
+
+class TestWhitelist( unittest.TestCase ):
+    def test_matches_logging_filter_semantics(self):
+        entries = ['pkg.mod', 'other']
+        _filter = supercli.logging.Whitelist( entries )
+
+        for name in ('pkg.mod', 'pkg.mod.sub', 'pkg.module', 'pkg', 'other', 'otherwise', 'root'):
+            record   = make_record(name)
+            expected = any( logging.Filter(e).filter(record)  for e in entries )
+            self.assertEqual( bool(_filter.filter(record)), expected, name )
+
+    def test_empty_entry_allows_all(self):
+        _filter = supercli.logging.Whitelist( [''] )
+        self.assertTrue( _filter.filter( make_record('anything') ) )
+
+    def test_no_entries_allows_nothing(self):
+        _filter = supercli.logging.Whitelist( [] )
+        self.assertFalse( _filter.filter( make_record('anything') ) )
+
+
+class TestWhiteBlacklist( unittest.TestCase ):
+    def test_combined(self):
+        _filter = supercli.logging.WhiteBlacklist({
+            'whitelist' : ['pkg'],
+            'blacklist' : ['pkg.chatty'],
+        })
+        self.assertTrue(  _filter.filter( make_record('pkg.mod') ) )
+        self.assertFalse( _filter.filter( make_record('pkg.chatty') ) )
+        self.assertFalse( _filter.filter( make_record('other') ) )
+
+    def test_blacklist_only(self):
+        _filter = supercli.logging.WhiteBlacklist( blacklist=['chatty'] )
+        self.assertTrue(  _filter.filter( make_record('other') ) )
+        self.assertFalse( _filter.filter( make_record('chatty') ) )
+
+
+class ListHandler( logging.Handler ):
+    def __init__(self, *args, **kwds):
+        logging.Handler.__init__(self, *args, **kwds)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append( record )
+
+
+class RootLoggerTestCase( unittest.TestCase ):
+    """
+    Restores the root logger's handlers/level after each test.
+    """
+    def setUp(self):
+        self._root_handlers = logging.root.handlers[:]
+        self._root_level    = logging.root.level
+        logging.root.handlers = []
+
+    def tearDown(self):
+        for handler in logging.root.handlers:
+            if handler not in self._root_handlers:
+                handler.close()
+        logging.root.handlers = self._root_handlers
+        logging.root.setLevel( self._root_level )
+        supercli.logging.set_record_attrs( None )
+
+
+class TestAsyncHandler( unittest.TestCase ):
+    def test_records_are_handled_by_listener(self):
+        target  = ListHandler()
+        handler = supercli.logging.AsyncHandler( [target] )
+        for i in range(100):
+            handler.handle( make_record('pkg', msg='%s' % i) )
+        handler.close()
+
+        self.assertEqual( [ r.msg  for r in target.records ], [ '%s' % i  for i in range(100) ] )
+
+    def test_drop_overflow(self):
+        import threading
+        import time
+        release = threading.Event()
+        handler = supercli.logging.AsyncHandler( [ListHandler()], queue_size=1, overflow='drop' )
+        with mock.patch.object( handler, 'dispatch', side_effect=lambda record: release.wait(5) ):
+            ## the listener waits on the first record, the second fills the queue
+            handler.handle( make_record('pkg') )
+            while not handler._queue.empty():
+                time.sleep( 0.001 )
+            handler.handle( make_record('pkg') )
+            handler.handle( make_record('pkg') )
+            release.set()
+            handler.close()
+        self.assertEqual( handler.dropped, 1 )
+
+    def test_records_logged_while_stopping_are_handled(self):
+        import threading
+        target  = ListHandler()
+        handler = supercli.logging.AsyncHandler( [target] )
+        started = threading.Event()
+
+        def log():
+            for i in range(2000):
+                handler.handle( make_record('pkg', msg='%s' % i) )
+                started.set()
+
+        thread = threading.Thread( target=log )
+        thread.start()
+        started.wait()
+        handler.stop()
+        thread.join()
+        self.assertEqual( len(target.records), 2000 )
+
+    def test_listener_that_does_not_stop_is_kept(self):
+        import threading
+        release = threading.Event()
+        handler = supercli.logging.AsyncHandler( [ListHandler()] )
+        with mock.patch.object( handler, 'dispatch', side_effect=lambda record: release.wait(5) ):
+            handler.handle( make_record('pkg') )
+            handler.stop( timeout=0.01 )
+            self.assertIsNotNone( handler._thread )
+            release.set()
+            handler.stop()
+        self.assertIsNone( handler._thread )
+
+    def test_records_after_stop_are_handled(self):
+        target  = ListHandler()
+        handler = supercli.logging.AsyncHandler( [target] )
+        with mock.patch( 'atexit.unregister', create=True ) as unregister:
+            handler.stop()
+        unregister.assert_called_once_with( handler.stop )
+
+        handler.handle( make_record('pkg') )
+        self.assertEqual( len(target.records), 1 )
+
+    def test_invalid_overflow(self):
+        with self.assertRaises( ValueError ):
+            supercli.logging.AsyncHandler( overflow='explode' )
+
+    def test_error_does_not_stop_listener(self):
+        target  = ListHandler()
+        handler = supercli.logging.AsyncHandler( [target], queue_size=2 )
+        with mock.patch.object( handler, 'dispatch', side_effect=[ValueError('bad')] + [None] * 10 ):
+            with mock.patch.object( handler, 'handleError' ) as handleError:
+                for i in range(10):
+                    handler.handle( make_record('pkg', msg='%s' % i) )
+                handler.close()
+        self.assertEqual( handleError.call_count, 1 )
+        self.assertFalse( handler._queue.qsize() )
+
+    def test_stop_does_not_hang_without_listener(self):
+        handler = supercli.logging.AsyncHandler( [ListHandler()], queue_size=1 )
+        handler._queue.put( supercli.logging.AsyncHandler._sentinel )   ## listener exits
+        handler._thread.join()
+        handler._queue.put( make_record('pkg') )                          ## queue is full
+        handler.stop( timeout=0.1 )
+        self.assertIsNone( handler._thread )
+
+
+class TestSetLogAsync( RootLoggerTestCase ):
+    def test_handlers_moved_behind_queue(self):
+        supercli.logging.SetLog( async_logging=True, colorize=False )
+        self.assertEqual( len(logging.root.handlers), 1 )
+        async_handler = logging.root.handlers[0]
+        self.assertIsInstance( async_handler, supercli.logging.AsyncHandler )
+        self.assertEqual( len(async_handler.handlers), 1 )
+
+        ## disabling async restores the handlers
+        stream_handler = async_handler.handlers[0]
+        supercli.logging.SetLog( colorize=False )
+        self.assertEqual( logging.root.handlers, [stream_handler] )
+
+
+class TestBufferedRotatingFileHandler( unittest.TestCase ):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+        self.logfile = os.path.join( self.tempdir, 'test.log' )
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree( self.tempdir )
+
+    def read(self, path=None):
+        with open( path or self.logfile, 'rb' ) as fd:
+            return fd.read().decode('utf-8')
+
+    def test_records_buffered_until_threshold(self):
+        handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, buffer_size=1024, flush_interval=None )
+        handler.handle( make_record('pkg', msg='first') )
+        self.assertEqual( self.read(), '' )
+
+        handler.handle( make_record('pkg', msg='x' * 1024) )
+        self.assertEqual( self.read(), 'first\n' + 'x' * 1024 + '\n' )
+        handler.close()
+
+    def test_warning_flushes_immediately(self):
+        handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, flush_interval=None )
+        handler.handle( make_record('pkg', msg='info') )
+        handler.handle( make_record('pkg', msg='warn', levelno=logging.WARNING) )
+        self.assertEqual( self.read(), 'info\nwarn\n' )
+        handler.close()
+
+    def test_flush_interval_uses_record_time(self):
+        handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, flush_interval=60 )
+        record = make_record('pkg', msg='first')
+        with mock.patch.object( supercli.logging.time, 'time', wraps=supercli.logging.time.time ) as now:
+            handler.handle( record )
+            self.assertEqual( self.read(), '' )
+            self.assertEqual( now.call_count, 0 )
+
+        record = make_record('pkg', msg='late')
+        record.created = handler._last_flush + 60
+        handler.handle( record )
+        self.assertEqual( self.read(), 'first\nlate\n' )
+        handler.close()
+
+    def test_close_flushes(self):
+        handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, flush_interval=None )
+        handler.handle( make_record('pkg', msg='info') )
+        handler.close()
+        self.assertEqual( self.read(), 'info\n' )
+
+    def test_rollover(self):
+        handler = supercli.logging.BufferedRotatingFileHandler(
+                self.logfile, maxBytes=20, backupCount=2, flush_interval=None
+            )
+        for i in range(6):
+            handler.handle( make_record('pkg', msg='record-%s' % i) )    ## 9 bytes each
+        handler.close()
+
+        self.assertEqual( self.read(),                   'record-4\nrecord-5\n' )
+        self.assertEqual( self.read(self.logfile+'.1'), 'record-2\nrecord-3\n' )
+        self.assertEqual( self.read(self.logfile+'.2'), 'record-0\nrecord-1\n' )
+        self.assertFalse( os.path.exists(self.logfile+'.3') )
+
+    def test_rollover_compressed(self):
+        import gzip
+        handler = supercli.logging.BufferedRotatingFileHandler(
+                self.logfile, maxBytes=20, backupCount=2, flush_interval=None, compress='gzip',
+            )
+        for i in range(8):
+            handler.handle( make_record('pkg', msg='record-%s' % i) )    ## 9 bytes each
+        handler.close()
+        supercli.logging.wait_for_rotations()
+
+        def read_gzip(path):
+            with gzip.open( path, 'rb' ) as fd:
+                return fd.read().decode('utf-8')
+
+        self.assertEqual( self.read(),                         'record-6\nrecord-7\n' )
+        self.assertEqual( read_gzip(self.logfile+'.1.gz'),    'record-4\nrecord-5\n' )
+        self.assertEqual( read_gzip(self.logfile+'.2.gz'),    'record-2\nrecord-3\n' )
+        self.assertEqual( sorted(os.listdir(self.tempdir)),   ['test.log', 'test.log.1.gz', 'test.log.2.gz'] )
+
+    def test_interrupted_rotations_resumed(self):
+        import gzip
+        ## left by a process that was killed, and by a process that is still compressing it
+        for (pid, msg) in ( (1234, 'killed'), (4321, 'running') ):
+            with open( '%s.1-%s-1.rotating' % (self.logfile, pid), 'w' ) as fd:
+                fd.write( msg + '\n' )
+
+        with mock.patch( 'supercli.logging.process_exists', side_effect=lambda pid: pid == 4321 ):
+            handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, backupCount=2, flush_interval=None, compress='gzip' )
+        handler.close()
+        supercli.logging.wait_for_rotations()
+
+        with gzip.open( self.logfile + '.1.gz', 'rb' ) as fd:
+            self.assertEqual( fd.read(), b'killed\n' )
+        self.assertEqual( sorted(os.listdir(self.tempdir)), ['test.log', 'test.log.1-4321-1.rotating', 'test.log.1.gz'] )
+
+    def test_process_exists(self):
+        self.assertTrue( supercli.logging.process_exists( os.getpid() ) )
+
+    def test_rollover_by_age(self):
+        handler = supercli.logging.BufferedRotatingFileHandler(
+                self.logfile, rotate_interval=60, flush_interval=None
+            )
+        record = make_record('pkg', msg='old')
+        handler.handle( record )
+
+        record = make_record('pkg', msg='new')
+        record.created += 61
+        handler.handle( record )
+        handler.close()
+
+        self.assertEqual( self.read(),                   'new\n' )
+        self.assertEqual( self.read(self.logfile+'.1'), 'old\n' )
+
+    def test_index_rotated_with_logfile(self):
+        handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, maxBytes=15, backupCount=2, flush_interval=None, index=True )
+        for i in range(3):
+            handler.handle( make_record('pkg', msg='record-%s' % i) )
+            handler.flush()
+        handler.close()
+
+        for (path, msg) in ( (self.logfile + '.2', 'record-0'), (self.logfile + '.1', 'record-1'), (self.logfile, 'record-2') ):
+            self.assertEqual( self.read(path), msg + '\n' )
+            blocks = supercli.logquery.read_index( path )
+            self.assertEqual( [ (b['start'], b['end'], b['loggers']) for b in blocks ], [ (0, 9, {'pkg': {'20': [0, 0]}}) ] )
+
+    def test_compressed_index_rotated_with_logfile(self):
+        handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, maxBytes=15, backupCount=2, flush_interval=None,
+                                                                compress='gzip', index=True )
+        for i in range(3):
+            handler.handle( make_record('pkg', msg='record-%s' % i) )
+            handler.flush()
+        handler.close()
+        supercli.logging.wait_for_rotations()
+
+        self.assertEqual( sorted(os.listdir(self.tempdir)), [
+            'test.log', 'test.log.1.gz', 'test.log.1.idx', 'test.log.2.gz', 'test.log.2.idx', 'test.log.idx',
+        ])
+        self.assertEqual( [ data for (created, data) in supercli.logquery.query( self.logfile + '.2.gz' ) ], [ b'record-0\n' ] )
+
+    def test_invalid_compress(self):
+        with self.assertRaises( ValueError ):
+            supercli.logging.BufferedRotatingFileHandler( self.logfile, compress='rar' )
+
+    def test_size_of_existing_logfile(self):
+        with open( self.logfile, 'w' ) as fd:
+            fd.write( 'x' * 15 + '\n' )
+        handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, maxBytes=20, flush_interval=None )
+        handler.handle( make_record('pkg', msg='record-0') )
+        handler.close()
+        self.assertEqual( self.read(), 'record-0\n' )
+
+
+class TestBinaryLogHandler( unittest.TestCase ):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+        self.logfile = os.path.join( self.tempdir, 'test.binlog' )
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree( self.tempdir )
+
+    def read(self, path=None):
+        with open( path or self.logfile, 'rb' ) as fd:
+            return list( supercli.logging.BinaryLogHandler.read( fd.read() ) )
+
+    def test_records_round_trip(self):
+        import sys
+        handler = supercli.logging.BinaryLogHandler( self.logfile, flush_interval=None )
+        handler.handle( make_record('pkg.a', msg='value %s: %d', args=('a', 1)) )
+        handler.handle( make_record('pkg.b', funcName='run', levelno=logging.WARNING, msg='value %s: %d', args=('b', 2)) )
+        handler.handle( make_record('pkg.a', msg='value %s: %d', args=('c', 3)) )
+        try:
+            raise RuntimeError('error')
+        except RuntimeError:
+            record = make_record( 'pkg.a', levelno=logging.ERROR )
+            record.exc_info = sys.exc_info()
+            handler.handle( record )
+        handler.close()
+
+        records = self.read()
+        self.assertEqual( [ r.getMessage() for r in records ], ['value a: 1', 'value b: 2', 'value c: 3', 'msg'] )
+        self.assertEqual( [ r.name for r in records ],         ['pkg.a', 'pkg.b', 'pkg.a', 'pkg.a'] )
+        self.assertEqual( records[1].levelname, 'WARNING' )
+        self.assertEqual( records[1].funcName,  'run' )
+        self.assertEqual( records[1].lineno,    10 )
+        self.assertIn( 'RuntimeError: error', records[3].exc_text )
+        self.assertAlmostEqual( records[0].created, record.created, places=2 )
+
+    def test_call_site_written_once(self):
+        handler = supercli.logging.BinaryLogHandler( self.logfile, flush_interval=None )
+        for i in range(10):
+            handler.handle( make_record('pkg', msg='a long message that is not repeated: %s', args=(i,)) )
+        handler.close()
+
+        with open( self.logfile, 'rb' ) as fd:
+            self.assertEqual( fd.read().count(b'a long message'), 1 )
+
+    def test_rotated_logfiles_readable(self):
+        handler = supercli.logging.BinaryLogHandler( self.logfile, maxBytes=100, backupCount=5, flush_interval=None )
+        for i in range(6):
+            handler.handle( make_record('pkg', msg='record %s', args=(i,)) )
+        handler.close()
+
+        paths   = [ '%s.%s' % (self.logfile, i)  for i in range(5, 0, -1) ] + [ self.logfile ]
+        records = []
+        for path in paths:
+            if os.path.isfile( path ):
+                records.extend( self.read(path) )
+        self.assertEqual( [ r.getMessage() for r in records ], [ 'record %s' % i  for i in range(6) ] )
+        self.assertTrue( os.path.isfile( self.logfile + '.1' ) )
+
+    def test_appended_segments(self):
+        for i in range(2):
+            handler = supercli.logging.BinaryLogHandler( self.logfile, flush_interval=None )
+            handler.handle( make_record('pkg', msg='process %s', args=(i,), funcName='func%s' % i) )
+            handler.close()
+
+        records = self.read()
+        self.assertEqual( [ (r.getMessage(), r.funcName) for r in records ], [('process 0','func0'), ('process 1','func1')] )
+
+    def test_truncated_record_ignored(self):
+        handler = supercli.logging.BinaryLogHandler( self.logfile, flush_interval=None )
+        for i in range(2):
+            handler.handle( make_record('pkg', msg='record %s', args=('x' * 20,)) )
+        handler.close()
+
+        with open( self.logfile, 'rb' ) as fd:
+            data = fd.read()
+        records = list( supercli.logging.BinaryLogHandler.read( data[:-5] ) )
+        self.assertEqual( len(records), 1 )
+
+    def test_missing_call_site(self):
+        handler = supercli.logging.BinaryLogHandler( self.logfile, flush_interval=None )
+        handler.handle( make_record('pkg', msg='record %s', args=(0,)) )
+        handler.handle( make_record('pkg', msg='record %s', args=(1,)) )
+        handler.close()
+
+        with open( self.logfile, 'rb' ) as fd:
+            data = fd.read()
+        segment = supercli.logging.BinaryLogHandler._segment_header.size
+        second  = data.rindex( b'R' )
+        records = list( supercli.logging.BinaryLogHandler.read( data[:segment] + data[second:] ) )
+        self.assertEqual( [ (r.name, r.getMessage()) for r in records ], [('?', "unknown call-site 0: (1,)")] )
+
+    def test_caller_info_disabled(self):
+        handler = supercli.logging.BinaryLogHandler( self.logfile, caller_info=False, flush_interval=None )
+        self.assertEqual( supercli.logging.handler_record_attrs(handler), set(['name']) )
+
+        handler.handle( make_record('pkg') )
+        handler.close()
+        self.assertIsNone( self.read()[0].funcName )
+
+
+class TestSetLogBinlog( RootLoggerTestCase ):
+    def test_binlog(self):
+        import tempfile
+        import shutil
+        tempdir = tempfile.mkdtemp()
+        try:
+            binlog = os.path.join( tempdir, 'test.binlog' )
+            for i in range(2):
+                supercli.logging.SetLog( logstream=False, binlog=binlog )
+            handlers = [ h  for h in logging.root.handlers  if isinstance(h, supercli.logging.BinaryLogHandler) ]
+            self.assertEqual( len(handlers), 1 )
+            self.assertTrue( handlers[0].caller_info )
+
+            supercli.logging.SetLog( logstream=False, binlog=binlog, binlog_caller_info=False )
+            self.assertFalse( handlers[0].caller_info )
+            handlers[0].close()
+        finally:
+            shutil.rmtree( tempdir )
+
+
+class TestSetLogStackLogging( RootLoggerTestCase ):
+    def setUp(self):
+        import io
+        RootLoggerTestCase.setUp(self)
+        self.handler = logging.StreamHandler( io.StringIO() )   ## reused by SetLog
+        logging.root.addHandler( self.handler )
+
+    def captured(self, logger_name, levelno=logging.WARNING):
+        """ returns True if the stack was captured for a record """
+        with mock.patch( 'supercli.logging.capture_stack', return_value=[] ) as capture_stack:
+            logging.getLogger( logger_name ).log( levelno, 'message' )
+            for handler in logging.root.handlers:
+                handler.flush()
+        return capture_stack.called
+
+    def test_target_filters_applied_first(self):
+        for kwds in ( {}, {'fanout': True}, {'thread_buffered': True}, {'async_logging': True} ):
+            setlog = supercli.logging.SetLog( logfmt='stack', colorize=False, filter_matches=['supercli.tests.chatty'], **kwds )
+            if not kwds.get('async_logging'):
+                self.assertFalse( self.captured('supercli.tests.chatty'), kwds )
+            self.assertTrue( self.captured('supercli.tests.other'), kwds )
+            setlog.reconfigure( async_logging=False, thread_buffered=False, fanout=False )
+
+    def test_target_level_applied_first(self):
+        for kwds in ( {'fanout': True}, {'thread_buffered': True}, {'async_logging': True} ):
+            setlog = supercli.logging.SetLog( logfmt='stack', colorize=False, **kwds )
+            self.handler.setLevel( logging.ERROR )
+            self.assertFalse( self.captured('supercli.tests.other'), kwds )
+            self.assertTrue( self.captured('supercli.tests.other', logging.ERROR), kwds )
+            self.handler.setLevel( logging.NOTSET )
+            setlog.reconfigure( async_logging=False, thread_buffered=False, fanout=False )
+
+
+class TestColourFormatter( unittest.TestCase ):
+    def test_message_colourized_by_level(self):
+        formatter = supercli.logging.ColourFormatter( '%(levelname)s: %(message)s' )
+        record    = make_record( 'pkg', levelno=logging.WARNING, msg='value: %s', args=(1,) )
+        record.levelname = 'WARNING'
+        self.assertEqual( formatter.format(record), 'WARNING: \x1b[33mvalue: 1\x1b[0m' )
+
+    def test_message_is_not_coloured(self):
+        formatter = supercli.logging.ColourFormatter( '%(message)s' )
+        record    = make_record( 'pkg', msg='value: %s', args=(1,) )
+        formatter.format( record )
+        self.assertEqual( (record.msg, record.args, record.message), ('value: %s', (1,), 'value: 1') )
+
+    def test_custom_level(self):
+        formatter = supercli.logging.ColourFormatter( '%(message)s' )
+        self.assertEqual( formatter.format( make_record('pkg', levelno=5) ),  '\x1b[0mmsg\x1b[0m' )
+        self.assertEqual( formatter.format( make_record('pkg', levelno=45) ), '\x1b[31mmsg\x1b[0m' )
+
+
+class TestSetLogColourize( RootLoggerTestCase ):
+    def test_only_tty_handlers_colourized(self):
+        tty = mock.Mock()
+        tty.isatty.return_value = True
+        tty_handler  = logging.StreamHandler( tty )
+        file_handler = logging.StreamHandler( mock.Mock(**{'isatty.return_value':False}) )
+        logging.root.handlers = [ tty_handler, file_handler ]
+
+        for i in range(3):
+            supercli.logging.SetLog()
+
+        self.assertIsInstance(    tty_handler.formatter,  supercli.logging.ColourFormatter )
+        self.assertNotIsInstance( file_handler.formatter, supercli.logging.ColourFormatter )
+
+
+class TestStackInfoFilter( unittest.TestCase ):
+    def test_stack_only_captured_if_formatted(self):
+        handler = ListHandler()
+        handler.setFormatter( logging.Formatter('%(message)s') )
+        _filter = supercli.logging.StackInfoFilter( handler=handler )
+
+        record = make_record('pkg')
+        _filter.filter( record )
+        self.assertFalse( hasattr(record, 'stack') )
+
+        handler.setFormatter( logging.Formatter('%(message)s\n%(stack)s') )
+        _filter.filter( record )
+        self.assertIsInstance( record.stack, supercli.logging.LazyStack )
+
+    def test_stack_contains_caller(self):
+        logger  = logging.getLogger('supercli.tests.stack')
+        handler = ListHandler()
+        handler.setFormatter( logging.Formatter('%(stack)s') )
+        handler.addFilter( supercli.logging.StackInfoFilter( limit=2, handler=handler ) )
+        logger.addHandler( handler )
+        try:
+            logger.warning('message')
+        finally:
+            logger.removeHandler( handler )
+
+        stack = str( handler.records[0].stack )
+        self.assertIn( 'in test_stack_contains_caller', stack )
+        self.assertIn( "logger.warning('message')", stack )
+        self.assertNotIn( 'logging', stack.split('\n')[-2] )
+
+    def test_stack_not_captured_for_filtered_records(self):
+        logger  = logging.getLogger('supercli.tests.stack')
+        handler = ListHandler()
+        handler.setFormatter( logging.Formatter('%(stack)s') )
+        handler.addFilter( supercli.logging.Blacklist(['supercli.tests']) )
+        handler.addFilter( supercli.logging.StackInfoFilter( handler=handler ) )
+        logger.addHandler( handler )
+        try:
+            with mock.patch( 'supercli.logging.capture_stack' ) as capture_stack:
+                logger.warning('message')
+        finally:
+            logger.removeHandler( handler )
+
+        self.assertFalse( capture_stack.called )
+
+
+class TestRecordAttrs( RootLoggerTestCase ):
+    def setUp(self):
+        super( TestRecordAttrs, self ).setUp()
+        self.stream = mock.Mock(**{'isatty.return_value':False})
+        logging.root.addHandler( logging.StreamHandler( self.stream ) )
+
+    def test_fmt_record_attrs(self):
+        self.assertEqual(
+            supercli.logging.fmt_record_attrs( '[%(asctime)s] %(levelname)-8s %(lineno)d: %(message)s' ),
+            set(['asctime','levelname','lineno','message'])
+        )
+
+    def test_unused_attrs_disabled(self):
+        supercli.logging.SetLog()
+        self.assertIsNone( logging._srcfile )
+        self.assertFalse( logging.logThreads )
+        self.assertFalse( logging.logProcesses )
+
+        record = logging.root.makeRecord( 'pkg', logging.INFO, 'fn', 1, 'msg', None, None )
+        self.assertIsNone( record.thread )
+
+    def test_dev_format_enables_caller(self):
+        supercli.logging.SetLog('d')
+        self.assertIsNotNone( logging._srcfile )
+        self.assertFalse( logging.logThreads )
+
+    def test_blacklist_enables_caller(self):
+        supercli.logging.SetLog( filter_matches=['chatty'] )
+        self.assertIsNotNone( logging._srcfile )
+
+    def test_unknown_handler_enables_all(self):
+        class CustomHandler( logging.Handler ):
+            def emit(self, record):
+                pass
+        logging.getLogger('supercli.tests.custom').addHandler( CustomHandler() )
+        try:
+            supercli.logging.SetLog()
+        finally:
+            logging.getLogger('supercli.tests.custom').handlers = []
+
+        self.assertIsNotNone( logging._srcfile )
+        self.assertTrue( logging.logThreads )
+
+
+class TestFormatter( unittest.TestCase ):
+    def assertSameAsLogging(self, fmt, datefmt=None, record=None):
+        record   = record or make_record( 'pkg.mod', msg='value: %s', args=(1,) )
+        expected = logging.Formatter( fmt, datefmt ).format( make_record_copy(record) )
+        self.assertEqual( supercli.logging.Formatter( fmt, datefmt ).format(record), expected )
+
+    def test_presets_match_logging_formatter(self):
+        setlog = supercli.logging.SetLog
+        for fmt in ( setlog.linefmt_norm, setlog.linefmt_dev, setlog.linefmt_long ):
+            self.assertSameAsLogging( fmt, '%Y/%m/%d |%I:%M %p|' )
+            self.assertSameAsLogging( fmt )
+
+    def test_conversions_match_logging_formatter(self):
+        self.assertSameAsLogging( '%(lineno)05d %(levelno)x %(created).2f %(name).3s %(name)8s 100%% %(name)r' )
+
+    def test_exception_matches_logging_formatter(self):
+        import sys
+        try:
+            raise RuntimeError('error')
+        except RuntimeError:
+            record = make_record( 'pkg' )
+            record.exc_info = sys.exc_info()
+        self.assertSameAsLogging( '%(message)s', record=record )
+
+    def test_record_attributes_set_like_logging_formatter(self):
+        import sys
+        try:
+            raise RuntimeError('error')
+        except RuntimeError:
+            record = make_record( 'pkg', msg='value: %s', args=(1,) )
+            record.exc_info = sys.exc_info()
+        expected = make_record_copy( record )
+        logging.Formatter( '%(asctime)s %(message)s', '%H:%M' ).format( expected )
+
+        supercli.logging.Formatter( '%(asctime)s %(message)s', '%H:%M' ).format( record )
+        for attr in ( 'message', 'asctime', 'exc_text' ):
+            self.assertEqual( getattr(record, attr), getattr(expected, attr), attr )
+
+        ## the message is set even if the lineformat does not use it
+        record = make_record( 'pkg', msg='value: %s', args=(2,) )
+        supercli.logging.Formatter( '%(name)s' ).format( record )
+        self.assertEqual( record.message, 'value: 2' )
+        self.assertNotIn( 'asctime', record.__dict__ )
+
+    def test_asctime_cached_per_minute(self):
+        formatter = supercli.logging.Formatter( '%(asctime)s', '%H:%M' )
+        record    = make_record( 'pkg' )
+        with mock.patch.object( formatter, 'formatTime', wraps=formatter.formatTime ) as formatTime:
+            for created in (600.0, 610.0, 659.9, 660.0):
+                record.created = created
+                formatter.format( record )
+        self.assertEqual( formatTime.call_count, 2 )
+
+    def test_default_datefmt_includes_msecs(self):
+        formatter = supercli.logging.Formatter( '%(asctime)s' )
+        record    = make_record( 'pkg' )
+        record.created = 600.0
+        record.msecs   = 123
+        self.assertTrue( formatter.format(record).endswith(',123') )
+        record.msecs   = 456
+        self.assertTrue( formatter.format(record).endswith(',456') )
+
+
+class TestJsonFormatter( unittest.TestCase ):
+    def format(self, record, formatter=None):
+        import json
+        return json.loads( (formatter or supercli.logging.JsonFormatter()).format(record) )
+
+    def test_fields(self):
+        record = make_record( 'pkg.mod', levelno=logging.WARNING, msg='value: %s', args=(1,) )
+        record.created = 600.5
+        record.msecs   = 500
+        self.assertEqual( self.format(record), {
+            'time'    : '1970-01-01T00:10:00.500Z',
+            'level'   : 'WARNING',
+            'logger'  : 'pkg.mod',
+            'file'    : '/path/to/module.py',
+            'line'    : 10,
+            'func'    : 'func',
+            'message' : 'value: 1',
+        })
+
+    def test_single_line(self):
+        record = make_record( 'pkg', msg='line-1\nline-2' )
+        self.assertNotIn( '\n', supercli.logging.JsonFormatter().format(record) )
+
+    def test_extra_attributes(self):
+        record = logging.getLogger('pkg').makeRecord(
+            'pkg', logging.INFO, '/path/to/module.py', 10, 'msg', (), None,
+            extra={'user':'will', 'ids':[1,2], 'obj':object},
+        )
+        data = self.format( record )
+        self.assertEqual( data['user'], 'will' )
+        self.assertEqual( data['ids'],  [1,2] )
+        self.assertEqual( data['obj'],  str(object) )
+
+    def test_internal_attributes(self):
+        record = make_record( 'pkg' )
+        record.ratelimit_summary = True
+        record.stack = 'stack'
+        record.message = 'old message'
+        data = self.format( record )
+        self.assertNotIn( 'ratelimit_summary', data )
+        self.assertEqual( data['stack'],   'stack' )
+        self.assertEqual( data['message'], 'msg' )
+
+    def test_stack_captured(self):
+        handler = ListHandler()
+        handler.setFormatter( supercli.logging.JsonFormatter() )
+        record = make_record( 'pkg' )
+        supercli.logging.StackInfoFilter( handler=handler ).filter( record )
+        self.assertIsInstance( record.stack, supercli.logging.LazyStack )
+
+    def test_exception(self):
+        import sys
+        try:
+            raise RuntimeError('error')
+        except RuntimeError:
+            record = make_record( 'pkg' )
+            record.exc_info = sys.exc_info()
+        self.assertIn( 'RuntimeError: error', self.format(record)['exc'] )
+        self.assertIn( 'RuntimeError: error', record.exc_text )    ## (cached like logging.Formatter)
+
+    def test_stdlib_fallback(self):
+        record = make_record( 'pkg' )
+        record.__dict__['ids'] = {1:'a'}    ## non-text keys are rejected by orjson
+        record.__dict__['big'] = 2**70
+        data = self.format( record )
+        self.assertEqual( data['ids'], {'1':'a'} )
+        self.assertEqual( data['big'], 2**70 )
+
+
+class TestSetLogJson( RootLoggerTestCase ):
+    def setUp(self):
+        super( TestSetLogJson, self ).setUp()
+        self.handler = logging.StreamHandler( mock.Mock(**{'isatty.return_value':True}) )
+        logging.root.addHandler( self.handler )
+
+    def test_json_str_arg(self):
+        supercli.logging.SetLog( 'vj' )
+        self.assertIsInstance( self.handler.formatter, supercli.logging.JsonFormatter )
+
+    def test_json_logfmt(self):
+        supercli.logging.SetLog( 'd' )
+        supercli.logging.SetLog( logfmt='json' )
+        self.assertIsInstance( self.handler.formatter, supercli.logging.JsonFormatter )
+
+
+def make_record_copy( record ):
+    return logging.makeLogRecord( dict(record.__dict__) )
+
+
+class TestRateLimit( unittest.TestCase ):
+    def setUp(self):
+        ## (summaries of these filters are not logged at exit)
+        patcher = mock.patch( 'supercli.logging._ratelimits', __import__('weakref').WeakSet() )
+        patcher.start()
+        self.addCleanup( patcher.stop )
+
+    def make_record(self, created, lineno=10, levelno=logging.WARNING):
+        record = make_record( 'supercli.tests.ratelimit', levelno=levelno )
+        record.lineno  = lineno
+        record.created = created
+        return record
+
+    def test_token_bucket_per_callsite(self):
+        _filter = supercli.logging.RateLimit( rate=1, burst=3, summary_interval=1000 )
+        passed  = [ _filter.filter( self.make_record(0.0) )  for i in range(10) ]
+        self.assertEqual( sum(passed), 3 )
+
+        ## other call-sites have their own bucket
+        self.assertTrue( _filter.filter( self.make_record(0.0, lineno=11) ) )
+
+        ## tokens refill over time
+        self.assertTrue( _filter.filter( self.make_record(1.0) ) )
+        self.assertFalse( _filter.filter( self.make_record(1.0) ) )
+
+    def test_record_counted_once_by_shared_filter(self):
+        _filter = supercli.logging.RateLimit( rate=1, burst=1, summary_interval=1000 )
+        record  = self.make_record(0.0)
+        self.assertTrue( _filter.filter(record) )
+        self.assertTrue( _filter.filter(record) )
+
+    def test_summary(self):
+        logger  = logging.getLogger('supercli.tests.ratelimit')
+        handler = ListHandler()
+        _filter = supercli.logging.RateLimit( rate=1, burst=1, summary_interval=1000 )
+        handler.addFilter( _filter )
+        logger.addHandler( handler )
+        try:
+            for i in range(5):
+                handler.handle( self.make_record(0.0) )
+            _filter.log_summaries()
+        finally:
+            logger.removeHandler( handler )
+
+        self.assertEqual( len(handler.records), 2 )
+        self.assertEqual( handler.records[-1].getMessage(), 'suppressed 4 similar records from /path/to/module.py:10' )
+
+    def test_summary_logged_by_timer(self):
+        import time
+        logger  = logging.getLogger('supercli.tests.ratelimit')
+        handler = ListHandler()
+        _filter = supercli.logging.RateLimit( rate=1, burst=1, summary_interval=0.05 )
+        handler.addFilter( _filter )
+        logger.addHandler( handler )
+        try:
+            for i in range(3):
+                handler.handle( self.make_record(0.0) )
+
+            ## no other record is logged
+            deadline = time.time() + 5
+            while len(handler.records) < 2 and time.time() < deadline:
+                time.sleep( 0.01 )
+        finally:
+            logger.removeHandler( handler )
+            _filter.close()
+
+        self.assertEqual( [ r.getMessage() for r in handler.records[1:] ], ['suppressed 2 similar records from /path/to/module.py:10'] )
+
+    def test_close_logs_summaries(self):
+        logger  = logging.getLogger('supercli.tests.ratelimit')
+        handler = ListHandler()
+        _filter = supercli.logging.RateLimit( rate=1, burst=1, summary_interval=1000 )
+        handler.addFilter( _filter )
+        logger.addHandler( handler )
+        try:
+            for i in range(3):
+                handler.handle( self.make_record(0.0) )
+            _filter.close()
+            self.assertIsNone( _filter._timer )
+        finally:
+            logger.removeHandler( handler )
+
+        self.assertEqual( handler.records[-1].getMessage(), 'suppressed 2 similar records from /path/to/module.py:10' )
+
+    def test_debug_sample(self):
+        _filter = supercli.logging.RateLimit( debug_sample=0 )
+        self.assertFalse( _filter.filter( self.make_record(0.0, levelno=logging.DEBUG) ) )
+        self.assertTrue(  _filter.filter( self.make_record(0.0, levelno=logging.INFO) ) )
+
+
+class TestSetLogFilters( RootLoggerTestCase ):
+    def setUp(self):
+        super( TestSetLogFilters, self ).setUp()
+        self.handler = logging.StreamHandler( mock.Mock(**{'isatty.return_value':False}) )
+        logging.root.addHandler( self.handler )
+
+    def test_ratelimit_without_matches(self):
+        supercli.logging.SetLog( filter_type=supercli.logging.RateLimit )
+        self.assertIsInstance( self.handler.filters[0], supercli.logging.RateLimit )
+
+    def test_replaced_ratelimit_closed(self):
+        setlog  = supercli.logging.SetLog( filter_type=supercli.logging.RateLimit )
+        _filter = self.handler.filters[0]
+        with mock.patch.object( _filter, 'close' ) as close:
+            setlog.reconfigure( filter_type=supercli.logging.Blacklist, filter_matches=['chatty'] )
+        self.assertTrue( close.called )
+
+    def test_very_verbose_disables_filter(self):
+        supercli.logging.SetLog( 'vv', filter_type=supercli.logging.RateLimit )
+        self.assertEqual( self.handler.filters, [] )
+
+    def test_existing_filters_replaced(self):
+        self.handler.addFilter( logging.Filter('a') )
+        self.handler.addFilter( logging.Filter('b') )
+        supercli.logging.SetLog( filter_matches=['chatty'] )
+        self.assertEqual( len(self.handler.filters), 1 )
+
+
+class TestFlightRecorderHandler( unittest.TestCase ):
+    def test_keeps_most_recent_records(self):
+        recorder = supercli.logging.FlightRecorderHandler( capacity=3 )
+        for i in range(5):
+            recorder.handle( make_record('pkg', msg='record %s', args=(i,), levelno=logging.DEBUG) )
+
+        records = recorder.records()
+        self.assertEqual( [ r.getMessage()  for r in records ], ['record 2', 'record 3', 'record 4'] )
+        self.assertEqual( records[0].levelname, 'DEBUG' )
+        recorder.close()
+
+    def test_dump(self):
+        target   = ListHandler()
+        recorder = supercli.logging.FlightRecorderHandler( capacity=3, target=[target] )
+        recorder.handle( make_record('pkg', msg='record') )
+        recorder.dump()
+
+        self.assertEqual( [ r.getMessage()  for r in target.records ][1:-1], ['record'] )
+
+        ## records are only dumped once
+        recorder.dump()
+        self.assertEqual( len(target.records), 3 )
+        recorder.close()
+
+    def test_large_record_truncated(self):
+        recorder = supercli.logging.FlightRecorderHandler( capacity=3, slot_size=128 )
+        recorder.handle( make_record('pkg', msg='%s', args=('x' * 1000,)) )
+
+        message = recorder.records()[0].getMessage()
+        self.assertTrue( message.startswith('xxx') )
+        self.assertTrue( message.endswith('...') )
+        recorder.close()
+
+    def test_read_mmapped_file(self):
+        import tempfile
+        import shutil
+        tempdir  = tempfile.mkdtemp()
+        try:
+            path     = os.path.join( tempdir, 'test.ring' )
+            recorder = supercli.logging.FlightRecorderHandler( capacity=3, path=path )
+            recorder.handle( make_record('pkg', msg='record %s', args=(1,)) )
+            recorder._mmap.flush()
+
+            records = supercli.logging.FlightRecorderHandler.read( path )
+            self.assertEqual( records[0].getMessage(), 'record 1' )
+            recorder.close()
+        finally:
+            shutil.rmtree( tempdir )
+
+    def test_previous_file_is_kept(self):
+        import tempfile
+        import shutil
+        tempdir  = tempfile.mkdtemp()
+        try:
+            path     = os.path.join( tempdir, 'test.ring' )
+            recorder = supercli.logging.FlightRecorderHandler( capacity=3, path=path )
+            recorder.handle( make_record('pkg', msg='before crash') )
+            recorder.close()
+
+            ## restarted process
+            recorder = supercli.logging.FlightRecorderHandler( capacity=3, path=path )
+            previous = supercli.logging.FlightRecorderHandler.read( path + '.prev' )
+            self.assertEqual( [ r.getMessage()  for r in previous ], ['before crash'] )
+            self.assertEqual( recorder.records(), [] )
+            recorder.close()
+        finally:
+            shutil.rmtree( tempdir )
+
+
+class TestSetLogFlightRecorder( RootLoggerTestCase ):
+    def test_flight_recorder(self):
+        import sys
+        import supercli.excepttools
+
+        handler = ListHandler()
+        handler.setFormatter( logging.Formatter('%(message)s') )
+        logging.root.addHandler( logging.StreamHandler( mock.Mock(**{'isatty.return_value':False}) ) )
+        setlog  = supercli.logging.SetLog( flight_recorder=10 )
+        setlog.flight_recorder_handler.target = [handler]
+
+        logger = logging.getLogger('supercli.tests.flightrecorder')
+        logger.debug('debug record')
+        self.assertEqual( setlog.handlers[0].level, logging.INFO )
+
+        try:
+            raise RuntimeError('error')
+        except RuntimeError:
+            with mock.patch('supercli.excepttools.logger'):
+                supercli.excepttools.logexcept( sys.exc_info(), raise_except=False )
+
+        self.assertIn( 'debug record', [ r.getMessage()  for r in handler.records ] )
+
+
+class TestLogStats( RootLoggerTestCase ):
+    def tearDown(self):
+        supercli.logging.disable_stats()
+        RootLoggerTestCase.tearDown(self)
+
+    def test_counts_and_latency(self):
+        handler = ListHandler()
+        handler.addFilter( lambda record: record.levelno >= logging.INFO )
+        logging.root.addHandler( handler )
+        logging.root.setLevel( logging.DEBUG )
+        supercli.logging.enable_stats()
+
+        logger = logging.getLogger('supercli.tests.stats')
+        logger.debug('debug')
+        logger.info('info')
+        logger.warning('warning')
+
+        snapshot = supercli.logging.stats_snapshot()
+        stats    = snapshot['handlers'][ repr(handler) ]
+        self.assertEqual( snapshot['seen']['loggers']['supercli.tests.stats'], 3 )
+        self.assertEqual( stats['handled']['total'], 3 )
+        self.assertEqual( stats['filtered']['levels'], {'DEBUG': 1} )
+        self.assertEqual( stats['emitted']['levels'], {'INFO': 1, 'WARNING': 1} )
+        self.assertEqual( stats['emit_latency']['count'], 2 )
+        self.assertEqual( sum(stats['emit_latency']['buckets'].values()), 2 )
+        self.assertEqual( len(handler.records), 2 )
+
+    def test_disable_restores_handlers(self):
+        handler = ListHandler()
+        logging.root.addHandler( handler )
+        supercli.logging.enable_stats()
+        self.assertIn( 'emit', handler.__dict__ )
+
+        supercli.logging.disable_stats()
+        self.assertNotIn( 'emit', handler.__dict__ )
+        self.assertNotIn( 'handle', handler.__dict__ )
+        self.assertIsNone( supercli.logging.stats_snapshot() )
+
+    def test_setlog_instruments_new_handlers(self):
+        supercli.logging.enable_stats()
+        supercli.logging.SetLog( colorize=False, logstream=True )
+        snapshot = supercli.logging.stats_snapshot()
+        self.assertEqual( len(snapshot['handlers']), len(logging.root.handlers) )
+
+    def test_dump_stats(self):
+        import io
+        logging.root.addHandler( ListHandler() )
+        supercli.logging.enable_stats()
+        logging.getLogger('supercli.tests.stats').warning('warning')
+
+        stream = io.StringIO()
+        supercli.logging.dump_stats( stream )
+        self.assertIn( 'handled 1  filtered 0  emitted 1', stream.getvalue() )
+
+
+class TestLatencyHistogram( unittest.TestCase ):
+    def test_percentiles(self):
+        histogram = supercli.logging.LatencyHistogram()
+        for i in range(99):
+            histogram.add( 0.000001 )
+        histogram.add( 0.001 )
+        self.assertEqual( histogram.percentile(50), 2 / 1000000.0 )
+        self.assertEqual( histogram.percentile(100), 1024 / 1000000.0 )
+        self.assertEqual( histogram.max, 0.001 )
+
+
+class TestSetLogReconfigure( RootLoggerTestCase ):
+    def setUp(self):
+        import tempfile
+        RootLoggerTestCase.setUp(self)
+        self.tempdir = tempfile.mkdtemp()
+        self.logfile = os.path.join( self.tempdir, 'test.log' )
+
+    def tearDown(self):
+        import shutil
+        RootLoggerTestCase.tearDown(self)
+        supercli.logging.wait_for_rotations()
+        shutil.rmtree( self.tempdir )
+
+    def read_logfile(self):
+        for handler in logging.root.handlers:
+            handler.flush()
+        with open( self.logfile ) as fd:
+            return fd.read()
+
+    def test_level_only(self):
+        setlog   = supercli.logging.SetLog( logfile=self.logfile, logstream=False, colorize=False )
+        handler  = setlog.handlers[0]
+        formatter = handler.formatter
+
+        self.assertEqual( setlog.reconfigure( lv='DEBUG' ), set(['level']) )
+        self.assertEqual( logging.root.level, logging.DEBUG )
+        self.assertEqual( logging.root.handlers, [handler] )
+        self.assertIs( handler.formatter, formatter )
+
+    def test_unchanged(self):
+        setlog = supercli.logging.SetLog( logfile=self.logfile, logstream=False, colorize=False )
+        self.assertEqual( setlog.reconfigure( lv='INFO' ), set() )
+
+    def test_format_and_filters(self):
+        setlog  = supercli.logging.SetLog( logfile=self.logfile, logstream=False, colorize=False )
+        handler = setlog.handlers[0]
+
+        self.assertEqual( setlog.reconfigure( logfmt='%(name)s: %(message)s' ), set(['format']) )
+        logging.getLogger('pkg.chatty').warning('hidden?')
+
+        self.assertEqual( setlog.reconfigure( filter_matches=['chatty'] ), set(['filters']) )
+        self.assertIsInstance( handler.filters[0], supercli.logging.Blacklist )
+        logging.getLogger('pkg.chatty').warning('hidden')
+        logging.getLogger('pkg.quiet').warning('shown')
+
+        ## very_verbose removes the filter
+        self.assertEqual( setlog.reconfigure( very_verbose=True ), set(['filters']) )
+        self.assertEqual( handler.filters, [] )
+
+        self.assertEqual( self.read_logfile(), 'pkg.chatty: hidden?\npkg.quiet: shown\n' )
+        self.assertEqual( logging.root.handlers, [handler] )
+
+    def test_sinks(self):
+        setlog = supercli.logging.SetLog( logstream=False, colorize=False )
+        self.assertEqual( logging.root.handlers, [] )
+
+        self.assertEqual( setlog.reconfigure( logfile=self.logfile ), set(['sinks']) )
+        (handler,) = logging.root.handlers
+        self.assertIsInstance( handler, supercli.logging.BufferedRotatingFileHandler )
+
+        ## unchanged handlers are reused
+        setlog.reconfigure( async_logging=True )
+        (async_handler,) = logging.root.handlers
+        self.assertEqual( async_handler.handlers, [handler] )
+
+        ## removed handlers are closed
+        with mock.patch.object( handler, 'close', wraps=handler.close ) as close:
+            setlog.reconfigure( logfile=None, async_logging=False )
+            self.assertTrue( close.called )
+        self.assertEqual( logging.root.handlers, [] )
+
+    def test_published_together(self):
+        setlog  = supercli.logging.SetLog( logfile=self.logfile, logstream=False, colorize=False )
+        handler = setlog.handlers[0]
+        before  = ( handler.formatter, list(handler.filters) )
+        states  = []
+
+        class Lock(object):
+            ## records the handler's configuration when `logging._lock` is acquired/released
+            def __init__(self, lock):   self.lock = lock
+            def acquire(self, *args):   states.append( (handler.formatter, list(handler.filters)) ); return self.lock.acquire( *args )
+            def release(self):          states.append( (handler.formatter, list(handler.filters)) ); self.lock.release()
+            def __enter__(self):        self.acquire()
+            def __exit__(self, *exc):   self.release()
+
+        with mock.patch.object( logging, '_lock', Lock(logging._lock) ):
+            self.assertEqual( setlog.reconfigure( logfmt='%(name)s: %(message)s', filter_matches=['chatty'] ), set(['format', 'filters']) )
+
+        ## nothing is assigned before the lock is held, formatter and filters are assigned together
+        self.assertEqual( states[0], before )
+        self.assertEqual( states[-1], (handler.formatter, handler.filters) )
+        self.assertNotEqual( handler.formatter, before[0] )
+        self.assertIsInstance( handler.filters[0], supercli.logging.Blacklist )
+
+    def test_unknown_argument(self):
+        setlog = supercli.logging.SetLog( logstream=False )
+        with self.assertRaises( TypeError ):
+            setlog.reconfigure( loglevel='DEBUG' )
+
+    def test_threads_logging_during_reconfigure(self):
+        import threading
+
+        setlog = supercli.logging.SetLog( logfile=self.logfile, logstream=False, colorize=False, logfmt='%(message)s' )
+        logger = logging.getLogger('supercli.tests.reconfigure')
+        (nthreads, nrecords) = (4, 500)
+
+        def log():
+            for i in range(nrecords):
+                logger.warning( 'record' )
+
+        threads = [ threading.Thread( target=log )  for i in range(nthreads) ]
+        for thread in threads:
+            thread.start()
+        for i in range(50):
+            setlog.reconfigure( lv=('DEBUG' if i % 2 else 'INFO'), filter_matches=(['other'] if i % 3 else []) )
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual( self.read_logfile().count( 'record\n' ), nthreads * nrecords )
+
+
+@unittest.skipUnless( hasattr(__import__('signal'), 'SIGUSR1'), 'requires SIGUSR1/SIGUSR2' )
+class TestLogSignals( RootLoggerTestCase ):
+    def setUp(self):
+        import io
+        RootLoggerTestCase.setUp(self)
+        self.handler = logging.StreamHandler( io.StringIO() )   ## reused by SetLog
+        logging.root.addHandler( self.handler )
+
+    def tearDown(self):
+        if supercli.logging._log_signals is not None:
+            supercli.logging._log_signals.uninstall()
+            supercli.logging._log_signals = None
+        RootLoggerTestCase.tearDown(self)
+
+    def wait_for( self, condition ):
+        import time
+        for i in range(200):
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_signals_step_verbosity(self):
+        import signal
+        supercli.logging.SetLog( 'v', colorize=False, filter_matches=['chatty'], log_signals=True )
+        self.assertIsInstance( self.handler.filters[0], supercli.logging.Blacklist )
+        self.assertEqual( logging.root.level, logging.DEBUG )
+
+        os.kill( os.getpid(), signal.SIGUSR1 )
+        self.assertTrue( self.wait_for( lambda: not self.handler.filters ) )   ## very-verbose
+        self.assertEqual( logging.root.level, logging.DEBUG )
+
+        os.kill( os.getpid(), signal.SIGUSR1 )     ## already most verbose
+        os.kill( os.getpid(), signal.SIGUSR2 )
+        os.kill( os.getpid(), signal.SIGUSR2 )
+        self.assertTrue( self.wait_for( lambda: logging.root.level == logging.INFO ) )
+        self.assertIsInstance( self.handler.filters[0], supercli.logging.Blacklist )
+
+        os.kill( os.getpid(), signal.SIGUSR2 )     ## already least verbose
+        os.kill( os.getpid(), signal.SIGUSR1 )
+        self.assertTrue( self.wait_for( lambda: logging.root.level == logging.DEBUG ) )
+
+    def test_dump_config(self):
+        import signal
+        import io
+        supercli.logging.SetLog( logstream=False, log_signals=True )
+        stream = io.StringIO()
+        supercli.logging._log_signals.stream = stream
+
+        os.kill( os.getpid(), signal.SIGQUIT )
+        self.assertTrue( self.wait_for( lambda: 'StreamHandler' in stream.getvalue() ) )
+        self.assertIn( 'root  level=INFO', stream.getvalue() )
+
+    def test_uninstall_restores_handlers(self):
+        import signal
+        previous = signal.getsignal( signal.SIGUSR1 )
+        setlog   = supercli.logging.SetLog( logstream=False, log_signals=True )
+        self.assertIsNot( signal.getsignal( signal.SIGUSR1 ), previous )
+
+        self.assertIn( 'signals', setlog.reconfigure( log_signals=False ) )
+        self.assertIs( signal.getsignal( signal.SIGUSR1 ), previous )
+        self.assertIsNone( supercli.logging._log_signals )
+
+    def test_newer_setlog_removes_signals(self):
+        import signal
+        previous = signal.getsignal( signal.SIGUSR1 )
+        supercli.logging.SetLog( logstream=False, log_signals=True )
+        supercli.logging.SetLog( logstream=False )
+        self.assertIsNone( supercli.logging._log_signals )
+        self.assertIs( signal.getsignal( signal.SIGUSR1 ), previous )
+
+    def test_dump_signal_disabled(self):
+        import signal
+        previous = signal.getsignal( signal.SIGQUIT )
+        setlog   = supercli.logging.SetLog( lv='INFO', logstream=False )
+        signals  = supercli.logging.LogSignals( setlog, dump=None ).install()
+        try:
+            self.assertIs( signal.getsignal( signal.SIGQUIT ), previous )
+            self.assertIsNot( signal.getsignal( signal.SIGUSR1 ), previous )
+        finally:
+            signals.uninstall()
+
+    def test_warning_base_level(self):
+        setlog  = supercli.logging.SetLog( lv='WARNING', logstream=False )
+        signals = supercli.logging.LogSignals( setlog )
+        self.assertEqual( signals.current_step(), 0 )
+        signals.step( 1 )
+        self.assertEqual( logging.root.level, logging.INFO )
+        signals.step( -1 )
+        self.assertEqual( logging.root.level, logging.WARNING )
+
+
+class TestModuleLevels( RootLoggerTestCase ):
+    def tearDown(self):
+        supercli.logging.set_module_levels( {} )
+        RootLoggerTestCase.tearDown(self)
+
+    def test_parse(self):
+        parse = supercli.logging.parse_module_levels
+        self.assertEqual( parse( 'pkg.mod=DEBUG, other=warning,' ), {'pkg.mod': logging.DEBUG, 'other': logging.WARNING} )
+        self.assertEqual( parse( {'pkg': 'INFO', 'mod': 5} ), {'pkg': logging.INFO, 'mod': 5} )
+        self.assertEqual( parse( None ), {} )
+        for spec in ( 'pkg.mod', 'pkg.mod=LOUD', '=DEBUG' ):
+            with self.assertRaises( ValueError ):
+                parse( spec )
+
+    def test_setlog(self):
+        handler = logging.StreamHandler( mock.Mock() )
+        logging.root.addHandler( handler )
+        with mock.patch.object( handler, 'emit' ) as emit:
+            setlog = supercli.logging.SetLog( colorize=False, module_levels='supercli.tests.debugged=DEBUG' )
+            logging.getLogger('supercli.tests.debugged.child').debug('shown')
+            logging.getLogger('supercli.tests.other').debug('hidden')
+            self.assertEqual( [ c[0][0].getMessage()  for c in emit.call_args_list ], ['shown'] )
+
+        self.assertEqual( logging.root.level, logging.INFO )
+
+        ## loggers that are no longer configured are reset
+        self.assertEqual( setlog.reconfigure( module_levels='supercli.tests.other=ERROR' ), set(['level']) )
+        self.assertEqual( logging.getLogger('supercli.tests.debugged').level, logging.NOTSET )
+        self.assertEqual( logging.getLogger('supercli.tests.other').level, logging.ERROR )
+
+    def test_previous_levels_restored(self):
+        set_module_levels = supercli.logging.set_module_levels
+        (kept, changed) = ( logging.getLogger('supercli.tests.kept'), logging.getLogger('supercli.tests.changed') )
+        kept.setLevel( logging.WARNING )
+        try:
+            set_module_levels( {'supercli.tests.kept': logging.DEBUG, 'supercli.tests.changed': logging.DEBUG} )
+            set_module_levels( {'supercli.tests.kept': logging.INFO, 'supercli.tests.changed': logging.DEBUG} )
+            changed.setLevel( logging.ERROR )     ## set by the program
+            set_module_levels( {} )
+
+            self.assertEqual( kept.level,    logging.WARNING )
+            self.assertEqual( changed.level, logging.ERROR )
+        finally:
+            kept.setLevel( logging.NOTSET )
+            changed.setLevel( logging.NOTSET )
+
+    def test_flight_recorder(self):
+        handler = logging.StreamHandler( mock.Mock() )
+        logging.root.addHandler( handler )
+        with mock.patch.object( handler, 'emit' ) as emit:
+            setlog = supercli.logging.SetLog( colorize=False, flight_recorder=10, module_levels={'supercli.tests.debugged': 'DEBUG'} )
+            logging.getLogger('supercli.tests.debugged').debug('shown')
+            logging.getLogger('supercli.tests.other').debug('recorded')
+            self.assertEqual( [ c[0][0].getMessage()  for c in emit.call_args_list ], ['shown'] )
+            self.assertEqual( len(setlog.flight_recorder_handler.records()), 2 )
+
+        ## removing the flight-recorder removes the LevelFilter
+        setlog.reconfigure( flight_recorder=None )
+        self.assertFalse( any( isinstance(f, supercli.logging.LevelFilter)  for f in handler.filters ) )
+        self.assertEqual( handler.level, logging.NOTSET )
+
+
+class TestLevelFilter( unittest.TestCase ):
+    def test_nearest_parent(self):
+        _filter = supercli.logging.LevelFilter( {'pkg': logging.WARNING, 'pkg.mod': logging.DEBUG}, default=logging.INFO )
+        self.assertTrue(  _filter.filter( make_record('pkg.mod.child', levelno=logging.DEBUG) ) )
+        self.assertFalse( _filter.filter( make_record('pkg.other',     levelno=logging.INFO) ) )
+        self.assertFalse( _filter.filter( make_record('root',          levelno=logging.DEBUG) ) )
+        self.assertTrue(  _filter.filter( make_record('root',          levelno=logging.INFO) ) )
+
+
+class TestFanoutHandler( unittest.TestCase ):
+    def make_stream_handler(self, formatter):
+        import io
+        handler = logging.StreamHandler( io.StringIO() )
+        handler.setFormatter( formatter )
+        return handler
+
+    def test_formats_once_per_formatter(self):
+        formatter = supercli.logging.Formatter( '%(levelname)s %(message)s' )
+        handlers  = [ self.make_stream_handler(formatter)  for i in range(3) ]
+        fanout    = supercli.logging.FanoutHandler( handlers )
+
+        with mock.patch.object( formatter, 'format', wraps=formatter.format ) as format:
+            fanout.handle( make_record('pkg', msg='hello %s', args=('world',)) )
+            self.assertEqual( format.call_count, 1 )
+
+        for handler in handlers:
+            self.assertEqual( handler.stream.getvalue(), 'INFO hello world\n' )
+
+    def test_handler_level(self):
+        formatter = supercli.logging.Formatter( '%(message)s' )
+        (quiet, loud) = [ self.make_stream_handler(formatter)  for i in range(2) ]
+        quiet.setLevel( logging.WARNING )
+
+        supercli.logging.FanoutHandler( [quiet, loud] ).handle( make_record('pkg', msg='info') )
+        self.assertEqual( quiet.stream.getvalue(), '' )
+        self.assertEqual( loud.stream.getvalue(), 'info\n' )
+
+    def test_filter_that_replaces_message_is_reformatted(self):
+        class Redact( logging.Filter ):
+            def filter(self, record):
+                record.msg = 'redacted'
+                return True
+
+        formatter = supercli.logging.Formatter( '%(message)s' )
+        (plain, redacted, after) = [ self.make_stream_handler(formatter)  for i in range(3) ]
+        redacted.addFilter( Redact() )
+
+        supercli.logging.FanoutHandler( [plain, redacted, after] ).handle( make_record('pkg', msg='secret') )
+        self.assertEqual( plain.stream.getvalue(), 'secret\n' )
+        self.assertEqual( redacted.stream.getvalue(), 'redacted\n' )
+        self.assertEqual( after.stream.getvalue(), 'redacted\n' )
+
+    def test_other_handlers_handle_record(self):
+        target = ListHandler()
+        supercli.logging.FanoutHandler( [target] ).handle( make_record('pkg') )
+        self.assertEqual( len(target.records), 1 )
+
+    def test_handler_errors_are_handled_by_handler(self):
+        def fail( record ):
+            raise ValueError( 'bad filter' )
+
+        formatter = supercli.logging.Formatter( '%(message)s' )
+        (failing, other) = [ self.make_stream_handler(formatter)  for i in range(2) ]
+        failing_target   = ListHandler()
+        for handler in (failing, failing_target):
+            handler.addFilter( fail )
+            handler.handleError = mock.Mock()
+
+        supercli.logging.FanoutHandler( [failing, failing_target, other] ).handle( make_record('pkg', msg='msg') )
+        self.assertEqual( failing.handleError.call_count, 1 )
+        self.assertEqual( failing_target.handleError.call_count, 1 )
+        self.assertEqual( other.stream.getvalue(), 'msg\n' )
+
+
+class LogfileTestCase( RootLoggerTestCase ):
+    """
+    Provides a logfile in a temporary directory (`self.logfile`).
+    """
+    def setUp(self):
+        import tempfile
+        RootLoggerTestCase.setUp(self)
+        self.tempdir = tempfile.mkdtemp()
+        self.logfile = os.path.join( self.tempdir, 'test.log' )
+
+    def tearDown(self):
+        import shutil
+        RootLoggerTestCase.tearDown(self)
+        shutil.rmtree( self.tempdir )
+
+
+class TestSetLogFanout( LogfileTestCase ):
+    def test_logfiles_share_formatted_record(self):
+        logfiles = [ self.logfile, self.logfile + '.2' ]
+        setlog   = supercli.logging.SetLog( logfile=logfiles, logstream=False, colorize=False, fanout=True )
+
+        (fanout,) = logging.root.handlers
+        self.assertIsInstance( fanout, supercli.logging.FanoutHandler )
+        self.assertEqual( fanout.handlers, setlog.handlers )
+
+        logging.getLogger('pkg').info( 'hello %s', 'world' )
+        for handler in setlog.handlers:
+            handler.flush()
+        for logfile in logfiles:
+            with open( logfile ) as fd:
+                self.assertIn( 'hello world', fd.read() )
+
+        ## disabling fanout restores the handlers
+        handlers = setlog.handlers[:]
+        self.assertEqual( setlog.reconfigure( fanout=False ), set(['sinks']) )
+        self.assertEqual( logging.root.handlers, handlers )
+
+
+class TestThreadBufferedHandler( unittest.TestCase ):
+    def setUp(self):
+        self.target  = ListHandler()
+        self.handler = supercli.logging.ThreadBufferedHandler( [self.target], flush_interval=60, flush_level=logging.CRITICAL )
+
+    def tearDown(self):
+        self.handler.close()
+
+    def log_from_thread(self, records):
+        import threading
+        def log():
+            for record in records:
+                self.handler.handle( record )
+        thread = threading.Thread( target=log )
+        thread.start()
+        thread.join()
+
+    def make_records(self, times):
+        records = []
+        for created in times:
+            record = make_record( 'pkg', msg='%s' % created )
+            record.created = created
+            records.append( record )
+        return records
+
+    def test_records_after_close_are_written(self):
+        with mock.patch( 'atexit.unregister', create=True ) as unregister:
+            self.handler.close()
+        unregister.assert_called_once_with( self.handler.stop )
+
+        self.handler.handle( make_record('pkg') )
+        self.assertEqual( len(self.target.records), 1 )
+
+    def test_records_are_merged_by_timestamp(self):
+        self.log_from_thread( self.make_records([1, 3, 5]) )
+        self.log_from_thread( self.make_records([2, 4]) )
+        self.assertEqual( self.target.records, [] )
+
+        self.handler.flush()
+        self.assertEqual( [ r.msg  for r in self.target.records ], ['1', '2', '3', '4', '5'] )
+
+    def test_thread_order_is_kept(self):
+        ## (clock went backwards)
+        self.log_from_thread( self.make_records([5, 1]) )
+        self.log_from_thread( self.make_records([3]) )
+        self.handler.flush()
+        self.assertEqual( [ r.msg  for r in self.target.records ], ['3', '5', '1'] )
+
+    def test_close_writes_buffered_records(self):
+        self.log_from_thread( self.make_records([1, 2]) )
+        self.handler.close()
+        self.assertEqual( len(self.target.records), 2 )
+
+    def test_flush_level_wakes_writer(self):
+        import time
+        self.handler.handle( make_record('pkg', levelno=logging.CRITICAL) )
+        for i in range(100):
+            if self.target.records:
+                break
+            time.sleep( 0.01 )
+        self.assertEqual( len(self.target.records), 1 )
+
+
+class TestSetLogThreadBuffered( LogfileTestCase ):
+    def test_thread_buffered(self):
+        setlog = supercli.logging.SetLog( logfile=self.logfile, logstream=False, colorize=False, thread_buffered=True )
+
+        (dispatcher,) = logging.root.handlers
+        self.assertIsInstance( dispatcher, supercli.logging.ThreadBufferedHandler )
+
+        logging.getLogger('pkg').info( 'hello %s', 'world' )
+        dispatcher.flush()
+        with open( self.logfile ) as fd:
+            self.assertIn( 'hello world', fd.read() )
+
+        handlers = setlog.handlers[:]
+        self.assertEqual( setlog.reconfigure( thread_buffered=False ), set(['sinks']) )
+        self.assertEqual( logging.root.handlers, handlers )
@@ -0,0 +1,92 @@
+import unittest
+try:
+    import mock
+except:
+    from unittest import mock
+
+import logging
+import os
+import supercli.logging
+import supercli.logquery
+
+
+def make_record( name, levelno, msg, created ):
+    record = logging.LogRecord( name, levelno, '/path/to/module.py', 10, msg, None, None, func='func' )
+    record.created = created
+    return record
+
+
+class TestQuery( unittest.TestCase ):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+        self.logfile = os.path.join( self.tempdir, 'test.log' )
+
+        handler = supercli.logging.BufferedRotatingFileHandler( self.logfile, buffer_size=64, flush_interval=None,
+                                                                flush_level=100, index=True )
+        for i in range(20):
+            name    = ('pkg.a', 'pkg.ab', 'pkg.a.sub', 'other')[ i % 4 ]
+            levelno = (logging.INFO, logging.ERROR)[ i % 2 ]
+            handler.handle( make_record( name, levelno, 'record-%s' % i, 1000.0 + i ) )
+        handler.close()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree( self.tempdir )
+
+    def query(self, **kwargs):
+        return [ data.decode('utf-8').strip()  for (created, data) in supercli.logquery.query( self.logfile, **kwargs ) ]
+
+    def test_index_has_several_blocks(self):
+        self.assertGreater( len(supercli.logquery.read_index(self.logfile)), 2 )
+
+    def test_all(self):
+        self.assertEqual( self.query(), [ 'record-%s' % i  for i in range(20) ] )
+
+    def test_level(self):
+        self.assertEqual( self.query( level=logging.ERROR ), [ 'record-%s' % i  for i in range(1, 20, 2) ] )
+
+    def test_loggers(self):
+        self.assertEqual( self.query( loggers=['pkg.a'] ), [ 'record-%s' % i  for i in range(20)  if i % 4 in (0, 2) ] )
+
+    def test_time(self):
+        self.assertEqual( self.query( since=1005.0, until=1007.5 ), ['record-5', 'record-6', 'record-7'] )
+
+    def test_blocks_outside_query_not_read(self):
+        blocks = supercli.logquery.read_index( self.logfile )
+        with mock.patch.object( supercli.logquery, 'read_index', return_value=blocks ):
+            with mock.patch.object( supercli.logquery, 'match_logger', wraps=supercli.logquery.match_logger ) as match:
+                self.query( since=1019.0, loggers=['other'] )
+        self.assertLessEqual( match.call_count, 4 )    ## (loggers of the last block only)
+
+    def test_unindexed(self):
+        with open( self.logfile, 'ab' ) as fd:
+            fd.write( b'not indexed\n' )
+
+        unindexed = []
+        self.assertEqual( len(self.query( unindexed=unindexed )), 20 )
+        size = os.path.getsize( self.logfile )
+        self.assertEqual( unindexed, [ (size - 12, size) ] )
+
+
+class TestFindLogfiles( unittest.TestCase ):
+    def test_oldest_first(self):
+        with mock.patch( 'glob.glob', return_value=['/log/a.log.1', '/log/a.log.10.gz', '/log/a.log.2.zst', '/log/a.log.idx', '/log/a.log.1.idx'] ):
+            self.assertEqual( supercli.logquery.find_logfiles('/log/a.log'), [
+                '/log/a.log.10.gz', '/log/a.log.2.zst', '/log/a.log.1', '/log/a.log',
+            ])
+
+
+class TestParseTime( unittest.TestCase ):
+    def test_durations(self):
+        self.assertEqual( supercli.logquery.parse_time( '30s', now=10000.0 ), 9970.0 )
+        self.assertEqual( supercli.logquery.parse_time( '1.5h', now=10000.0 ), 4600.0 )
+
+    def test_dates(self):
+        import time
+        self.assertEqual( supercli.logquery.parse_time( '2016-09-04 17:21' ), time.mktime( (2016,9,4,17,21,0,0,0,-1) ) )
+        self.assertEqual( supercli.logquery.parse_time( '1473012063.5' ), 1473012063.5 )
+
+    def test_invalid(self):
+        with self.assertRaises( ValueError ):
+            supercli.logquery.parse_time( 'yesterday' )
@@ -0,0 +1,49 @@
+import unittest
+try:
+    import mock
+except:
+    from unittest import mock
+
+import logging
+import os
+import six
+import supercli.logging
+import supercli.logview
+
+
+class TestLogview( unittest.TestCase ):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+        self.binlog  = os.path.join( self.tempdir, 'test.binlog' )
+
+        handler = supercli.logging.BinaryLogHandler( self.binlog, flush_interval=None )
+        for (levelno, msg, args) in (
+                (logging.INFO,    'value %s: %d', ('a', 1)),
+                (logging.WARNING, 'value %s: %d', ('b', 2)),
+            ):
+            record = logging.LogRecord( 'pkg.mod', levelno, '/path/to/mod.py', 10, msg, args, None, func='run' )
+            handler.handle( record )
+        handler.close()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree( self.tempdir )
+
+    def run_logview(self, *argv):
+        with mock.patch( 'sys.stdout', new=six.StringIO() ) as stdout:
+            supercli.logview.main( list(argv) + [self.binlog] )
+        return stdout.getvalue().splitlines()
+
+    def test_preset(self):
+        self.assertEqual( self.run_logview('-f', 'dev'), [
+            '[ run                                 ]ln10   INFO    : value a: 1',
+            '[ run                                 ]ln10   WARNING : value b: 2',
+        ])
+
+    def test_level(self):
+        self.assertEqual( self.run_logview('-f', '%(levelname)s %(message)s', '-l', 'warning'), ['WARNING value b: 2'] )
+
+    def test_mismatched_args(self):
+        record = logging.makeLogRecord({ 'msg': 'value %d', 'args': (supercli.logcodec.Opaque('x'),) })
+        self.assertEqual( supercli.logview.format_record( logging.Formatter('%(message)s'), record ), 'value %d (x,)' )